@@ -1,21 +1,18 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, status, Header
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import httpx
+import hmac
 import jwt
-from jwt.algorithms import RSAAlgorithm
-import json
-from sqlalchemy.orm import Session
+from typing import Optional
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.core.jwks import jwks_store
+from app.core.token_cache import token_cache
+from app.schemas import user as user_schemas
 from app.services import user_service
 
 security = HTTPBearer()
 
-async def get_clerk_jwks():
-    async with httpx.AsyncClient() as client:
-        response = await client.get("https://api.clerk.dev/v1/jwks")
-        return response.json()
-
 async def verify_token(token: str):
     try:
         # Extract kid from token header
@@ -25,22 +22,12 @@ async def verify_token(token: str):
         if not kid:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token header")
         
-        # Get JWKs from Clerk
-        jwks = await get_clerk_jwks()
-        
-        # Find the key matching the kid
-        key = None
-        for jwk in jwks["keys"]:
-            if jwk.get("kid") == kid:
-                key = jwk
-                break
+        # Look up the parsed public key for this kid
+        public_key = await jwks_store.get_key(kid)
         
-        if not key:
+        if not public_key:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token key")
         
-        # Convert JWK to PEM
-        public_key = RSAAlgorithm.from_jwk(json.dumps(key))
-        
         # Verify token
         payload = jwt.decode(
             token,
@@ -49,29 +36,58 @@ async def verify_token(token: str):
             audience=settings.CLERK_PUBLISHABLE_KEY
         )
         
-        # Extract user ID from the subject claim
-        clerk_id = payload.get("sub")
-        
-        if not clerk_id:
+        # The subject claim carries the Clerk user ID
+        if not payload.get("sub"):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token claims")
         
-        return clerk_id
+        return payload
     
     except jwt.PyJWTError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Invalid token: {str(e)}")
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
-    try:
-        clerk_id = await verify_token(credentials.credentials)
+def _load_user(clerk_id: str) -> Optional[user_schemas.User]:
+    with SessionLocal() as db:
         user = user_service.get_user_by_clerk_id(db=db, clerk_id=clerk_id)
+        return user_schemas.User.model_validate(user) if user else None
+
+async def load_user(clerk_id: str) -> Optional[user_schemas.User]:
+    """Detached snapshot of a user, looked up without blocking the event loop"""
+    if not settings.DATABASE_ASYNC:
+        return await run_in_threadpool(_load_user, clerk_id)
+
+    async with AsyncSessionLocal() as db:
+        user = await user_service.get_user_by_clerk_id_async(db=db, clerk_id=clerk_id)
+        return user_schemas.User.model_validate(user) if user else None
+
+async def authenticate(token: str) -> user_schemas.User:
+    """Resolve a bearer token to its user, through the token cache"""
+    try:
+        cached = token_cache.get(token)
+        if cached:
+            return cached.user
+        
+        claims = await verify_token(token)
+        user = await load_user(claims["sub"])
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        
+        token_cache.put(token, claims, user)
         return user
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Could not validate credentials: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    return await authenticate(credentials.credentials)
+
+def verify_ingest_key(x_ingest_key: str = Header(None)):
+    """Authenticate honeypot sensors pushing attacks"""
+    if not settings.INGEST_API_KEY:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Ingestion key not configured")
+    
+    if not x_ingest_key or not hmac.compare_digest(x_ingest_key, settings.INGEST_API_KEY):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid ingestion key")
\ No newline at end of file
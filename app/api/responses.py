@@ -0,0 +1,27 @@
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from uuid import UUID
+from sqlalchemy.orm import Session
+from app.schemas import attack as attack_schemas
+from app.services import attack_service
+
+def list_attacks_response(
+    db: Session,
+    user_id: UUID,
+    filters: attack_schemas.AttackFilter,
+    honeypot_id: Optional[UUID],
+    cursor: Optional[str],
+    limit: int,
+    format: str
+):
+    """A page of attacks as JSON, or every match streamed as NDJSON"""
+    try:
+        statement = attack_service.attack_listing_query(user_id, filters, honeypot_id, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if format == "ndjson":
+        return StreamingResponse(attack_service.stream_attacks(statement), media_type="application/x-ndjson")
+
+    return attack_service.list_attacks(db, statement, limit)
@@ -1,15 +1,43 @@
-from fastapi import APIRouter, Depends, Query
-from typing import Dict, Any, List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, Any, List, Optional
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from app.core.database import get_db
-from app.models.attack import Attack
-from app.models.honeypot import Honeypot
+from app.core.database import get_async_db, get_db
 from app.api.dependencies import get_current_user
 from app.models.user import User
-from datetime import datetime, timedelta
+from app.services import analytics_service, honeypot_service
+from app.services.heavy_hitters import heavy_hitters
+from datetime import datetime, timedelta, timezone
 
 router = APIRouter()
+async_router = APIRouter()  # Served instead of `router` when DATABASE_ASYNC is enabled
+
+PERIODS = {"24h": timedelta(days=1), "7d": timedelta(days=7), "30d": timedelta(days=30)}
+
+def period_start(time_period: str) -> datetime:
+    """Start of a reporting period ending now, defaulting to 7 days"""
+    return datetime.now(timezone.utc) - PERIODS.get(time_period, PERIODS["7d"])
+
+def distribution_response(attack_distribution) -> Dict[str, Any]:
+    return {
+        "data": [
+            {
+                "attack_type": attack_type, 
+                "count": count
+            } for attack_type, count in attack_distribution
+        ]
+    }
+
+def sources_response(attack_sources) -> Dict[str, Any]:
+    return {
+        "data": [
+            {
+                "source_ip": source_ip, 
+                "count": count
+            } for source_ip, count in attack_sources
+        ]
+    }
 
 @router.get("/summary")
 def get_summary(
@@ -17,60 +45,7 @@ def get_summary(
     current_user: User = Depends(get_current_user)
 ):
     """Get analytics summary for dashboard"""
-    # Get user honeypots
-    honeypots = db.query(Honeypot).filter(Honeypot.user_id == current_user.id).all()
-    honeypot_ids = [h.id for h in honeypots]
-    
-    # Skip if no honeypots
-    if not honeypot_ids:
-        return {
-            "totalAttacks": 0,
-            "activeHoneypots": 0,
-            "topAttackTypes": [],
-            "recentAttacks": []
-        }
-    
-    # Get total attacks
-    total_attacks = db.query(func.count(Attack.id)).filter(Attack.honeypot_id.in_(honeypot_ids)).scalar() or 0
-    
-    # Get active honeypots
-    active_honeypots = len([h for h in honeypots if h.status == "active"])
-    
-    # Get top attack types
-    top_attack_types = db.query(
-        Attack.attack_type,
-        func.count(Attack.id).label("count")
-    ).filter(
-        Attack.honeypot_id.in_(honeypot_ids)
-    ).group_by(
-        Attack.attack_type
-    ).order_by(
-        desc("count")
-    ).limit(5).all()
-    
-    # Get recent attacks
-    recent_attacks = db.query(Attack).filter(
-        Attack.honeypot_id.in_(honeypot_ids)
-    ).order_by(
-        Attack.timestamp.desc()
-    ).limit(10).all()
-    
-    return {
-        "totalAttacks": total_attacks,
-        "activeHoneypots": active_honeypots,
-        "topAttackTypes": [{"type": t.attack_type, "count": t.count} for t in top_attack_types],
-        "recentAttacks": [
-            {
-                "id": str(a.id),
-                "timestamp": a.timestamp,
-                "source_ip": a.source_ip,
-                "attack_type": a.attack_type,
-                "severity": a.severity,
-                "honeypot_id": str(a.honeypot_id),
-                "is_simulated": a.is_simulated
-            } for a in recent_attacks
-        ]
-    }
+    return analytics_service.get_summary(db=db, user_id=current_user.id)
 
 @router.get("/attack-distribution")
 def get_attack_distribution(
@@ -79,45 +54,9 @@ def get_attack_distribution(
     current_user: User = Depends(get_current_user)
 ):
     """Get distribution of attacks by type"""
-    # Get user honeypots
-    honeypots = db.query(Honeypot).filter(Honeypot.user_id == current_user.id).all()
-    honeypot_ids = [h.id for h in honeypots]
-    
-    if not honeypot_ids:
-        return {"data": []}
-    
-    # Calculate time filter
-    now = datetime.now()
-    if time_period == "24h":
-        time_filter = now - timedelta(days=1)
-    elif time_period == "7d":
-        time_filter = now - timedelta(days=7)
-    elif time_period == "30d":
-        time_filter = now - timedelta(days=30)
-    else:
-        time_filter = now - timedelta(days=7)  # Default to 7 days
-    
-    # Query attack distribution
-    attack_distribution = db.query(
-        Attack.attack_type,
-        func.count(Attack.id).label("count")
-    ).filter(
-        Attack.honeypot_id.in_(honeypot_ids),
-        Attack.timestamp >= time_filter
-    ).group_by(
-        Attack.attack_type
-    ).order_by(
-        desc("count")
-    ).all()
-    
-    return {
-        "data": [
-            {
-                "attack_type": a.attack_type, 
-                "count": a.count
-            } for a in attack_distribution
-        ]
-    }
+    return distribution_response(analytics_service.get_attack_distribution(
+        db=db, user_id=current_user.id, since=period_start(time_period)
+    ))
 
 @router.get("/attack-sources")
 def get_attack_sources(
@@ -126,30 +65,62 @@ def get_attack_sources(
     current_user: User = Depends(get_current_user)
 ):
     """Get top attack sources by IP"""
-    # Get user honeypots
-    honeypots = db.query(Honeypot).filter(Honeypot.user_id == current_user.id).all()
-    honeypot_ids = [h.id for h in honeypots]
-    
-    if not honeypot_ids:
-        return {"data": []}
-    
-    # Query attack sources
-    attack_sources = db.query(
-        Attack.source_ip,
-        func.count(Attack.id).label("count")
-    ).filter(
-        Attack.honeypot_id.in_(honeypot_ids)
-    ).group_by(
-        Attack.source_ip
-    ).order_by(
-        desc("count")
-    ).limit(limit).all()
-    
-    return {
-        "data": [
-            {
-                "source_ip": a.source_ip, 
-                "count": a.count
-            } for a in attack_sources
-        ]
-    }
\ No newline at end of file
+    return sources_response(analytics_service.get_attack_sources(db=db, user_id=current_user.id, limit=limit))
+
+@router.get("/top-attackers")
+def get_top_attackers(
+    window: str = Query("24h", pattern="^(1h|24h|7d)$"),
+    limit: int = Query(10, ge=1, le=100),
+    honeypot_id: Optional[UUID] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Approximate top source IPs over a sliding window, from memory rather than the attacks table"""
+    if honeypot_id is not None and not honeypot_service.honeypot_exists(db=db, honeypot_id=honeypot_id, user_id=current_user.id):
+        raise HTTPException(status_code=404, detail="Honeypot not found")
+    return heavy_hitters.top(window, limit, current_user.id, honeypot_id)
+
+@async_router.get("/summary")
+async def get_summary_async(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get analytics summary for dashboard"""
+    return await analytics_service.get_summary_async(db=db, user_id=current_user.id)
+
+@async_router.get("/attack-distribution")
+async def get_attack_distribution_async(
+    time_period: str = "7d",
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get distribution of attacks by type"""
+    return distribution_response(await analytics_service.get_attack_distribution_async(
+        db=db, user_id=current_user.id, since=period_start(time_period)
+    ))
+
+@async_router.get("/attack-sources")
+async def get_attack_sources_async(
+    limit: int = 10,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get top attack sources by IP"""
+    return sources_response(await analytics_service.get_attack_sources_async(
+        db=db, user_id=current_user.id, limit=limit
+    ))
+
+@async_router.get("/top-attackers")
+async def get_top_attackers_async(
+    window: str = Query("24h", pattern="^(1h|24h|7d)$"),
+    limit: int = Query(10, ge=1, le=100),
+    honeypot_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Approximate top source IPs over a sliding window, from memory rather than the attacks table"""
+    if honeypot_id is not None and not await honeypot_service.get_honeypot_ids_async(
+        db=db, user_id=current_user.id, honeypot_id=honeypot_id
+    ):
+        raise HTTPException(status_code=404, detail="Honeypot not found")
+    return heavy_hitters.top(window, limit, current_user.id, honeypot_id)
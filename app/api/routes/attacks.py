@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import get_db
+from app.schemas import attack as attack_schemas
+from app.schemas import user as user_schemas
+from app.services import attack_service
+from app.services.attack_service import build_attack_rows
+from app.services.attack_writer import attack_writer
+from app.api.dependencies import get_current_user, verify_ingest_key
+from app.api.responses import list_attacks_response
+
+router = APIRouter()
+
+attack_list_adapter = TypeAdapter(List[attack_schemas.AttackCreate])
+
+def parse_ndjson(body: bytes) -> List[attack_schemas.AttackCreate]:
+    """Parse newline-delimited JSON, reporting errors by line number"""
+    attacks = []
+    errors = []
+    for line_number, line in enumerate(body.splitlines()):
+        if not line.strip():
+            continue
+        try:
+            attacks.append(attack_schemas.AttackCreate.model_validate_json(line))
+        except ValidationError as e:
+            for error in e.errors(include_url=False):
+                errors.append({**error, "loc": ("body", line_number, *error["loc"])})
+    
+    if errors:
+        raise RequestValidationError(errors)
+    return attacks
+
+def enqueue_attacks(attacks: List[attack_schemas.AttackCreate]) -> dict:
+    if not attack_writer.submit(build_attack_rows(attacks)):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Ingestion buffer full")
+    return {"accepted": len(attacks)}
+
+@router.post("/", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(verify_ingest_key)])
+async def ingest_attack(attack_in: attack_schemas.AttackCreate):
+    """Ingest a single attack event"""
+    return enqueue_attacks([attack_in])
+
+@router.post("/batch", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(verify_ingest_key)])
+async def ingest_attack_batch(request: Request):
+    """Ingest a JSON array or NDJSON stream of attack events"""
+    body = await request.body()
+    
+    if "ndjson" in request.headers.get("content-type", ""):
+        attacks = parse_ndjson(body)
+    else:
+        try:
+            attacks = attack_list_adapter.validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+    
+    if len(attacks) > settings.INGEST_MAX_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {settings.INGEST_MAX_BATCH} events"
+        )
+    
+    return enqueue_attacks(attacks)
+
+@router.get("/", response_model=attack_schemas.AttackPage)
+def list_attacks(
+    filters: attack_schemas.AttackFilter = Depends(),
+    honeypot_id: Optional[UUID] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_db),
+    current_user: user_schemas.User = Depends(get_current_user)
+):
+    """List attacks across the current user's honeypots, newest first"""
+    return list_attacks_response(db, current_user.id, filters, honeypot_id, cursor, limit, format)
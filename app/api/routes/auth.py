@@ -5,6 +5,7 @@ import hashlib
 import time
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.token_cache import token_cache
 from app.schemas import user as user_schemas
 from app.services import user_service
 from app.api.dependencies import get_current_user
@@ -107,6 +108,7 @@ async def clerk_webhook(
         )
         
         user_service.update_user(db, existing_user, user_update)
+        token_cache.invalidate_user(clerk_id)
         return {"status": "success", "message": "User updated"}
     
     return {"status": "ignored", "event": event_type}
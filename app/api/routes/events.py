@@ -0,0 +1,99 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from uuid import UUID
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.schemas import user as user_schemas
+from app.services import honeypot_service
+from app.services.event_broker import Subscription, attack_broker
+from app.api.dependencies import authenticate, get_current_user
+
+router = APIRouter()
+
+def _honeypot_ids(user_id: UUID, honeypot_id: Optional[UUID]) -> List[UUID]:
+    with SessionLocal() as db:
+        return honeypot_service.get_honeypot_ids(db=db, user_id=user_id, honeypot_id=honeypot_id)
+
+async def subscribe(user_id: UUID, honeypot_id: Optional[UUID]) -> Subscription:
+    """Subscribe to the user's honeypots, including ones created later, or one of them; 404 if it isn't theirs"""
+    if settings.DATABASE_ASYNC:
+        async with AsyncSessionLocal() as db:
+            honeypot_ids = await honeypot_service.get_honeypot_ids_async(db=db, user_id=user_id, honeypot_id=honeypot_id)
+    else:
+        honeypot_ids = await run_in_threadpool(_honeypot_ids, user_id, honeypot_id)
+
+    if honeypot_id is not None and not honeypot_ids:
+        raise HTTPException(status_code=404, detail="Honeypot not found")
+    return attack_broker.subscribe(honeypot_ids, owner_id=user_id if honeypot_id is None else None)
+
+@router.get("/attacks")
+async def stream_attacks_sse(
+    honeypot_id: Optional[UUID] = None,
+    current_user: user_schemas.User = Depends(get_current_user)
+):
+    """Server-Sent Events stream of new attacks on the user's honeypots"""
+    subscription = await subscribe(current_user.id, honeypot_id)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not subscription.closed:
+                batch = await subscription.next_batch(timeout=settings.STREAM_HEARTBEAT)
+                if batch:
+                    yield "".join(f"event: attack\ndata: {payload}\n\n" for payload in batch)
+                elif not subscription.closed:
+                    yield ": keepalive\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/attacks/ws")
+async def stream_attacks_websocket(
+    websocket: WebSocket,
+    token: str = Query(...),
+    honeypot_id: Optional[UUID] = None
+):
+    """WebSocket stream of new attacks; browsers can't set headers, so the token comes as a query parameter"""
+    try:
+        current_user = await authenticate(token)
+        subscription = await subscribe(current_user.id, honeypot_id)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail)[:120])
+        return
+
+    async def watch_disconnect():
+        # Clients only listen; a receive returns when they go away
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            subscription.close()
+
+    await websocket.accept()
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        while True:
+            batch = await subscription.next_batch(timeout=settings.STREAM_HEARTBEAT)
+            if watcher.done():
+                break  # Client went away
+            if batch:
+                # Events in one frame as a JSON array, so bursts cost one send
+                await websocket.send_text(f'{{"type":"attacks","attacks":[{",".join(batch)}]}}')
+            elif not subscription.closed:
+                await websocket.send_text('{"type":"keepalive"}')
+            if subscription.closed:
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Subscriber fell behind")
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        subscription.close()
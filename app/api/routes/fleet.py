@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Path
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.schemas import fleet as fleet_schemas
+from app.schemas import job as job_schemas
+from app.schemas import user as user_schemas
+from app.services import fleet_service
+from app.services.job_manager import JobConflict
+from app.api.dependencies import get_current_user
+
+router = APIRouter()
+
+@router.get("/status", response_model=List[fleet_schemas.FleetMemberStatus])
+def get_fleet_status(
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: user_schemas.User = Depends(get_current_user)
+):
+    """Container state of every honeypot, without a Docker call per honeypot"""
+    honeypots = fleet_service.select_fleet(db=db, user_id=current_user.id, status=status, type=type)
+    return fleet_service.fleet_statuses(honeypots)
+
+@router.post("/{action}", response_model=job_schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+def run_fleet_action(
+    fleet_in: fleet_schemas.FleetRequest,
+    action: str = Path(..., pattern="^(deploy|redeploy|remove)$"),
+    db: Session = Depends(get_db),
+    current_user: user_schemas.User = Depends(get_current_user)
+):
+    """Deploy, redeploy or remove a set of honeypots; per-honeypot results land in the job result"""
+    honeypots = fleet_service.select_fleet(
+        db=db,
+        user_id=current_user.id,
+        honeypot_ids=fleet_in.honeypot_ids,
+        status=fleet_in.status,
+        type=fleet_in.type
+    )
+    if not honeypots:
+        raise HTTPException(status_code=404, detail="No honeypots matched")
+    
+    try:
+        return fleet_service.queue_fleet_operation(action, honeypots, current_user.id, fleet_in.concurrency)
+    except JobConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
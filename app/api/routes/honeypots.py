@@ -1,14 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from datetime import datetime, timezone
 from typing import List, Optional
 from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
+from app.schemas import attack as attack_schemas
 from app.schemas import honeypot as honeypot_schemas
-from app.services import honeypot_service
+from app.schemas import job as job_schemas
+from app.services import analytics_service, honeypot_service
+from app.services.job_manager import JobConflict, job_manager
 from app.api.dependencies import get_current_user
+from app.api.responses import list_attacks_response
 from app.models.user import User
 
 router = APIRouter()
+async_router = APIRouter()  # Served instead of `router` when DATABASE_ASYNC is enabled
+
+def conflict(e: JobConflict) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+def expose_job(response: Response, honeypot_id: UUID, since: datetime) -> None:
+    """Point the client at the container job queued since `since`, if any"""
+    jobs = job_manager.list(resource_id=honeypot_id)
+    if jobs and jobs[0].created_at >= since:
+        response.headers["X-Job-ID"] = str(jobs[0].id)
 
 @router.post("/", response_model=honeypot_schemas.Honeypot, status_code=status.HTTP_201_CREATED)
 def create_honeypot(
@@ -50,43 +66,190 @@ def get_honeypot(
         raise HTTPException(status_code=404, detail="Honeypot not found")
     return honeypot
 
+@router.get("/{honeypot_id}/stats", response_model=honeypot_schemas.HoneypotStats)
+def get_honeypot_stats(
+    honeypot_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Attack count and approximate distinct attackers for a honeypot"""
+    honeypot = honeypot_service.get_honeypot(db=db, honeypot_id=honeypot_id, user_id=current_user.id)
+    if not honeypot:
+        raise HTTPException(status_code=404, detail="Honeypot not found")
+    return analytics_service.get_honeypot_stats(db=db, honeypot=honeypot, user_id=current_user.id)
+
+@router.get("/{honeypot_id}/attacks", response_model=attack_schemas.AttackPage)
+@async_router.get("/{honeypot_id}/attacks", response_model=attack_schemas.AttackPage)
+def get_honeypot_attacks(
+    honeypot_id: UUID,
+    filters: attack_schemas.AttackFilter = Depends(),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List a honeypot's attacks, newest first, with keyset pagination or NDJSON streaming"""
+    if not honeypot_service.honeypot_exists(db=db, honeypot_id=honeypot_id, user_id=current_user.id):
+        raise HTTPException(status_code=404, detail="Honeypot not found")
+    return list_attacks_response(db, current_user.id, filters, honeypot_id, cursor, limit, format)
+
 @router.put("/{honeypot_id}", response_model=honeypot_schemas.Honeypot)
 def update_honeypot(
     honeypot_id: UUID,
     honeypot_in: honeypot_schemas.HoneypotUpdate,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Update a honeypot"""
+    """Update a honeypot; changes to an active honeypot are applied by a background job"""
+    started = datetime.now(timezone.utc)
     honeypot = honeypot_service.get_honeypot(db=db, honeypot_id=honeypot_id, user_id=current_user.id)
     if not honeypot:
         raise HTTPException(status_code=404, detail="Honeypot not found")
     
-    return honeypot_service.update_honeypot(db=db, honeypot=honeypot, honeypot_in=honeypot_in)
+    try:
+        honeypot = honeypot_service.update_honeypot(db=db, honeypot=honeypot, honeypot_in=honeypot_in)
+    except JobConflict as e:
+        raise conflict(e)
+    expose_job(response, honeypot_id, started)
+    return honeypot
 
 @router.delete("/{honeypot_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_honeypot(
     honeypot_id: UUID,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Delete a honeypot"""
-    success = honeypot_service.delete_honeypot(db=db, honeypot_id=honeypot_id, user_id=current_user.id)
+    """Delete a honeypot; its container is removed by a background job"""
+    started = datetime.now(timezone.utc)
+    try:
+        success = honeypot_service.delete_honeypot(db=db, honeypot_id=honeypot_id, user_id=current_user.id)
+    except JobConflict as e:
+        raise conflict(e)
     if not success:
         raise HTTPException(status_code=404, detail="Honeypot not found")
+    expose_job(response, honeypot_id, started)
 
-@router.post("/{honeypot_id}/deploy", response_model=honeypot_schemas.Honeypot)
+@router.post("/{honeypot_id}/deploy", response_model=job_schemas.Job, status_code=status.HTTP_202_ACCEPTED)
 def deploy_honeypot(
     honeypot_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Deploy a honeypot"""
-    honeypot = honeypot_service.deploy_honeypot(db=db, honeypot_id=honeypot_id, user_id=current_user.id)
+    """Queue a deploy; poll /jobs/{id} for progress"""
+    try:
+        job = honeypot_service.deploy_honeypot(db=db, honeypot_id=honeypot_id, user_id=current_user.id)
+    except JobConflict as e:
+        raise conflict(e)
+    if not job:
+        raise HTTPException(status_code=404, detail="Honeypot not found")
+    
+    return job
+
+@async_router.post("/", response_model=honeypot_schemas.Honeypot, status_code=status.HTTP_201_CREATED)
+async def create_honeypot_async(
+    honeypot_in: honeypot_schemas.HoneypotCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create a new honeypot"""
+    return await honeypot_service.create_honeypot_async(db=db, honeypot_in=honeypot_in, user_id=current_user.id)
+
+@async_router.get("/", response_model=List[honeypot_schemas.Honeypot])
+async def get_honeypots_async(
+    status: Optional[str] = None,
+    type: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get all honeypots for the current user"""
+    return await honeypot_service.get_honeypots_async(
+        db=db,
+        user_id=current_user.id,
+        skip=skip,
+        limit=limit,
+        status=status,
+        type=type
+    )
+
+@async_router.get("/{honeypot_id}", response_model=honeypot_schemas.Honeypot)
+async def get_honeypot_async(
+    honeypot_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a specific honeypot"""
+    honeypot = await honeypot_service.get_honeypot_async(db=db, honeypot_id=honeypot_id, user_id=current_user.id)
+    if not honeypot:
+        raise HTTPException(status_code=404, detail="Honeypot not found")
+    return honeypot
+
+@async_router.get("/{honeypot_id}/stats", response_model=honeypot_schemas.HoneypotStats)
+async def get_honeypot_stats_async(
+    honeypot_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Attack count and approximate distinct attackers for a honeypot"""
+    honeypot = await honeypot_service.get_honeypot_async(db=db, honeypot_id=honeypot_id, user_id=current_user.id)
+    if not honeypot:
+        raise HTTPException(status_code=404, detail="Honeypot not found")
+    return await analytics_service.get_honeypot_stats_async(db=db, honeypot=honeypot, user_id=current_user.id)
+
+@async_router.put("/{honeypot_id}", response_model=honeypot_schemas.Honeypot)
+async def update_honeypot_async(
+    honeypot_id: UUID,
+    honeypot_in: honeypot_schemas.HoneypotUpdate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Update a honeypot; changes to an active honeypot are applied by a background job"""
+    started = datetime.now(timezone.utc)
+    honeypot = await honeypot_service.get_honeypot_async(db=db, honeypot_id=honeypot_id, user_id=current_user.id)
     if not honeypot:
         raise HTTPException(status_code=404, detail="Honeypot not found")
     
-    if honeypot.status == "error":
-        raise HTTPException(status_code=500, detail="Failed to deploy honeypot")
+    try:
+        honeypot = await honeypot_service.update_honeypot_async(db=db, honeypot=honeypot, honeypot_in=honeypot_in)
+    except JobConflict as e:
+        raise conflict(e)
+    expose_job(response, honeypot_id, started)
+    return honeypot
+
+@async_router.delete("/{honeypot_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_honeypot_async(
+    honeypot_id: UUID,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete a honeypot; its container is removed by a background job"""
+    started = datetime.now(timezone.utc)
+    try:
+        success = await honeypot_service.delete_honeypot_async(db=db, honeypot_id=honeypot_id, user_id=current_user.id)
+    except JobConflict as e:
+        raise conflict(e)
+    if not success:
+        raise HTTPException(status_code=404, detail="Honeypot not found")
+    expose_job(response, honeypot_id, started)
+
+@async_router.post("/{honeypot_id}/deploy", response_model=job_schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+async def deploy_honeypot_async(
+    honeypot_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue a deploy; poll /jobs/{id} for progress"""
+    try:
+        job = await honeypot_service.deploy_honeypot_async(db=db, honeypot_id=honeypot_id, user_id=current_user.id)
+    except JobConflict as e:
+        raise conflict(e)
+    if not job:
+        raise HTTPException(status_code=404, detail="Honeypot not found")
     
-    return honeypot
\ No newline at end of file
+    return job
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from uuid import UUID
+from app.schemas import job as job_schemas
+from app.schemas import user as user_schemas
+from app.services.job_manager import job_manager
+from app.api.dependencies import get_current_user
+
+router = APIRouter()
+
+@router.get("/", response_model=List[job_schemas.Job])
+def get_jobs(
+    honeypot_id: Optional[UUID] = None,
+    current_user: user_schemas.User = Depends(get_current_user)
+):
+    """List recent container jobs for the current user, newest first"""
+    return job_manager.list(owner_id=current_user.id, resource_id=honeypot_id)
+
+@router.get("/{job_id}", response_model=job_schemas.Job)
+def get_job(
+    job_id: UUID,
+    current_user: user_schemas.User = Depends(get_current_user)
+):
+    """Get the status and progress of a container job"""
+    job = job_manager.get(job_id)
+    if not job or job.owner_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,15 +1,45 @@
+import os
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Dict, Any
 from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db, get_db
 from app.schemas import simulation as simulation_schemas
-from app.services import simulation_service
+from app.services import honeypot_service, simulation_service
+from app.services.scenario import scenario_path
 from app.api.dependencies import get_current_user
 from app.models.user import User
 from app.models.simulation import Simulation
 
 router = APIRouter()
+async_router = APIRouter()  # Served instead of `router` when DATABASE_ASYNC is enabled
+
+def require_sharded() -> None:
+    """Pause, resume, cancel and traffic mode need the shard scheduler; the other modes only write rows"""
+    if settings.SIMULATION_MODE != "sharded":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Simulation control requires SIMULATION_MODE=sharded")
+
+def check_options(simulation_in: simulation_schemas.SimulationCreate) -> None:
+    """Traffic mode and scenario replays need the shard scheduler, and the scenario has to exist"""
+    scenario = simulation_in.options.scenario
+    if simulation_in.mode == "traffic" or scenario:
+        require_sharded()
+    if scenario:
+        try:
+            path = scenario_path(scenario)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not os.path.isfile(path):
+            raise HTTPException(status_code=400, detail="Scenario not found")
+
+def check_target(simulation_in: simulation_schemas.SimulationCreate, honeypot) -> None:
+    """Simulations only target the caller's own honeypots, and traffic only active ones"""
+    if honeypot is None:
+        raise HTTPException(status_code=404, detail="Honeypot not found")
+    if simulation_in.mode == "traffic" and honeypot.status != "active":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Traffic mode needs an active honeypot")
 
 @router.post("/", response_model=simulation_schemas.Simulation, status_code=status.HTTP_201_CREATED)
 def create_simulation(
@@ -18,6 +48,10 @@ def create_simulation(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new simulation"""
+    check_options(simulation_in)
+    check_target(simulation_in, honeypot_service.get_honeypot(
+        db=db, honeypot_id=simulation_in.target_honeypot_id, user_id=current_user.id
+    ))
     return simulation_service.create_simulation(db=db, simulation_in=simulation_in, user_id=current_user.id)
 
 @router.get("/", response_model=List[simulation_schemas.Simulation])
@@ -42,7 +76,20 @@ def get_simulation(
         raise HTTPException(status_code=404, detail="Simulation not found")
     return simulation
 
+@router.get("/{simulation_id}/progress", response_model=simulation_schemas.SimulationProgress)
+def get_simulation_progress(
+    simulation_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Attacks emitted so far, elapsed time and current rate of a simulation"""
+    simulation = simulation_service.get_simulation(db=db, simulation_id=simulation_id, user_id=current_user.id)
+    if not simulation:
+        raise HTTPException(status_code=404, detail="Simulation not found")
+    return simulation_service.simulation_progress(simulation)
+
 @router.put("/{simulation_id}/status")
+@async_router.put("/{simulation_id}/status")
 def update_simulation_status(
     simulation_id: UUID,
     update: Dict[str, Any],
@@ -55,10 +102,10 @@ def update_simulation_status(
     if not simulation:
         raise HTTPException(status_code=404, detail="Simulation not found")
     
-    simulation_update = simulation_schemas.SimulationUpdate(
-        status=update.get("status"),
-        results=update.get("results")
-    )
+    simulation_update = simulation_schemas.SimulationUpdate(**{
+        field: value for field, value in update.items()
+        if field in simulation_schemas.SimulationUpdate.model_fields
+    })
     
     return simulation_service.update_simulation(db=db, simulation=simulation, simulation_in=simulation_update)
 
@@ -73,4 +120,142 @@ def start_simulation(
     if not simulation:
         raise HTTPException(status_code=404, detail="Simulation not found or invalid status")
     
-    return simulation
\ No newline at end of file
+    return simulation
+
+@router.post("/{simulation_id}/pause", response_model=simulation_schemas.Simulation)
+def pause_simulation(
+    simulation_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Pause a running simulation"""
+    require_sharded()
+    simulation = simulation_service.pause_simulation(db=db, simulation_id=simulation_id, user_id=current_user.id)
+    if not simulation:
+        raise HTTPException(status_code=404, detail="Simulation not found or invalid status")
+    return simulation
+
+@router.post("/{simulation_id}/resume", response_model=simulation_schemas.Simulation)
+def resume_simulation(
+    simulation_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Resume a paused simulation"""
+    require_sharded()
+    simulation = simulation_service.resume_simulation(db=db, simulation_id=simulation_id, user_id=current_user.id)
+    if not simulation:
+        raise HTTPException(status_code=404, detail="Simulation not found or invalid status")
+    return simulation
+
+@router.post("/{simulation_id}/cancel", response_model=simulation_schemas.Simulation)
+def cancel_simulation(
+    simulation_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Cancel a simulation that hasn't finished"""
+    require_sharded()
+    simulation = simulation_service.cancel_simulation(db=db, simulation_id=simulation_id, user_id=current_user.id)
+    if not simulation:
+        raise HTTPException(status_code=404, detail="Simulation not found or invalid status")
+    return simulation
+
+@async_router.post("/", response_model=simulation_schemas.Simulation, status_code=status.HTTP_201_CREATED)
+async def create_simulation_async(
+    simulation_in: simulation_schemas.SimulationCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create a new simulation"""
+    check_options(simulation_in)
+    check_target(simulation_in, await honeypot_service.get_honeypot_async(
+        db=db, honeypot_id=simulation_in.target_honeypot_id, user_id=current_user.id
+    ))
+    return await simulation_service.create_simulation_async(db=db, simulation_in=simulation_in, user_id=current_user.id)
+
+@async_router.get("/", response_model=List[simulation_schemas.Simulation])
+async def get_simulations_async(
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get all simulations for the current user"""
+    return await simulation_service.get_simulations_async(db=db, user_id=current_user.id, skip=skip, limit=limit)
+
+@async_router.get("/{simulation_id}", response_model=simulation_schemas.Simulation)
+async def get_simulation_async(
+    simulation_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a specific simulation"""
+    simulation = await simulation_service.get_simulation_async(db=db, simulation_id=simulation_id, user_id=current_user.id)
+    if not simulation:
+        raise HTTPException(status_code=404, detail="Simulation not found")
+    return simulation
+
+@async_router.post("/{simulation_id}/start", response_model=simulation_schemas.Simulation)
+async def start_simulation_async(
+    simulation_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Start a simulation"""
+    simulation = await simulation_service.start_simulation_async(db=db, simulation_id=simulation_id, user_id=current_user.id)
+    if not simulation:
+        raise HTTPException(status_code=404, detail="Simulation not found or invalid status")
+    
+    return simulation
+
+@async_router.get("/{simulation_id}/progress", response_model=simulation_schemas.SimulationProgress)
+async def get_simulation_progress_async(
+    simulation_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Attacks emitted so far, elapsed time and current rate of a simulation"""
+    simulation = await simulation_service.get_simulation_async(db=db, simulation_id=simulation_id, user_id=current_user.id)
+    if not simulation:
+        raise HTTPException(status_code=404, detail="Simulation not found")
+    return simulation_service.simulation_progress(simulation)
+
+@async_router.post("/{simulation_id}/pause", response_model=simulation_schemas.Simulation)
+async def pause_simulation_async(
+    simulation_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Pause a running simulation"""
+    require_sharded()
+    simulation = await simulation_service.pause_simulation_async(db=db, simulation_id=simulation_id, user_id=current_user.id)
+    if not simulation:
+        raise HTTPException(status_code=404, detail="Simulation not found or invalid status")
+    return simulation
+
+@async_router.post("/{simulation_id}/resume", response_model=simulation_schemas.Simulation)
+async def resume_simulation_async(
+    simulation_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Resume a paused simulation"""
+    require_sharded()
+    simulation = await simulation_service.resume_simulation_async(db=db, simulation_id=simulation_id, user_id=current_user.id)
+    if not simulation:
+        raise HTTPException(status_code=404, detail="Simulation not found or invalid status")
+    return simulation
+
+@async_router.post("/{simulation_id}/cancel", response_model=simulation_schemas.Simulation)
+async def cancel_simulation_async(
+    simulation_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Cancel a simulation that hasn't finished"""
+    require_sharded()
+    simulation = await simulation_service.cancel_simulation_async(db=db, simulation_id=simulation_id, user_id=current_user.id)
+    if not simulation:
+        raise HTTPException(status_code=404, detail="Simulation not found or invalid status")
+    return simulation
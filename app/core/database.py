@@ -1,23 +1,62 @@
 from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
 from .config import settings
 
+def connect_args(url: str) -> dict:
+    """Driver options: SSL for Postgres (required by Neon), cross-thread use for SQLite"""
+    backend = make_url(url).get_backend_name()
+    if backend == "postgresql":
+        return {"sslmode": settings.DATABASE_SSLMODE}
+    if backend == "sqlite":
+        return {"check_same_thread": False}
+    return {}
+
 # Create SQLAlchemy engine with optimized pooling for Neon
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_size=5,
-    max_overflow=10,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     pool_recycle=1800,  # Recycle connections every 30 minutes
     pool_pre_ping=True,  # Check connection validity before use
-    connect_args={"sslmode": "require"},  # Required for Neon PostgreSQL
+    connect_args=connect_args(settings.DATABASE_URL),
     poolclass=QueuePool
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def async_database_url(url: str):
+    """DATABASE_URL rewritten for asyncpg, which takes SSL settings as connect args"""
+    url = make_url(url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg").difference_update_query(["sslmode"])
+    return url
+
+# Async engine for the API routes, only created when DATABASE_ASYNC is enabled
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+        connect_args={"ssl": settings.DATABASE_SSLMODE}
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+@compiles(UUID, "sqlite")
+def sqlite_uuid(type_, compiler, **kw):
+    """SQLite (local runs and benchmarks) keeps the models' UUIDs as 32-character hex"""
+    return "CHAR(32)"
+
 # Create base class for models
 Base = declarative_base()
 
@@ -27,4 +66,26 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency for an async database session (DATABASE_ASYNC)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pool_stats() -> dict:
+    """Connection pool usage for the active engines"""
+    stats = {"mode": "async" if settings.DATABASE_ASYNC else "sync", "sync_pool": engine.pool.status()}
+    if async_engine is not None:
+        stats["async_pool"] = async_engine.pool.status()
+    return stats
+
+def dialect_insert(bind, table):
+    """INSERT construct with ON CONFLICT support for the bound dialect"""
+    if bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif bind.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {bind.dialect.name}")
+    return insert(table)
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from jwt.algorithms import RSAAlgorithm
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSKeyStore:
+    """Process-wide cache of parsed JWKS public keys indexed by kid.
+
+    Keys are fetched from `url` (or read from `path` when set, which allows
+    offline testing) and kept for `ttl` seconds. A background task refreshes
+    them before they expire, and a token signed with an unknown kid triggers
+    at most one refetch no matter how many requests are waiting on it.
+    """
+
+    def __init__(self, url: str = "", path: str = "", ttl: int = 3600, min_refresh_interval: int = 30):
+        self.url = url
+        self.path = path
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at: Optional[float] = None
+        self._last_attempt: Optional[float] = None
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def get_key(self, kid: str) -> Optional[Any]:
+        """Return the public key for `kid`, refetching the JWKS only when needed"""
+        generation = self._generation
+        if self._is_stale() and self._can_attempt():
+            await self.refresh(generation)
+
+        key = self._keys.get(kid)
+        if key is None and self._can_attempt():
+            # The signing key may have been rotated since our last fetch
+            await self.refresh(generation)
+            key = self._keys.get(kid)
+        return key
+
+    async def refresh(self, seen_generation: Optional[int] = None) -> None:
+        """Fetch and parse the JWKS document (single-flight)"""
+        async with self._lock:
+            # Another caller already refreshed while we were waiting for the lock
+            if seen_generation is not None and seen_generation != self._generation:
+                return
+
+            self._last_attempt = time.monotonic()
+            self._generation += 1
+            try:
+                jwks = await self._fetch()
+            except Exception as e:
+                logger.error(f"Failed to fetch JWKS: {str(e)}")
+                return
+
+            keys = self._parse(jwks)
+            if not keys:
+                logger.error("JWKS document contained no usable RSA keys")
+                return
+
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+            logger.info(f"Loaded {len(keys)} JWKS key(s)")
+
+    async def start(self) -> None:
+        """Load the keys and start the background refresh task"""
+        await self.refresh()
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Stop the background refresh task"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            # Refresh ahead of expiry so requests never have to wait on a fetch
+            await asyncio.sleep(max(self.ttl * 0.8, self.min_refresh_interval))
+            await self.refresh()
+
+    def _is_stale(self) -> bool:
+        return self._fetched_at is None or time.monotonic() - self._fetched_at >= self.ttl
+
+    def _can_attempt(self) -> bool:
+        return self._last_attempt is None or time.monotonic() - self._last_attempt >= self.min_refresh_interval
+
+    async def _fetch(self) -> Dict[str, Any]:
+        if self.path:
+            with open(self.path) as f:
+                return json.load(f)
+
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(self.url)
+            response.raise_for_status()
+            return response.json()
+
+    @staticmethod
+    def _parse(jwks: Dict[str, Any]) -> Dict[str, Any]:
+        keys = {}
+        for jwk in jwks.get("keys", []):
+            kid = jwk.get("kid")
+            if not kid or jwk.get("kty") != "RSA":
+                continue
+            try:
+                keys[kid] = RSAAlgorithm.from_jwk(json.dumps(jwk))
+            except Exception as e:
+                logger.warning(f"Skipping invalid JWK {kid}: {str(e)}")
+        return keys
+
+
+jwks_store = JWKSKeyStore(
+    url=settings.CLERK_JWKS_URL,
+    path=settings.CLERK_JWKS_FILE,
+    ttl=settings.JWKS_CACHE_TTL,
+    min_refresh_interval=settings.JWKS_MIN_REFRESH_INTERVAL
+)
@@ -0,0 +1,123 @@
+import math
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, List
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return 0.0
+    rank = int(round(pct / 100 * (len(sorted_samples) - 1)))
+    return sorted_samples[min(max(rank, 0), len(sorted_samples) - 1)]
+
+
+def summarize_latencies(samples: Iterable[float]) -> Dict[str, float]:
+    """Count, mean, p50, p95, p99 and max of latency samples in milliseconds"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": round(percentile(ordered, 50), 3),
+        "p95": round(percentile(ordered, 95), 3),
+        "p99": round(percentile(ordered, 99), 3),
+        "max": round(ordered[-1], 3)
+    }
+
+
+class LatencyTracker:
+    """Thread-safe window of the most recent latency samples"""
+
+    def __init__(self, maxlen: int = 10000):
+        self._samples = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, milliseconds: float) -> None:
+        with self._lock:
+            self._samples.append(milliseconds)
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            samples = list(self._samples)
+        return summarize_latencies(samples)
+
+
+class LatencyHistogram:
+    """Mergeable latency histogram with log-spaced buckets.
+
+    Buckets grow by `growth`, so a percentile read from the histogram is
+    within half a bucket (about 2.5% by default) of the exact value, and
+    histograms from separate processes add up to the histogram of the
+    combined samples, which percentiles computed per process don't.
+    """
+
+    def __init__(self, growth: float = 1.05, minimum: float = 0.01):
+        self.growth = growth
+        self.minimum = minimum
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, milliseconds: float) -> None:
+        index = 0 if milliseconds <= self.minimum else int(math.log(milliseconds / self.minimum, self.growth)) + 1
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += milliseconds
+        self.max = max(self.max, milliseconds)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct: float) -> float:
+        """Nearest-rank percentile, as the geometric middle of its bucket"""
+        if not self.count:
+            return 0.0
+        rank = int(round(pct / 100 * (self.count - 1)))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                if index == 0:
+                    return self.minimum
+                return min(self.minimum * self.growth ** (index - 0.5), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Same keys as summarize_latencies"""
+        if not self.count:
+            return summarize_latencies([])
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3),
+            "p50": round(self.percentile(50), 3),
+            "p95": round(self.percentile(95), 3),
+            "p99": round(self.percentile(99), 3),
+            "max": round(self.max, 3)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe form, e.g. for a checkpoint's stats"""
+        return {
+            "growth": self.growth,
+            "minimum": self.minimum,
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+            "count": self.count,
+            "total": self.total,
+            "max": self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls(data.get("growth", 1.05), data.get("minimum", 0.01))
+        histogram.buckets = {int(index): count for index, count in data.get("buckets", {}).items()}
+        histogram.count = data.get("count", 0)
+        histogram.total = data.get("total", 0.0)
+        histogram.max = data.get("max", 0.0)
+        return histogram
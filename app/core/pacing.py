@@ -0,0 +1,30 @@
+import math
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Admits work at `rate` per second, letting up to `capacity` tokens build up"""
+
+    def __init__(self, rate: float, capacity: float, tokens: float = 0.0, now: Optional[float] = None):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = min(max(tokens, 0.0), self.capacity)
+        self.updated = time.monotonic() if now is None else now
+
+    def take(self, now: float, limit: int, round_up: bool = False) -> int:
+        """Remove and return the whole tokens available now, at most `limit`.
+
+        `round_up` also hands out a final token that is more than half full.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        count = max(0, min(int(self.tokens + 0.5 if round_up else self.tokens), limit))
+        self.tokens -= count
+        return count
+
+    def wait_time(self) -> float:
+        """Seconds until the next whole token"""
+        if self.rate <= 0:
+            return math.inf
+        return max(0.0, (1 - self.tokens) / self.rate)
@@ -0,0 +1,119 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set
+
+from app.core.config import settings
+
+
+@dataclass
+class CachedToken:
+    claims: Dict[str, Any]
+    user: Any
+    expires_at: float
+
+
+class VerifiedTokenCache:
+    """Bounded LRU cache of verified bearer tokens.
+
+    Entries are keyed by a SHA-256 digest of the raw token, so tokens are
+    never kept in memory, and live until the token's `exp` claim or
+    `max_ttl` seconds, whichever comes first.
+    """
+
+    def __init__(self, maxsize: int = 1024, max_ttl: int = 300):
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[str, CachedToken]" = OrderedDict()
+        self._by_clerk_id: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[CachedToken]:
+        """Return the cached entry for a token, or None on a miss or expiry"""
+        key = self.digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry.expires_at <= time.time():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, token: str, claims: Dict[str, Any], user: Any) -> None:
+        """Cache the verified claims and resolved user for a token"""
+        expires_at = time.time() + self.max_ttl
+        if claims.get("exp"):
+            expires_at = min(expires_at, float(claims["exp"]))
+
+        if self.maxsize <= 0 or expires_at <= time.time():
+            return
+
+        key = self.digest(token)
+        clerk_id = claims.get("sub")
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = CachedToken(claims=claims, user=user, expires_at=expires_at)
+            self._by_clerk_id.setdefault(clerk_id, set()).add(key)
+
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, clerk_id: str) -> int:
+        """Drop every cached token belonging to a user"""
+        with self._lock:
+            keys = self._by_clerk_id.pop(clerk_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_clerk_id.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        clerk_id = entry.claims.get("sub")
+        keys = self._by_clerk_id.get(clerk_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_clerk_id[clerk_id]
+
+
+token_cache = VerifiedTokenCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    max_ttl=settings.TOKEN_CACHE_MAX_TTL
+)
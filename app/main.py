@@ -1,7 +1,22 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.api.routes import auth, honeypots, simulations, analytics
+from app.core.jwks import jwks_store
+from app.core.token_cache import token_cache
+from app.services.attack_writer import attack_writer
+from app.services.attack_simulator import bind_event_loop
+from app.services.partition_service import partition_maintainer
+from app.services.job_manager import job_manager
+from app.services.docker_provider import docker_provider
+from app.services.event_broker import attack_broker
+from app.services.heavy_hitters import heavy_hitters
+from app.services.log_collector import log_collector
+from app.services.reconciler import container_reconciler
+from app.services.simulation_scheduler import simulation_scheduler
+from app.services.warm_pool import warm_pool
+from app.core.database import async_engine, pool_stats
+from app.api.routes import auth, honeypots, simulations, analytics, attacks, jobs, fleet, events
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -18,11 +33,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def database_router(module):
+    """The async variant of a route module when DATABASE_ASYNC is enabled"""
+    return module.async_router if settings.DATABASE_ASYNC else module.router
+
 # Include routers
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["authentication"])
-app.include_router(honeypots.router, prefix=f"{settings.API_V1_STR}/honeypots", tags=["honeypots"])
-app.include_router(simulations.router, prefix=f"{settings.API_V1_STR}/simulations", tags=["simulations"])
-app.include_router(analytics.router, prefix=f"{settings.API_V1_STR}/analytics", tags=["analytics"])
+app.include_router(database_router(honeypots), prefix=f"{settings.API_V1_STR}/honeypots", tags=["honeypots"])
+app.include_router(database_router(simulations), prefix=f"{settings.API_V1_STR}/simulations", tags=["simulations"])
+app.include_router(database_router(analytics), prefix=f"{settings.API_V1_STR}/analytics", tags=["analytics"])
+app.include_router(attacks.router, prefix=f"{settings.API_V1_STR}/attacks", tags=["attacks"])
+app.include_router(jobs.router, prefix=f"{settings.API_V1_STR}/jobs", tags=["jobs"])
+app.include_router(fleet.router, prefix=f"{settings.API_V1_STR}/fleet", tags=["fleet"])
+app.include_router(events.router, prefix=f"{settings.API_V1_STR}/events", tags=["events"])
+
+@app.on_event("startup")
+async def start_background_services():
+    await jwks_store.start()
+    if settings.HEAVY_HITTERS_BACKFILL:
+        # Finish before the writers below feed live attacks, which the replay would count again
+        await asyncio.to_thread(heavy_hitters.run_backfill)
+    attack_writer.start()
+    bind_event_loop(asyncio.get_running_loop())
+    partition_maintainer.start()
+    warm_pool.start()
+    container_reconciler.start()
+    log_collector.start()
+    simulation_scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_background_services():
+    await jwks_store.stop()
+    attack_writer.stop()
+    partition_maintainer.stop()
+    job_manager.shutdown()
+    warm_pool.stop()
+    container_reconciler.stop()
+    log_collector.stop()
+    simulation_scheduler.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 @app.get("/")
 def read_root():
@@ -32,6 +82,26 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/docker")
+def docker_health_check():
+    """Ping the Docker daemon; the API keeps serving when it is unavailable"""
+    return docker_provider.health()
+
+@app.get("/metrics")
+def get_metrics():
+    return {
+        "token_cache": token_cache.stats(),
+        "attack_writer": attack_writer.stats(),
+        "database": pool_stats(),
+        "jobs": job_manager.stats(),
+        "warm_pool": warm_pool.stats(),
+        "reconciler": container_reconciler.stats(),
+        "log_collector": log_collector.stats(),
+        "event_stream": attack_broker.stats(),
+        "heavy_hitters": heavy_hitters.stats(),
+        "simulations": simulation_scheduler.stats()
+    }
+
 # If this file is run directly, start the uvicorn server
 if __name__ == "__main__":
     import uvicorn
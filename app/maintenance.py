@@ -0,0 +1,130 @@
+"""Database maintenance commands.
+
+Usage:
+    python -m app.maintenance create-tables
+    python -m app.maintenance rebuild-rollups
+    python -m app.maintenance migrate-partitions [--drop-legacy]
+    python -m app.maintenance maintain-partitions
+    python -m app.maintenance cascade-attack-deletes
+    python -m app.maintenance add-simulation-modes
+    python -m app.maintenance collect-logs --honeypot-id ID --type SSH DIRECTORY
+    python -m app.maintenance record-scenario [--since ISO] [--until ISO] [--profile SECONDS] OUTPUT
+"""
+import argparse
+import logging
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+from sqlalchemy import inspect, text
+from app.core.database import Base, engine
+from app.models import init as models  # noqa: F401 - registers every model on Base
+from app.core.config import settings
+from app.services import rollup_service, partition_service, log_collector, scenario
+
+logger = logging.getLogger(__name__)
+
+def create_tables(args: argparse.Namespace) -> None:
+    """Create any tables that don't exist yet"""
+    Base.metadata.create_all(bind=engine)
+    # A freshly created partitioned attacks table needs partitions before it accepts rows
+    partition_service.run_partition_maintenance()
+    logger.info("Tables created")
+
+def rebuild_rollups(args: argparse.Namespace) -> None:
+    """Recompute the attack rollups and honeypot attack counts from the raw attacks table"""
+    with engine.begin() as conn:
+        rollup_service.rebuild_rollups(conn)
+    logger.info("Attack rollups rebuilt")
+
+def migrate_partitions(args: argparse.Namespace) -> None:
+    """Convert the attacks table to time-range partitions (PostgreSQL)"""
+    with engine.begin() as conn:
+        partition_service.migrate_to_partitioned(conn, drop_legacy=args.drop_legacy)
+    logger.info("Attacks table partitioned")
+
+def maintain_partitions(args: argparse.Namespace) -> None:
+    """Create upcoming attack partitions and apply retention"""
+    partition_service.run_partition_maintenance()
+
+def cascade_attack_deletes(args: argparse.Namespace) -> None:
+    """Make deleting a honeypot cascade to its attacks in the database (PostgreSQL)"""
+    if engine.dialect.name != "postgresql":
+        logger.info("Nothing to do on this database")
+        return
+    with engine.begin() as conn:
+        conn.execute(text(
+            "ALTER TABLE attacks DROP CONSTRAINT IF EXISTS attacks_honeypot_id_fkey, "
+            "ADD CONSTRAINT attacks_honeypot_id_fkey FOREIGN KEY (honeypot_id) "
+            "REFERENCES honeypots (id) ON DELETE CASCADE"
+        ))
+    logger.info("Attack deletes now cascade from honeypots")
+
+def add_simulation_modes(args: argparse.Namespace) -> None:
+    """Add the mode and options columns of traffic simulations to an existing simulations table"""
+    existing = {column["name"] for column in inspect(engine).get_columns("simulations")}
+    columns = {"mode": "VARCHAR DEFAULT 'records'", "options": "JSON DEFAULT '{}'"}
+    with engine.begin() as conn:
+        for name, definition in columns.items():
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE simulations ADD COLUMN {name} {definition}"))
+    logger.info("Simulations table has mode and options columns")
+
+def collect_logs(args: argparse.Namespace) -> None:
+    """Ingest a directory of honeypot log files once, e.g. fixtures or a copied volume"""
+    totals = log_collector.collect_directory(
+        UUID(args.honeypot_id), args.type, args.directory, args.pattern, settings.LOG_COLLECT_BATCH
+    )
+    logger.info(f"Read {totals['lines']} lines from {totals['files']} file(s), stored {totals['attacks']} attacks, skipped {totals['skipped']} malformed events")
+
+def record_scenario(args: argparse.Namespace) -> None:
+    """Record stored attacks as a scenario file that simulations can replay"""
+    until = rollup_service.as_utc(datetime.fromisoformat(args.until)) if args.until else datetime.now(timezone.utc)
+    since = rollup_service.as_utc(datetime.fromisoformat(args.since)) if args.since else until - timedelta(hours=24)
+    honeypot_id = UUID(args.honeypot_id) if args.honeypot_id else None
+    with engine.connect() as conn, scenario.open_scenario(args.output, "w") as out:
+        if args.profile:
+            count = scenario.record_profile(
+                conn, out, since, until, honeypot_id, args.name, bucket_seconds=args.profile, capacity=args.capacity
+            )
+        else:
+            count = scenario.record_events(conn, out, since, until, honeypot_id, args.name)
+    logger.info(f"Recorded {count} attacks from {since.isoformat()} to {until.isoformat()} in {args.output}")
+
+COMMANDS = {
+    "create-tables": create_tables,
+    "rebuild-rollups": rebuild_rollups,
+    "migrate-partitions": migrate_partitions,
+    "maintain-partitions": maintain_partitions,
+    "cascade-attack-deletes": cascade_attack_deletes,
+    "add-simulation-modes": add_simulation_modes,
+    "collect-logs": collect_logs,
+    "record-scenario": record_scenario,
+}
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Honeypot Orchestrator database maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, command in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=command.__doc__)
+        if name == "migrate-partitions":
+            subparser.add_argument("--drop-legacy", action="store_true", help="Drop the old table after copying")
+        elif name == "collect-logs":
+            subparser.add_argument("--honeypot-id", required=True)
+            subparser.add_argument("--type", required=True, help="Honeypot type: SSH, FTP or Web")
+            subparser.add_argument("--pattern", default=settings.HONEYPOT_LOG_GLOB)
+            subparser.add_argument("directory")
+        elif name == "record-scenario":
+            subparser.add_argument("--since", help="ISO timestamp; defaults to 24 hours before --until")
+            subparser.add_argument("--until", help="ISO timestamp; defaults to now")
+            subparser.add_argument("--honeypot-id")
+            subparser.add_argument("--name", default="")
+            subparser.add_argument("--profile", type=int, metavar="SECONDS",
+                                   help="Summarize into segments of this length instead of recording every attack")
+            subparser.add_argument("--capacity", type=int, default=1000, help="Values kept per pool or dictionary with --profile")
+            subparser.add_argument("output", help="Scenario file; gzip-compressed if it ends in .gz")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    COMMANDS[args.command](args)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Text, JSON
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Text, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -8,16 +8,26 @@ from sqlalchemy import Boolean
 
 class Attack(Base):
     __tablename__ = "attacks"
+    __table_args__ = (
+        # Recent-attack and keyset listing per honeypot
+        Index("ix_attacks_honeypot_timestamp", "honeypot_id", "timestamp", "id"),
+        # Source IP lookups per honeypot
+        Index("ix_attacks_honeypot_source_ip", "honeypot_id", "source_ip", "timestamp"),
+        Index("ix_attacks_simulation_id", "simulation_id"),
+        # Range-partitioned by timestamp on PostgreSQL (see app.services.partition_service)
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    honeypot_id = Column(UUID(as_uuid=True), ForeignKey("honeypots.id"))
+    honeypot_id = Column(UUID(as_uuid=True), ForeignKey("honeypots.id", ondelete="CASCADE"))
     source_ip = Column(String)
     attack_type = Column(String)  # brute-force, sql-injection, etc.
     severity = Column(String)  # low, medium, high
     details = Column(JSON)
     is_simulated = Column(Boolean, default=False)
     simulation_id = Column(UUID(as_uuid=True), ForeignKey("simulations.id"), nullable=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    # Part of the primary key because PostgreSQL requires the partition key in it
+    timestamp = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     
     # Relationships
     honeypot = relationship("Honeypot", back_populates="attacks")
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, BigInteger, ForeignKey, DateTime, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+class AttackHourlyRollup(Base):
+    """Attack counts per honeypot, hour, attack type and severity"""
+    __tablename__ = "attack_rollups_hourly"
+    
+    honeypot_id = Column(UUID(as_uuid=True), ForeignKey("honeypots.id", ondelete="CASCADE"), primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # Start of the hour (UTC)
+    attack_type = Column(String, primary_key=True)
+    severity = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+class AttackSourceCount(Base):
+    """Running attack count per honeypot and source IP"""
+    __tablename__ = "attack_source_counts"
+    
+    honeypot_id = Column(UUID(as_uuid=True), ForeignKey("honeypots.id", ondelete="CASCADE"), primary_key=True)
+    source_ip = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    first_seen = Column(DateTime(timezone=True))
+    last_seen = Column(DateTime(timezone=True))
+
+class AttackDistinctSketch(Base):
+    """HyperLogLog sketch of the distinct source IPs per honeypot and hour"""
+    __tablename__ = "attack_distinct_sketches_hourly"
+
+    honeypot_id = Column(UUID(as_uuid=True), ForeignKey("honeypots.id", ondelete="CASCADE"), primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # Start of the hour (UTC)
+    registers = Column(LargeBinary, nullable=False)  # HyperLogLog.to_bytes()
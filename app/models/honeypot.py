@@ -19,12 +19,20 @@ class Honeypot(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     container_id = Column(String)
     description = Column(Text)
-    attack_count = Column(Integer, default=0)
+    attack_count = Column(Integer, default=0)  # Maintained at ingest (see rollup_service.apply_attack_rows)
     vulnerabilities = Column(JSON, default=[])
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="honeypots")
-    attacks = relationship("Attack", back_populates="honeypot", cascade="all, delete-orphan")
+    # Never loaded implicitly: list attacks through attack_service, and let the
+    # database cascade deletes instead of loading every row first
+    attacks = relationship(
+        "Attack",
+        back_populates="honeypot",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql"
+    )
     simulations = relationship("Simulation", back_populates="target_honeypot")
\ No newline at end of file
@@ -1,4 +1,7 @@
 from app.models.user import User
 from app.models.honeypot import Honeypot
 from app.models.attack import Attack
-from app.models.simulation import Simulation
\ No newline at end of file
+from app.models.simulation import Simulation
+from app.models.attack_rollup import AttackHourlyRollup, AttackSourceCount, AttackDistinctSketch
+from app.models.log_checkpoint import LogCheckpoint
+from app.models.simulation_checkpoint import SimulationCheckpoint
\ No newline at end of file
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, BigInteger, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class LogCheckpoint(Base):
+    """How far the log collector has read one honeypot log file"""
+    __tablename__ = "log_checkpoints"
+    
+    honeypot_id = Column(UUID(as_uuid=True), ForeignKey("honeypots.id", ondelete="CASCADE"), primary_key=True)
+    path = Column(String, primary_key=True)  # Relative to the honeypot's log volume
+    inode = Column(BigInteger, nullable=False)  # A new inode means the file was rotated
+    offset = Column(BigInteger, nullable=False, default=0)  # Bytes consumed, always at a line boundary
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -15,6 +15,8 @@ class Simulation(Base):
     node_count = Column(Integer, default=5)
     duration_minutes = Column(Integer, default=5)
     intensity = Column(Integer, default=5)  # 1-10
+    mode = Column(String, default="records")  # records writes attack rows, traffic connects to the honeypot
+    options = Column(JSON, default={})  # Scenario and traffic settings, see schemas.simulation.SimulationOptions
     status = Column(String, default="pending")  # pending, running, completed, failed
     start_time = Column(DateTime(timezone=True))
     end_time = Column(DateTime(timezone=True))
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Boolean, ForeignKey, DateTime, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+class SimulationCheckpoint(Base):
+    """Progress of one shard of a running simulation, leased to one worker at a time"""
+    __tablename__ = "simulation_checkpoints"
+    
+    simulation_id = Column(UUID(as_uuid=True), ForeignKey("simulations.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    node_count = Column(Integer, nullable=False)  # Virtual nodes handled by this shard
+    target = Column(BigInteger, nullable=False)  # Attacks this shard emits over the whole run
+    emitted = Column(BigInteger, nullable=False, default=0)
+    elapsed = Column(Float, nullable=False, default=0.0)  # Seconds actually spent running, across restarts
+    done = Column(Boolean, nullable=False, default=False)
+    owner = Column(String)  # Worker holding the lease; NULL once released
+    heartbeat_at = Column(DateTime(timezone=True))  # Leases expire SIMULATION_LEASE_SECONDS after this
+    stats = Column(JSON, default={})  # Write latency summary from the last run of this shard
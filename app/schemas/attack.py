@@ -1,5 +1,5 @@
 from pydantic import BaseModel, UUID4
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 class AttackBase(BaseModel):
@@ -12,6 +12,7 @@ class AttackBase(BaseModel):
 class AttackCreate(AttackBase):
     honeypot_id: UUID4
     simulation_id: Optional[UUID4] = None
+    timestamp: Optional[datetime] = None  # Defaults to the time of ingestion
 
 class AttackInDBBase(AttackBase):
     id: UUID4
@@ -24,4 +25,16 @@ class AttackInDBBase(AttackBase):
         from_attributes = True
 
 class Attack(AttackInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+class AttackFilter(BaseModel):
+    attack_type: Optional[str] = None
+    severity: Optional[str] = None
+    source_ip: Optional[str] = None
+    is_simulated: Optional[bool] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+class AttackPage(BaseModel):
+    items: List[Attack]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to fetch the next page
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, UUID4, model_validator
+from typing import Optional, List
+
+class FleetRequest(BaseModel):
+    honeypot_ids: Optional[List[UUID4]] = None  # Omit to select by filters alone; [] selects nothing
+    type: Optional[str] = None
+    status: Optional[str] = None
+    concurrency: Optional[int] = None  # Defaults to FLEET_CONCURRENCY
+
+    @model_validator(mode="after")
+    def require_selection(self) -> "FleetRequest":
+        # An empty body must not mean "every honeypot I own"
+        if self.honeypot_ids is None and self.type is None and self.status is None:
+            raise ValueError("Select honeypots with honeypot_ids, type or status")
+        return self
+
+
+class FleetMemberStatus(BaseModel):
+    honeypot_id: UUID4
+    name: str
+    status: str  # Honeypot.status as stored
+    container_status: str  # Docker state, or not_deployed/unknown
+    container_id: Optional[str] = None
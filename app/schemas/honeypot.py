@@ -39,4 +39,10 @@ class HoneypotInDBBase(HoneypotBase):
         from_attributes = True
 
 class Honeypot(HoneypotInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+class HoneypotStats(BaseModel):
+    honeypot_id: UUID4
+    attack_count: int
+    unique_attackers_24h: int  # HyperLogLog estimates, about 1.6% standard error
+    unique_attackers_7d: int
\ No newline at end of file
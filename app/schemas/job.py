@@ -0,0 +1,18 @@
+from pydantic import BaseModel, UUID4
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+class Job(BaseModel):
+    id: UUID4
+    kind: str  # deploy, update, remove
+    resource_id: UUID4  # The honeypot the job acts on
+    status: str  # queued, running, succeeded, failed
+    progress: float
+    message: str
+    result: Dict[str, Any] = {}
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
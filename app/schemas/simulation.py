@@ -1,4 +1,4 @@
-from pydantic import BaseModel, UUID4
+from pydantic import BaseModel, Field, UUID4
 from typing import Optional, Dict, Any
 from datetime import datetime
 
@@ -8,13 +8,27 @@ class SimulationBase(BaseModel):
     node_count: int = 5
     duration_minutes: int = 5
     intensity: int = 5
+    mode: str = "records"  # records or traffic
+    options: Dict[str, Any] = {}
+
+class SimulationOptions(BaseModel):
+    """Optional settings; unset traffic ones fall back to the TRAFFIC_* settings"""
+    scenario: Optional[str] = None  # File in SCENARIO_DIR to replay instead of the attack type's patterns
+    speed: float = Field(1.0, gt=0, le=10000)  # Replay speed-up
+    concurrency: Optional[int] = Field(None, ge=1, le=1000)  # Client connections across all shards
+    reuse_connections: Optional[bool] = None
+    timeout_seconds: Optional[float] = Field(None, gt=0, le=60)
 
 class SimulationCreate(SimulationBase):
     target_honeypot_id: UUID4
+    mode: str = Field("records", pattern="^(records|traffic)$")
+    options: SimulationOptions = SimulationOptions()
 
 class SimulationUpdate(BaseModel):
     status: Optional[str] = None
     results: Optional[Dict[str, Any]] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
 
 class SimulationInDBBase(SimulationBase):
     id: UUID4
@@ -31,4 +45,15 @@ class SimulationInDBBase(SimulationBase):
         from_attributes = True
 
 class Simulation(SimulationInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+class SimulationProgress(BaseModel):
+    simulation_id: UUID4
+    status: str
+    live: bool  # False when read from the last persisted snapshot or the final results
+    emitted: int
+    target: int
+    percent: float
+    elapsed_seconds: float  # Time spent running, excluding pauses
+    current_rate: float  # Attacks per second over the last few seconds
+    requested_rate: float
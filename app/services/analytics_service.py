@@ -0,0 +1,256 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import BigInteger, Boolean, DateTime, String, cast, func, literal_column, null, select, union_all
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.attack import Attack
+from app.models.attack_rollup import AttackDistinctSketch, AttackHourlyRollup, AttackSourceCount
+from app.models.honeypot import Honeypot
+from app.services.hyperloglog import HyperLogLog
+from app.services.rollup_service import UNKNOWN, as_utc, hour_bucket, next_hour_boundary
+
+# Windows for the distinct-attacker estimates on the summary and per-honeypot stats
+DISTINCT_WINDOWS = {"24h": timedelta(days=1), "7d": timedelta(days=7)}
+
+def user_honeypots(user_id: UUID, honeypot_id: Optional[UUID] = None):
+    """CTE of the honeypot IDs and statuses visible to a user"""
+    query = select(Honeypot.id, Honeypot.status).where(Honeypot.user_id == user_id)
+    if honeypot_id is not None:
+        query = query.where(Honeypot.id == honeypot_id)
+    return query.cte("user_honeypots")
+
+def summary_statement(user_id: UUID, recent_limit: int = 10):
+    """Dashboard summary as a single statement.
+
+    Recent attacks, per-type counts and the active honeypot count come back
+    as one UNION ALL result tagged by a `kind` column. The recent-attacks
+    branch goes first so the compound select takes its column types.
+    """
+    honeypots = user_honeypots(user_id)
+
+    recent = select(
+        Attack.id,
+        Attack.timestamp,
+        Attack.source_ip,
+        Attack.attack_type,
+        Attack.severity,
+        Attack.honeypot_id,
+        Attack.is_simulated
+    ).join(honeypots, honeypots.c.id == Attack.honeypot_id).order_by(
+        Attack.timestamp.desc()
+    ).limit(recent_limit).subquery("recent_attacks")
+
+    no_uuid = cast(null(), PGUUID(as_uuid=True))
+    no_text = cast(null(), String)
+    no_time = cast(null(), DateTime(timezone=True))
+    no_bool = cast(null(), Boolean)
+
+    statement = union_all(
+        select(
+            literal_column("'recent'").label("kind"),
+            recent.c.attack_type,
+            cast(null(), BigInteger).label("count"),
+            recent.c.id,
+            recent.c.timestamp,
+            recent.c.source_ip,
+            recent.c.severity,
+            recent.c.honeypot_id,
+            recent.c.is_simulated
+        ),
+        select(
+            literal_column("'type'"),
+            AttackHourlyRollup.attack_type,
+            cast(func.sum(AttackHourlyRollup.count), BigInteger),
+            no_uuid, no_time, no_text, no_text, no_uuid, no_bool
+        ).join(honeypots, honeypots.c.id == AttackHourlyRollup.honeypot_id).group_by(AttackHourlyRollup.attack_type),
+        select(
+            literal_column("'active'"),
+            no_text,
+            cast(func.count(), BigInteger),
+            no_uuid, no_time, no_text, no_text, no_uuid, no_bool
+        ).select_from(honeypots).where(honeypots.c.status == "active")
+    )
+
+    return statement
+
+def summarize(rows: Iterable[Any], top_limit: int = 5) -> Dict[str, Any]:
+    """Shape the rows of summary_statement into the dashboard payload"""
+    total_attacks = 0
+    active_honeypots = 0
+    type_counts = []
+    recent_attacks = []
+    for row in rows:
+        if row.kind == "recent":
+            recent_attacks.append({
+                "id": str(row.id),
+                "timestamp": row.timestamp,
+                "source_ip": row.source_ip,
+                "attack_type": row.attack_type,
+                "severity": row.severity,
+                "honeypot_id": str(row.honeypot_id),
+                "is_simulated": row.is_simulated
+            })
+        elif row.kind == "type":
+            type_counts.append((row.attack_type, int(row.count)))
+            total_attacks += int(row.count)
+        else:
+            active_honeypots = int(row.count)
+
+    recent_attacks.sort(key=lambda attack: attack["timestamp"], reverse=True)
+    type_counts.sort(key=lambda item: item[1], reverse=True)
+
+    return {
+        "totalAttacks": total_attacks,
+        "activeHoneypots": active_honeypots,
+        "topAttackTypes": [{"type": attack_type, "count": count} for attack_type, count in type_counts[:top_limit]],
+        "recentAttacks": recent_attacks
+    }
+
+def get_summary(db: Session, user_id: UUID, recent_limit: int = 10, top_limit: int = 5) -> Dict[str, Any]:
+    """Dashboard summary plus distinct-attacker estimates, in two round trips"""
+    summary = summarize(db.execute(summary_statement(user_id, recent_limit)), top_limit)
+    distinct = count_distinct(db.execute(sketches_statement(user_id)))
+    summary["uniqueAttackers24h"] = distinct["24h"]
+    summary["uniqueAttackers7d"] = distinct["7d"]
+    return summary
+
+async def get_summary_async(db: AsyncSession, user_id: UUID, recent_limit: int = 10, top_limit: int = 5) -> Dict[str, Any]:
+    """Dashboard summary plus distinct-attacker estimates, in two round trips"""
+    summary = summarize(await db.execute(summary_statement(user_id, recent_limit)), top_limit)
+    distinct = count_distinct(await db.execute(sketches_statement(user_id)))
+    summary["uniqueAttackers24h"] = distinct["24h"]
+    summary["uniqueAttackers7d"] = distinct["7d"]
+    return summary
+
+def sketches_statement(user_id: UUID, honeypot_id: Optional[UUID] = None, now: Optional[datetime] = None):
+    """Hourly distinct-IP sketches covering the longest of DISTINCT_WINDOWS.
+
+    Windows start at the top of the hour, so each covers up to an hour
+    more than its nominal length.
+    """
+    honeypots = user_honeypots(user_id, honeypot_id)
+    since = hour_bucket((now or datetime.now(timezone.utc)) - max(DISTINCT_WINDOWS.values()))
+    return select(AttackDistinctSketch.bucket, AttackDistinctSketch.registers).join(
+        honeypots, honeypots.c.id == AttackDistinctSketch.honeypot_id
+    ).where(AttackDistinctSketch.bucket >= since)
+
+def count_distinct(rows: Iterable[Any], now: Optional[datetime] = None) -> Dict[str, int]:
+    """Estimated distinct source IPs per window, merging the sketches of sketches_statement"""
+    now = now or datetime.now(timezone.utc)
+    starts = {window: hour_bucket(now - length) for window, length in DISTINCT_WINDOWS.items()}
+    selected: Dict[str, List[bytes]] = {window: [] for window in DISTINCT_WINDOWS}
+    for bucket, registers in rows:
+        bucket = as_utc(bucket)
+        for window, start in starts.items():
+            if bucket >= start:
+                selected[window].append(registers)
+    return {window: HyperLogLog.merged(sketches).count() for window, sketches in selected.items()}
+
+def honeypot_stats(honeypot, rows: Iterable[Any]) -> Dict[str, Any]:
+    distinct = count_distinct(rows)
+    return {
+        "honeypot_id": honeypot.id,
+        "attack_count": honeypot.attack_count or 0,
+        "unique_attackers_24h": distinct["24h"],
+        "unique_attackers_7d": distinct["7d"]
+    }
+
+def get_honeypot_stats(db: Session, honeypot, user_id: UUID) -> Dict[str, Any]:
+    """Attack count and distinct-attacker estimates for one of the user's honeypots"""
+    return honeypot_stats(honeypot, db.execute(sketches_statement(user_id, honeypot.id)))
+
+async def get_honeypot_stats_async(db: AsyncSession, honeypot, user_id: UUID) -> Dict[str, Any]:
+    """Attack count and distinct-attacker estimates for one of the user's honeypots"""
+    return honeypot_stats(honeypot, await db.execute(sketches_statement(user_id, honeypot.id)))
+
+def distribution_statement(user_id: UUID, since: datetime, honeypot_id: Optional[UUID] = None):
+    """Attack counts by type since a point in time.
+
+    Whole hours come from the hourly rollup; if `since` falls inside an hour,
+    that partial hour is counted from the raw attacks table in the same
+    statement.
+    """
+    honeypots = user_honeypots(user_id, honeypot_id)
+    boundary = next_hour_boundary(since)
+
+    statement = select(
+        AttackHourlyRollup.attack_type,
+        cast(func.sum(AttackHourlyRollup.count), BigInteger)
+    ).join(
+        honeypots, honeypots.c.id == AttackHourlyRollup.honeypot_id
+    ).where(
+        AttackHourlyRollup.bucket >= boundary
+    ).group_by(AttackHourlyRollup.attack_type)
+
+    if boundary > as_utc(since):
+        statement = union_all(statement, select(
+            Attack.attack_type,
+            cast(func.count(), BigInteger)
+        ).join(
+            honeypots, honeypots.c.id == Attack.honeypot_id
+        ).where(
+            Attack.timestamp >= since,
+            Attack.timestamp < boundary
+        ).group_by(Attack.attack_type))
+
+    return statement
+
+def count_by_type(rows: Iterable[Any]) -> List[Tuple[str, int]]:
+    """Merge rollup and raw-tail counts, most frequent first"""
+    counts = Counter()
+    for attack_type, count in rows:
+        counts[attack_type or UNKNOWN] += int(count)
+    return counts.most_common()
+
+def get_attack_distribution(
+    db: Session,
+    user_id: UUID,
+    since: datetime,
+    honeypot_id: Optional[UUID] = None
+) -> List[Tuple[str, int]]:
+    """Attack counts by type since a point in time, most frequent first"""
+    return count_by_type(db.execute(distribution_statement(user_id, since, honeypot_id)))
+
+async def get_attack_distribution_async(
+    db: AsyncSession,
+    user_id: UUID,
+    since: datetime,
+    honeypot_id: Optional[UUID] = None
+) -> List[Tuple[str, int]]:
+    """Attack counts by type since a point in time, most frequent first"""
+    return count_by_type(await db.execute(distribution_statement(user_id, since, honeypot_id)))
+
+def sources_statement(user_id: UUID, limit: int = 10, honeypot_id: Optional[UUID] = None):
+    """Source IPs with the most attacks across a user's honeypots"""
+    honeypots = user_honeypots(user_id, honeypot_id)
+    total = func.sum(AttackSourceCount.count).label("count")
+    statement = select(AttackSourceCount.source_ip, total).join(
+        honeypots, honeypots.c.id == AttackSourceCount.honeypot_id
+    ).group_by(
+        AttackSourceCount.source_ip
+    ).order_by(
+        total.desc()
+    ).limit(limit)
+    return statement
+
+def get_attack_sources(
+    db: Session,
+    user_id: UUID,
+    limit: int = 10,
+    honeypot_id: Optional[UUID] = None
+) -> List[Tuple[str, int]]:
+    """Source IPs with the most attacks across a user's honeypots"""
+    return [(source_ip, int(count)) for source_ip, count in db.execute(sources_statement(user_id, limit, honeypot_id))]
+
+async def get_attack_sources_async(
+    db: AsyncSession,
+    user_id: UUID,
+    limit: int = 10,
+    honeypot_id: Optional[UUID] = None
+) -> List[Tuple[str, int]]:
+    """Source IPs with the most attacks across a user's honeypots"""
+    rows = await db.execute(sources_statement(user_id, limit, honeypot_id))
+    return [(source_ip, int(count)) for source_ip, count in rows]
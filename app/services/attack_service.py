@@ -0,0 +1,192 @@
+import base64
+import csv
+import io
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.models.attack import Attack
+from app.models.honeypot import Honeypot
+from app.models.simulation import Simulation
+from app.schemas.attack import Attack as AttackSchema, AttackCreate, AttackFilter
+from app.services.event_broker import attack_broker
+from app.services.heavy_hitters import heavy_hitters
+from app.services.rollup_service import apply_attack_rows
+
+logger = logging.getLogger(__name__)
+
+ATTACK_COLUMNS = [
+    "id", "honeypot_id", "source_ip", "attack_type", "severity",
+    "details", "is_simulated", "simulation_id", "timestamp"
+]
+
+def build_attack_rows(attacks: Iterable[AttackCreate]) -> List[Dict[str, Any]]:
+    """Turn validated attacks into rows ready for a bulk insert"""
+    now = datetime.now(timezone.utc)
+    rows = []
+    for attack in attacks:
+        row = attack.model_dump()
+        row["id"] = uuid.uuid4()
+        row["timestamp"] = row["timestamp"] or now
+        rows.append(row)
+    return rows
+
+def filter_known_references(conn: Connection, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop rows pointing at honeypots or simulations that don't exist.
+
+    A single bad foreign key would otherwise abort the whole batch.
+    """
+    honeypot_ids = {row["honeypot_id"] for row in rows}
+    simulation_ids = {row["simulation_id"] for row in rows if row.get("simulation_id")}
+
+    known_honeypots = set(conn.execute(
+        select(Honeypot.id).where(Honeypot.id.in_(honeypot_ids))
+    ).scalars())
+    known_simulations = set()
+    if simulation_ids:
+        known_simulations = set(conn.execute(
+            select(Simulation.id).where(Simulation.id.in_(simulation_ids))
+        ).scalars())
+
+    valid = [
+        row for row in rows
+        if row["honeypot_id"] in known_honeypots
+        and (not row.get("simulation_id") or row["simulation_id"] in known_simulations)
+    ]
+    if len(valid) != len(rows):
+        logger.warning(f"Dropped {len(rows) - len(valid)} attack(s) with unknown honeypot or simulation")
+    return valid
+
+def _copy_attacks(conn: Connection, rows: List[Dict[str, Any]]) -> None:
+    """Stream rows into the attacks table with PostgreSQL COPY"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            "\\N" if row.get(column) is None
+            else json.dumps(row[column]) if column == "details"
+            else row[column].isoformat() if column == "timestamp"
+            else str(row[column]).lower() if column == "is_simulated"
+            else str(row[column])
+            for column in ATTACK_COLUMNS
+        ])
+    buffer.seek(0)
+
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {Attack.__tablename__} ({', '.join(ATTACK_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+def bulk_insert_attacks(conn: Connection, rows: List[Dict[str, Any]]) -> None:
+    """Insert rows with COPY on PostgreSQL, or a multi-row INSERT elsewhere"""
+    if not rows:
+        return
+
+    if settings.ATTACK_WRITER_USE_COPY and conn.dialect.driver == "psycopg2":
+        _copy_attacks(conn, rows)
+    else:
+        conn.execute(insert(Attack.__table__), rows)
+
+def write_attacks(rows: List[Dict[str, Any]]) -> int:
+    """Write a batch of attack rows and update the rollups in a single transaction"""
+    if not rows:
+        return 0
+
+    with engine.begin() as conn:
+        rows = write_attack_rows(conn, rows)
+    attacks_stored(rows)
+    return len(rows)
+
+def attacks_stored(rows: List[Dict[str, Any]]) -> None:
+    """Feed committed attacks to live subscribers and the in-memory top-K trackers"""
+    attack_broker.publish_rows(rows)
+    heavy_hitters.record_rows(rows)
+
+def write_attack_rows(conn: Connection, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert attack rows and update the rollups inside the caller's transaction; returns the rows stored"""
+    if not rows:
+        return []
+    rows = filter_known_references(conn, rows)
+    bulk_insert_attacks(conn, rows)
+    apply_attack_rows(conn, rows)
+    return rows
+
+
+def encode_cursor(timestamp: datetime, attack_id: UUID) -> str:
+    """Opaque keyset cursor for the (timestamp, id) position of an attack"""
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{attack_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Inverse of encode_cursor; raises ValueError on malformed input"""
+    try:
+        timestamp, attack_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), UUID(attack_id)
+    except (TypeError, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def attack_listing_query(
+    user_id: UUID,
+    filters: AttackFilter,
+    honeypot_id: Optional[UUID] = None,
+    cursor: Optional[str] = None
+):
+    """Attacks visible to a user, newest first, ordered by (timestamp, id)"""
+    statement = select(*(getattr(Attack, column) for column in ATTACK_COLUMNS)).where(
+        Attack.honeypot_id.in_(select(Honeypot.id).where(Honeypot.user_id == user_id))
+    )
+    if honeypot_id is not None:
+        statement = statement.where(Attack.honeypot_id == honeypot_id)
+
+    if filters.attack_type:
+        statement = statement.where(Attack.attack_type == filters.attack_type)
+    if filters.severity:
+        statement = statement.where(Attack.severity == filters.severity)
+    if filters.source_ip:
+        statement = statement.where(Attack.source_ip == filters.source_ip)
+    if filters.is_simulated is not None:
+        statement = statement.where(Attack.is_simulated == filters.is_simulated)
+    if filters.since:
+        statement = statement.where(Attack.timestamp >= filters.since)
+    if filters.until:
+        statement = statement.where(Attack.timestamp < filters.until)
+
+    if cursor:
+        timestamp, attack_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(Attack.timestamp, Attack.id) < tuple_(timestamp, attack_id))
+
+    return statement.order_by(Attack.timestamp.desc(), Attack.id.desc())
+
+def list_attacks(db: Session, statement, limit: int = 100) -> Dict[str, Any]:
+    """One page of a listing query plus the cursor for the next page, if any"""
+    rows = db.execute(statement.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+
+    return {"items": rows, "next_cursor": next_cursor}
+
+def stream_attacks(statement, chunk_size: int = 1000) -> Iterator[str]:
+    """Yield the rows of a listing query as NDJSON lines using a server-side cursor.
+
+    Opens its own session because the generator outlives the request handler.
+    """
+    db = SessionLocal()
+    try:
+        for row in db.execute(statement.execution_options(yield_per=chunk_size)):
+            yield AttackSchema.model_validate(row, from_attributes=True).model_dump_json() + "\n"
+    finally:
+        db.close()
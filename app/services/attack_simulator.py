@@ -2,17 +2,26 @@ import random
 import string
 import logging
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, Any, List
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Coroutine, Optional
 import httpx
+import numpy as np
 from uuid import UUID
 from sqlalchemy.orm import Session
 from app.models.simulation import Simulation
 from app.models.attack import Attack
 from app.core.config import settings
+from app.core.metrics import summarize_latencies
 
 logger = logging.getLogger(__name__)
 
+# Event loop that simulations run on; sync routes schedule onto it from worker threads
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+_running_tasks = set()
+
 # Attack patterns for different types
 ATTACK_PATTERNS = {
     "SSH-BRUTEFORCE": {
@@ -98,6 +107,114 @@ async def generate_attack(attack_type: str, intensity: int) -> Dict[str, Any]:
             }
         }
 
+@dataclass
+class AttackBatch:
+    """Columnar batch of generated attacks of a single type"""
+    attack_type: str
+    source_ips: List[str]
+    severities: List[str]
+    details: List[Dict[str, Any]]
+    
+    def __len__(self) -> int:
+        return len(self.source_ips)
+    
+    def to_rows(
+        self,
+        honeypot_id: UUID,
+        simulation_id: Optional[UUID] = None,
+        timestamp: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Rows ready for attack_service.write_attacks"""
+        timestamp = timestamp or datetime.now(timezone.utc)
+        return [
+            {
+                "id": uuid.uuid4(),
+                "honeypot_id": honeypot_id,
+                "simulation_id": simulation_id,
+                "source_ip": source_ip,
+                "attack_type": self.attack_type,
+                "severity": severity,
+                "details": details,
+                "is_simulated": True,
+                "timestamp": timestamp
+            } for source_ip, severity, details in zip(self.source_ips, self.severities, self.details)
+        ]
+
+def _sample(rng: np.random.Generator, choices: List[str], count: int) -> List[str]:
+    return np.asarray(choices, dtype=object)[rng.integers(0, len(choices), size=count)].tolist()
+
+def _random_suffixes(rng: np.random.Generator, length: int, count: int) -> List[str]:
+    alphabet = np.array(list(string.ascii_letters + string.digits))
+    chars = alphabet[rng.integers(0, len(alphabet), size=(count, length))]
+    # View each row of single characters as one fixed-width string
+    return np.ascontiguousarray(chars).view(f"<U{length}").ravel().tolist()
+
+def generate_attack_batch(
+    attack_type: str,
+    intensity: int,
+    count: int,
+    rng: Optional[np.random.Generator] = None,
+    seed: Optional[int] = None
+) -> AttackBatch:
+    """Generate `count` simulated attacks at once with vectorized sampling.
+
+    Produces the same distributions as `generate_attack`. Pass `seed` (or a
+    shared `rng`) for reproducible runs.
+    """
+    rng = rng or np.random.default_rng(seed)
+    
+    octets = rng.integers(1, 256, size=(count, 4)).tolist()
+    source_ips = [f"{a}.{b}.{c}.{d}" for a, b, c, d in octets]
+    
+    if attack_type == "SSH-BRUTEFORCE":
+        usernames = _sample(rng, ATTACK_PATTERNS["SSH-BRUTEFORCE"]["usernames"], count)
+        passwords = _sample(rng, ATTACK_PATTERNS["SSH-BRUTEFORCE"]["password_patterns"], count)
+        
+        # Add some complexity to password based on intensity
+        if intensity > 5:
+            passwords = [p + s for p, s in zip(passwords, _random_suffixes(rng, intensity, count))]
+        
+        attempt_counts = rng.integers(1, intensity * 2 + 1, size=count).tolist()
+        details = [
+            {"username": u, "password": p, "attempt_count": c}
+            for u, p, c in zip(usernames, passwords, attempt_counts)
+        ]
+        severity = "medium" if intensity > 7 else "low"
+    
+    elif attack_type == "WEB-SQL-INJECTION":
+        patterns = _sample(rng, ATTACK_PATTERNS["WEB-SQL-INJECTION"]["patterns"], count)
+        details = [
+            {
+                "pattern": pattern,
+                "url": f"/admin?id={pattern}",
+                "headers": {
+                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+                }
+            } for pattern in patterns
+        ]
+        severity = "high"
+    
+    elif attack_type == "FTP-BRUTEFORCE":
+        usernames = _sample(rng, ATTACK_PATTERNS["FTP-BRUTEFORCE"]["usernames"], count)
+        passwords = _sample(rng, ATTACK_PATTERNS["FTP-BRUTEFORCE"]["password_patterns"], count)
+        details = [
+            {"username": u, "password": p, "commands": ["LIST", "RETR", "STOR"]}
+            for u, p in zip(usernames, passwords)
+        ]
+        severity = "medium"
+    
+    else:
+        attack_type = "GENERIC"
+        details = [{"info": "Unknown attack type simulation"} for _ in range(count)]
+        severity = "low"
+    
+    return AttackBatch(
+        attack_type=attack_type,
+        source_ips=source_ips,
+        severities=[severity] * count,
+        details=details
+    )
+
 async def run_simulation_task(
     db_url: str,
     simulation_id: UUID,
@@ -107,10 +224,13 @@ async def run_simulation_task(
     duration_minutes: int,
     intensity: int
 ) -> None:
-    """Run the attack simulation as a background task"""
+    """Run the attack simulation over the HTTP API (kept for comparison with the in-process engine)"""
     try:
+        started = time.perf_counter()
+        request_latencies = []
+        
         # Setup database connection
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(headers={"X-Ingest-Key": settings.INGEST_API_KEY}) as client:
             # Update simulation status to running
             await client.put(
                 f"{db_url}/simulations/{simulation_id}/status",
@@ -131,8 +251,9 @@ async def run_simulation_task(
                         attack = await generate_attack(attack_type, intensity)
                         
                         # Record the attack
-                        await client.post(
-                            f"{db_url}/attacks",
+                        request_started = time.perf_counter()
+                        response = await client.post(
+                            f"{db_url}/attacks/",
                             json={
                                 "honeypot_id": str(target_honeypot_id),
                                 "simulation_id": str(simulation_id),
@@ -143,12 +264,15 @@ async def run_simulation_task(
                                 "is_simulated": True
                             }
                         )
-                        attack_count += 1
+                        request_latencies.append((time.perf_counter() - request_started) * 1000)
+                        if response.is_success:
+                            attack_count += 1
                 
                 # Wait before next attack
                 await asyncio.sleep(delay_between_attacks)
             
             # Update simulation to completed
+            elapsed = time.perf_counter() - started
             await client.put(
                 f"{db_url}/simulations/{simulation_id}/status",
                 json={
@@ -159,7 +283,10 @@ async def run_simulation_task(
                         "attack_type": attack_type,
                         "duration_minutes": duration_minutes,
                         "intensity": intensity,
-                        "node_count": node_count
+                        "node_count": node_count,
+                        "mode": "http",
+                        "attacks_per_second": round(attack_count / elapsed, 3) if elapsed else 0.0,
+                        "write_latency_ms": summarize_latencies(request_latencies)
                     }
                 }
             )
@@ -180,6 +307,30 @@ async def run_simulation_task(
         except Exception:
             pass
 
+def bind_event_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Remember the app's event loop so sync routes can schedule simulations on it"""
+    global _event_loop
+    _event_loop = loop
+
+def schedule_coroutine(coro: Coroutine) -> None:
+    """Run a coroutine on the app's event loop from either async or thread context"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    
+    if loop is not None:
+        task = loop.create_task(coro)
+        _running_tasks.add(task)
+        task.add_done_callback(_running_tasks.discard)
+    elif _event_loop is not None:
+        future = asyncio.run_coroutine_threadsafe(coro, _event_loop)
+        _running_tasks.add(future)
+        future.add_done_callback(_running_tasks.discard)
+    else:
+        coro.close()
+        raise RuntimeError("No event loop available to run the simulation")
+
 def start_simulation_background_task(
     simulation_id: UUID,
     target_honeypot_id: UUID,
@@ -189,16 +340,32 @@ def start_simulation_background_task(
     intensity: int
 ) -> None:
     """Start background task for simulation"""
-    # We need to use an API call because the task runs in a separate process
-    db_url = f"http://localhost:8000{settings.API_V1_STR}"
-    
-    # Create and start the task
-    asyncio.create_task(run_simulation_task(
-        db_url=db_url,
-        simulation_id=simulation_id,
-        target_honeypot_id=target_honeypot_id,
-        attack_type=attack_type,
-        node_count=node_count,
-        duration_minutes=duration_minutes,
-        intensity=intensity
-    ))
\ No newline at end of file
+    if settings.SIMULATION_MODE == "sharded":
+        # Imported here because the scheduler imports this module
+        from app.services.simulation_scheduler import simulation_scheduler
+        simulation_scheduler.submit(simulation_id)
+        return
+    
+    if settings.SIMULATION_MODE == "http":
+        coro = run_simulation_task(
+            db_url=settings.SIMULATION_API_URL,
+            simulation_id=simulation_id,
+            target_honeypot_id=target_honeypot_id,
+            attack_type=attack_type,
+            node_count=node_count,
+            duration_minutes=duration_minutes,
+            intensity=intensity
+        )
+    else:
+        # Imported here because the engine depends on simulation_service, which imports this module
+        from app.services.simulation_engine import run_simulation
+        coro = run_simulation(
+            simulation_id=simulation_id,
+            target_honeypot_id=target_honeypot_id,
+            attack_type=attack_type,
+            node_count=node_count,
+            duration_minutes=duration_minutes,
+            intensity=intensity
+        )
+    
+    schedule_coroutine(coro)
\ No newline at end of file
@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import exc
+from app.core.config import settings
+from app.services.attack_service import write_attacks
+
+logger = logging.getLogger(__name__)
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed write may succeed later (lost connection, pool timeout) rather than being bad data"""
+    if isinstance(error, exc.DBAPIError):
+        return error.connection_invalidated or isinstance(error, (exc.OperationalError, exc.InterfaceError))
+    return isinstance(error, (exc.TimeoutError, ConnectionError, TimeoutError))
+
+class AttackWriter:
+    """Buffers ingested attack rows and flushes them in batches.
+
+    A background thread flushes whenever `batch_size` rows are pending or
+    `flush_interval` seconds have passed, whichever comes first. `submit`
+    never blocks on the database; it refuses rows once `max_pending` are
+    buffered so callers can shed load. Batches that fail for a transient
+    reason go back to the front of the buffer (within `max_pending`) and
+    the next flush waits out an exponential backoff; only rows that fail
+    for good, or don't fit back in the buffer, are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 5000,
+        flush_interval: float = 0.5,
+        max_pending: int = 200000,
+        max_backoff: float = 30.0,
+        write: Callable[[List[Dict[str, Any]]], int] = write_attacks
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_backoff = max_backoff
+        self._write = write
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._backoff = 0.0
+        self._retry_at = 0.0
+
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.failed = 0
+        self.retried = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+
+    def submit(self, rows: List[Dict[str, Any]]) -> bool:
+        """Queue rows for writing; returns False if the buffer is full"""
+        with self._lock:
+            if len(self._buffer) + len(rows) > self.max_pending:
+                self.rejected += len(rows)
+                return False
+
+            self._buffer.extend(rows)
+            self.accepted += len(rows)
+            if len(self._buffer) >= self.batch_size:
+                self._wakeup.set()
+        return True
+
+    def flush(self) -> int:
+        """Write everything currently buffered; returns rows written"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._buffer = self._buffer, []
+
+            written = 0
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                started = time.perf_counter()
+                try:
+                    written += self._write(batch)
+                except Exception as e:
+                    if is_retryable(e):
+                        self._requeue(pending[start:], e)
+                        break
+                    self.failed += len(batch)
+                    logger.error(f"Dropping {len(batch)} attack(s) that cannot be written: {str(e)}")
+                    continue
+                finally:
+                    self.last_flush_ms = (time.perf_counter() - started) * 1000
+                self.flushes += 1
+                self._backoff = 0.0
+
+            self.written += written
+            return written
+
+    def _requeue(self, rows: List[Dict[str, Any]], error: Exception) -> None:
+        """Put rows from a failed flush back ahead of newer ones and back off before the next flush"""
+        with self._lock:
+            room = max(0, self.max_pending - len(self._buffer))
+            kept, dropped = rows[:room], max(0, len(rows) - room)
+            self._buffer[:0] = kept
+        self.retried += len(kept)
+        self._backoff = min(self.max_backoff, max(self.flush_interval, self._backoff * 2))
+        self._retry_at = time.monotonic() + self._backoff
+        logger.warning(f"Error writing attacks, retrying {len(kept)} in {self._backoff:.1f}s: {str(error)}")
+        if dropped:
+            self.failed += dropped
+            logger.error(f"Dropping {dropped} attack(s) that no longer fit in the buffer")
+
+    def start(self) -> None:
+        """Start the background flush thread"""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="attack-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the flush thread after writing any buffered rows"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self.flush()
+        if self.pending():
+            logger.error(f"Stopped with {self.pending()} attack(s) still unwritten")
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self.pending(),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "failed": self.failed,
+            "retried": self.retried,
+            "backoff_seconds": self._backoff,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2)
+        }
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if time.monotonic() >= self._retry_at:
+                self.flush()
+
+
+attack_writer = AttackWriter(
+    batch_size=settings.ATTACK_WRITER_BATCH_SIZE,
+    flush_interval=settings.ATTACK_WRITER_FLUSH_INTERVAL,
+    max_pending=settings.ATTACK_WRITER_MAX_PENDING
+)
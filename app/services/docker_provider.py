@@ -0,0 +1,108 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+import docker
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def create_client():
+    """Build the configured client and make sure the honeypot network exists"""
+    if settings.DOCKER_BACKEND == "fake":
+        from app.services.fake_docker import FakeDockerClient
+        client = FakeDockerClient(latency=settings.FAKE_DOCKER_LATENCY)
+    else:
+        client = docker.from_env(timeout=settings.DOCKER_TIMEOUT)
+    client.ping()
+    try:
+        client.networks.get(settings.DOCKER_NETWORK)
+    except docker.errors.NotFound:
+        client.networks.create(settings.DOCKER_NETWORK)
+        logger.info(f"Created Docker network: {settings.DOCKER_NETWORK}")
+    return client
+
+class DockerProvider:
+    """Connects to Docker on first use instead of at import.
+
+    Construction and network provisioning run once, under a lock, the
+    first time a client is asked for. A failed attempt is not retried
+    until its backoff has passed (doubling up to `max_backoff`), so callers
+    without Docker get None quickly instead of blocking on the socket.
+    """
+
+    def __init__(self, factory: Callable[[], Any] = create_client, backoff: float = 1.0, max_backoff: float = 60.0):
+        self.factory = factory
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._client = None
+        self._lock = threading.Lock()
+        self._retry_at = 0.0
+        self._delay = backoff
+
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.connect_ms: Optional[float] = None
+
+    def get(self):
+        """The client, connecting if needed; None while Docker is unavailable"""
+        client = self._client
+        if client is not None:
+            return client
+        with self._lock:
+            if self._client is None and time.monotonic() >= self._retry_at:
+                self._connect()
+            return self._client
+
+    def set(self, client) -> None:
+        """Swap the client, e.g. for a FakeDockerClient in tests"""
+        with self._lock:
+            self._client = client
+            self._retry_at = 0.0
+            self._delay = self.backoff
+
+    def reset(self) -> None:
+        """Drop the client so the next `get` reconnects"""
+        self.set(None)
+
+    def health(self) -> Dict[str, Any]:
+        """Ping the daemon and report connection state"""
+        client = self.get()
+        probe: Dict[str, Any] = {"backend": settings.DOCKER_BACKEND, "available": False}
+        if client is not None:
+            started = time.perf_counter()
+            try:
+                client.ping()
+                probe["available"] = True
+                probe["ping_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            except Exception as e:
+                self.last_error = str(e)
+                self.reset()
+        with self._lock:
+            probe.update({
+                "failures": self.failures,
+                "last_error": self.last_error,
+                "connect_ms": self.connect_ms,
+                "retry_in": round(max(0.0, self._retry_at - time.monotonic()), 3) if self._client is None else 0.0
+            })
+        return probe
+
+    def _connect(self) -> None:
+        # Called with the lock held
+        started = time.perf_counter()
+        try:
+            self._client = self.factory()
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            self._retry_at = time.monotonic() + self._delay
+            logger.error(f"Docker unavailable, retrying in {self._delay:.0f}s: {str(e)}")
+            self._delay = min(self._delay * 2, self.max_backoff)
+            return
+        self.connect_ms = round((time.perf_counter() - started) * 1000, 3)
+        self.last_error = None
+        self._delay = self.backoff
+        logger.info(f"Connected to Docker in {self.connect_ms:.0f}ms")
+
+
+docker_provider = DockerProvider(backoff=settings.DOCKER_RETRY_BACKOFF, max_backoff=settings.DOCKER_RETRY_MAX_BACKOFF)
@@ -0,0 +1,188 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set
+from uuid import UUID
+from app.core.config import settings
+from app.schemas.attack import Attack as AttackSchema
+
+OVERFLOW_POLICIES = ("drop_oldest", "disconnect")
+
+class Subscription:
+    """One client's view of the attack stream, buffered in a bounded queue.
+
+    Publishers run on worker threads; the subscriber awaits on the event
+    loop it subscribed from. When the queue is full the `drop_oldest`
+    policy discards the oldest events (and counts them), `disconnect`
+    closes the subscription so the client can reconnect and catch up from
+    the REST API.
+    """
+
+    def __init__(
+        self,
+        broker: "EventBroker",
+        honeypot_ids: Iterable[UUID],
+        max_queue: int,
+        overflow: str,
+        owner_id: Optional[UUID] = None
+    ):
+        self.broker = broker
+        self.honeypot_ids: Set[UUID] = set(honeypot_ids)
+        self.owner_id = owner_id  # Set when following all of a user's honeypots, including new ones
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.dropped = 0
+        self.closed = False
+        self._queue: deque = deque()
+        self._lock = threading.Lock()
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        self._signalled = False
+
+    def offer(self, payload: str) -> bool:
+        """Queue an event from any thread; False if the subscription is closed"""
+        with self._lock:
+            if self.closed:
+                return False
+            accepted = True
+            if len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                if self.overflow == "disconnect":
+                    self.closed = True
+                    accepted = False
+                else:
+                    self._queue.popleft()
+            if accepted:
+                self._queue.append(payload)
+            # One wakeup per drain, however many events arrive in between
+            if self._signalled:
+                return accepted
+            self._signalled = True
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # The subscriber's loop has shut down
+        return accepted
+
+    async def next_batch(self, timeout: Optional[float] = None) -> List[str]:
+        """Wait for events and take everything queued; [] on timeout"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        with self._lock:
+            self._ready.clear()
+            self._signalled = False
+            batch = list(self._queue)
+            self._queue.clear()
+        return batch
+
+    def close(self) -> None:
+        """Unsubscribe and wake a pending `next_batch`"""
+        with self._lock:
+            self.closed = True
+        self.broker.unsubscribe(self)
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass
+
+
+class EventBroker:
+    """In-process pub/sub for new attacks, keyed by honeypot.
+
+    Publishing serializes each attack once, and only when somebody is
+    subscribed to its honeypot, then hands the same string to every
+    matching subscriber. Subscriptions to all of a user's honeypots are
+    also kept by owner, so `add_honeypot` can extend them when the user
+    creates another one.
+    """
+
+    def __init__(self, max_queue: int = 1000, overflow: str = "drop_oldest"):
+        self.max_queue = max_queue
+        self.overflow = overflow if overflow in OVERFLOW_POLICIES else "drop_oldest"
+        self._subscribers: Dict[UUID, Set[Subscription]] = {}
+        self._owners: Dict[UUID, Set[Subscription]] = {}  # owner_id -> user-scoped subscriptions
+        self._lock = threading.Lock()
+
+        self.published = 0
+        self.delivered = 0
+        self.disconnected = 0
+
+    def subscribe(self, honeypot_ids: Iterable[UUID], owner_id: Optional[UUID] = None) -> Subscription:
+        """Subscribe from async code to attacks on the given honeypots.
+
+        With `owner_id`, the subscription also follows honeypots that user
+        creates later.
+        """
+        subscription = Subscription(self, honeypot_ids, self.max_queue, self.overflow, owner_id)
+        with self._lock:
+            for honeypot_id in subscription.honeypot_ids:
+                self._subscribers.setdefault(honeypot_id, set()).add(subscription)
+            if owner_id is not None:
+                self._owners.setdefault(owner_id, set()).add(subscription)
+        return subscription
+
+    def add_honeypot(self, owner_id: UUID, honeypot_id: UUID) -> None:
+        """Extend the owner's user-scoped subscriptions to a newly created honeypot"""
+        with self._lock:
+            for subscription in self._owners.get(owner_id, ()):
+                subscription.honeypot_ids.add(honeypot_id)
+                self._subscribers.setdefault(honeypot_id, set()).add(subscription)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            owned = self._owners.get(subscription.owner_id)
+            if owned is not None:
+                owned.discard(subscription)
+                if not owned:
+                    del self._owners[subscription.owner_id]
+            for honeypot_id in subscription.honeypot_ids:
+                subscribers = self._subscribers.get(honeypot_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[honeypot_id]
+
+    def publish_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Fan out stored attack rows; safe to call from any thread"""
+        with self._lock:
+            if not self._subscribers:
+                return
+            targets = {honeypot_id: list(subscribers) for honeypot_id, subscribers in self._subscribers.items()}
+
+        published = delivered = 0
+        closed = set()
+        for row in rows:
+            subscribers = targets.get(row["honeypot_id"])
+            if not subscribers:
+                continue
+            payload = AttackSchema.model_validate(row).model_dump_json()
+            published += 1
+            for subscription in subscribers:
+                if subscription.offer(payload):
+                    delivered += 1
+                elif subscription.closed:
+                    closed.add(subscription)
+        for subscription in closed:
+            self.unsubscribe(subscription)
+        with self._lock:
+            self.published += published
+            self.delivered += delivered
+            self.disconnected += len(closed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subscriptions = {s for subscribers in self._subscribers.values() for s in subscribers}
+            return {
+                "subscribers": len(subscriptions),
+                "honeypots": len(self._subscribers),
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped": sum(s.dropped for s in subscriptions),
+                "disconnected": self.disconnected,
+                "overflow": self.overflow
+            }
+
+
+attack_broker = EventBroker(max_queue=settings.STREAM_QUEUE_SIZE, overflow=settings.STREAM_OVERFLOW)
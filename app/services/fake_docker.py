@@ -0,0 +1,266 @@
+"""In-memory stand-in for the parts of the Docker SDK the orchestrator uses.
+
+Selected with DOCKER_BACKEND=fake so deploys, fleets and reconciliation can
+be exercised without a Docker daemon. `latency` adds a fixed delay to every
+daemon call to approximate real API round trips.
+"""
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from docker.errors import APIError, ImageNotFound, NotFound
+
+
+class FakeImage:
+    def __init__(self, name: str):
+        self.id = f"sha256:{uuid.uuid4().hex}"
+        self.tags = [name]
+
+
+class FakeContainer:
+    def __init__(self, client: "FakeDockerClient", name: str, image: str, **options: Any):
+        self.client = client
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.image = image
+        self.options = options
+        self.labels: Dict[str, str] = dict(options.get("labels") or {})
+        self.status = "created"
+        self.ip_address = client._allocate_address()
+
+    @property
+    def attrs(self) -> Dict[str, Any]:
+        return {
+            "Id": self.id,
+            "Name": f"/{self.name}",
+            "State": {"Status": self.status, "Running": self.status == "running"},
+            "Config": {"Image": self.image, "Labels": self.labels, "Env": [
+                f"{key}={value}" for key, value in (self.options.get("environment") or {}).items()
+            ]},
+            "Mounts": [
+                {"Type": "volume", "Name": name, "Destination": bind["bind"]}
+                for name, bind in (self.options.get("volumes") or {}).items()
+            ],
+            "NetworkSettings": {"Networks": {
+                self.options["network"]: {"IPAddress": self.ip_address if self.status == "running" else ""}
+            } if self.options.get("network") else {}},
+        }
+
+    def start(self) -> None:
+        self.client._call()
+        self.status = "running"
+
+    def rename(self, name: str) -> None:
+        self.client._call()
+        self.client._rename_container(self, name)
+
+    def stop(self, timeout: int = 10) -> None:
+        self.client._call()
+        self.status = "exited"
+
+    def remove(self, force: bool = False) -> None:
+        self.client._call()
+        if self.status == "running" and not force:
+            raise APIError(f"You cannot remove a running container {self.id}")
+        self.client._remove_container(self)
+
+    def reload(self) -> None:
+        self.client._call()
+
+
+class FakeContainers:
+    def __init__(self, client: "FakeDockerClient"):
+        self.client = client
+
+    def create(self, image: str, name: Optional[str] = None, **options: Any) -> FakeContainer:
+        self.client._call()
+        self.client.images._require(image)
+        return self.client._add_container(FakeContainer(self.client, name or uuid.uuid4().hex[:12], image, **options))
+
+    def run(self, image: str, name: Optional[str] = None, detach: bool = True, **options: Any) -> FakeContainer:
+        if not self.client.images._exists(image):
+            self.client.images.pull(image)
+        container = self.create(image, name=name, **options)
+        container.start()
+        return container
+
+    def get(self, container_id: str) -> FakeContainer:
+        self.client._call()
+        with self.client._lock:
+            for container in self.client._containers.values():
+                if container_id in (container.id, container.name):
+                    return container
+        raise NotFound(f"No such container: {container_id}")
+
+    def list(self, all: bool = False, filters: Optional[Dict[str, Any]] = None) -> List[FakeContainer]:
+        self.client._call()
+        filters = filters or {}
+        names = _as_list(filters.get("name"))
+        labels = _as_list(filters.get("label"))
+        statuses = _as_list(filters.get("status"))
+
+        with self.client._lock:
+            containers = list(self.client._containers.values())
+
+        matched = []
+        for container in containers:
+            if not all and not statuses and container.status != "running":
+                continue
+            if statuses and container.status not in statuses:
+                continue
+            # Docker treats name filters as unanchored regexes; a substring match is close enough
+            if names and not any(name.strip("^$") in container.name for name in names):
+                continue
+            if labels and not all_labels_match(container.labels, labels):
+                continue
+            matched.append(container)
+        return matched
+
+
+class FakeVolume:
+    def __init__(self, client: "FakeDockerClient", name: str):
+        self.client = client
+        self.name = name
+
+    def remove(self, force: bool = False) -> None:
+        self.client._call()
+        with self.client._lock:
+            self.client._volumes.pop(self.name, None)
+
+
+class FakeVolumes:
+    def __init__(self, client: "FakeDockerClient"):
+        self.client = client
+
+    def create(self, name: str, **options: Any) -> FakeVolume:
+        self.client._call()
+        with self.client._lock:
+            return self.client._volumes.setdefault(name, FakeVolume(self.client, name))
+
+    def get(self, name: str) -> FakeVolume:
+        self.client._call()
+        with self.client._lock:
+            if name not in self.client._volumes:
+                raise NotFound(f"No such volume: {name}")
+            return self.client._volumes[name]
+
+
+class FakeNetwork:
+    def __init__(self, name: str):
+        self.id = uuid.uuid4().hex
+        self.name = name
+
+
+class FakeNetworks:
+    def __init__(self, client: "FakeDockerClient"):
+        self.client = client
+
+    def get(self, name: str) -> FakeNetwork:
+        self.client._call()
+        with self.client._lock:
+            if name not in self.client._networks:
+                raise NotFound(f"network {name} not found")
+            return self.client._networks[name]
+
+    def create(self, name: str, **options: Any) -> FakeNetwork:
+        self.client._call()
+        with self.client._lock:
+            return self.client._networks.setdefault(name, FakeNetwork(name))
+
+
+class FakeImages:
+    def __init__(self, client: "FakeDockerClient"):
+        self.client = client
+
+    def _exists(self, name: str) -> bool:
+        with self.client._lock:
+            return name in self.client._images
+
+    def _require(self, name: str) -> None:
+        if not self._exists(name):
+            raise ImageNotFound(f"No such image: {name}")
+
+    def pull(self, repository: str, tag: Optional[str] = None, **options: Any) -> FakeImage:
+        self.client._call(self.client.pull_latency)
+        name = f"{repository}:{tag}" if tag else repository
+        with self.client._lock:
+            self.client.pulls += 1
+            return self.client._images.setdefault(name, FakeImage(name))
+
+    def get(self, name: str) -> FakeImage:
+        self.client._call()
+        self._require(name)
+        with self.client._lock:
+            return self.client._images[name]
+
+
+class FakeDockerClient:
+    """Thread-safe fake of docker.DockerClient"""
+
+    def __init__(self, latency: float = 0.0, pull_latency: float = 0.0):
+        self.latency = latency
+        self.pull_latency = pull_latency
+        self.calls = 0
+        self.pulls = 0
+        self._lock = threading.RLock()
+        self._containers: Dict[str, FakeContainer] = {}
+        self._volumes: Dict[str, FakeVolume] = {}
+        self._networks: Dict[str, FakeNetwork] = {}
+        self._images: Dict[str, FakeImage] = {}
+        self._addresses = 0
+        self.containers = FakeContainers(self)
+        self.volumes = FakeVolumes(self)
+        self.networks = FakeNetworks(self)
+        self.images = FakeImages(self)
+
+    def ping(self) -> bool:
+        self._call()
+        return True
+
+    def close(self) -> None:
+        pass
+
+    def _call(self, delay: Optional[float] = None) -> None:
+        with self._lock:
+            self.calls += 1
+        delay = self.latency if delay is None else delay
+        if delay:
+            time.sleep(delay)
+
+    def _allocate_address(self) -> str:
+        """An address in Docker's default 172.18.0.0/16 user network range"""
+        with self._lock:
+            self._addresses += 1
+            return f"172.18.{self._addresses // 254}.{self._addresses % 254 + 1}"
+
+    def _add_container(self, container: FakeContainer) -> FakeContainer:
+        with self._lock:
+            if any(existing.name == container.name for existing in self._containers.values()):
+                raise APIError(f'Conflict. The container name "/{container.name}" is already in use')
+            self._containers[container.id] = container
+        return container
+
+    def _rename_container(self, container: FakeContainer, name: str) -> None:
+        with self._lock:
+            if any(other.name == name for other in self._containers.values() if other is not container):
+                raise APIError(f'Conflict. The container name "/{name}" is already in use')
+            container.name = name
+
+    def _remove_container(self, container: FakeContainer) -> None:
+        with self._lock:
+            self._containers.pop(container.id, None)
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def all_labels_match(labels: Dict[str, str], selectors: List[str]) -> bool:
+    """Match Docker label filters of the form `key` or `key=value`"""
+    for selector in selectors:
+        key, _, value = selector.partition("=")
+        if key not in labels or (value and labels[key] != value):
+            return False
+    return True
@@ -0,0 +1,136 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.honeypot import Honeypot
+from app.schemas.honeypot import Honeypot as HoneypotSchema
+from app.services import honeypot_manager
+from app.services.honeypot_service import honeypots_statement
+from app.services.job_manager import Job, job_manager
+from app.services.reconciler import container_reconciler, list_honeypot_containers
+
+def select_fleet(
+    db: Session,
+    user_id: UUID,
+    honeypot_ids: Optional[List[UUID]] = None,
+    status: Optional[str] = None,
+    type: Optional[str] = None
+) -> List[HoneypotSchema]:
+    """Snapshots of the user's honeypots matching the IDs and/or filters; an empty ID list matches none"""
+    statement = honeypots_statement(user_id, status, type)
+    if honeypot_ids is not None:
+        statement = statement.where(Honeypot.id.in_(honeypot_ids))
+    return [HoneypotSchema.model_validate(honeypot) for honeypot in db.scalars(statement)]
+
+def prepare_fleet(action: str, honeypots: List[HoneypotSchema], concurrency: int) -> None:
+    """Shared setup done once per fleet: the network lookup and each distinct image pull"""
+    if action == "remove":
+        return
+    honeypot_manager.ensure_network()
+    images = {honeypot_manager.get_honeypot_image(honeypot.type) for honeypot in honeypots}
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(images)) or 1) as executor:
+        list(executor.map(honeypot_manager.pull_image, images))
+
+def apply_to_honeypot(action: str, honeypot: HoneypotSchema) -> Dict[str, Any]:
+    started = time.perf_counter()
+    if action == "deploy" and honeypot.status == "active":
+        ok, detail = True, "already active"
+    elif action == "deploy":
+        ok, detail = honeypot_manager.deploy_honeypot_instance(honeypot), None
+    elif action == "redeploy":
+        ok, detail = honeypot_manager.update_honeypot_instance(honeypot), None
+    else:
+        ok, detail = honeypot_manager.remove_honeypot_instance(honeypot), None
+    return {
+        "honeypot_id": str(honeypot.id),
+        "ok": ok,
+        "detail": detail or ("done" if ok else f"{action} failed"),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 3)
+    }
+
+def record_statuses(action: str, results: List[Dict[str, Any]]) -> None:
+    """Write the fleet outcome back with one UPDATE per resulting status"""
+    succeeded = [UUID(result["honeypot_id"]) for result in results if result["ok"]]
+    failed = [UUID(result["honeypot_id"]) for result in results if not result["ok"]]
+    with SessionLocal() as db:
+        if succeeded:
+            db.execute(
+                update(Honeypot).where(Honeypot.id.in_(succeeded))
+                .values(status="inactive" if action == "remove" else "active")
+            )
+        if failed:
+            db.execute(update(Honeypot).where(Honeypot.id.in_(failed)).values(status="error"))
+        db.commit()
+
+def execute_fleet(
+    action: str,
+    honeypots: List[HoneypotSchema],
+    concurrency: int,
+    report: Callable[[float, str], None] = lambda fraction, message: None
+) -> List[Dict[str, Any]]:
+    """Apply an action to every honeypot with at most `concurrency` Docker operations in flight"""
+    report(0.05, "Preparing images and network")
+    prepare_fleet(action, honeypots, concurrency)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fleet") as executor:
+        for result in executor.map(partial(apply_to_honeypot, action), honeypots):
+            results.append(result)
+            report(0.1 + 0.85 * len(results) / len(honeypots), f"{len(results)}/{len(honeypots)} honeypots done")
+    return results
+
+def run_fleet_operation(action: str, honeypots: List[HoneypotSchema], concurrency: int, job: Job) -> Dict[str, Any]:
+    started = time.perf_counter()
+    results = execute_fleet(action, honeypots, concurrency, job.report)
+    record_statuses(action, results)
+
+    succeeded = sum(1 for result in results if result["ok"])
+    return {
+        "action": action,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "results": results
+    }
+
+def queue_fleet_operation(
+    action: str,
+    honeypots: List[HoneypotSchema],
+    user_id: UUID,
+    concurrency: Optional[int] = None
+) -> Job:
+    """Queue a fleet job that holds every targeted honeypot until it finishes"""
+    concurrency = max(1, min(concurrency or settings.FLEET_CONCURRENCY, settings.FLEET_MAX_CONCURRENCY))
+    return job_manager.submit(
+        f"fleet-{action}",
+        uuid.uuid4(),
+        partial(run_fleet_operation, action, honeypots, concurrency),
+        owner_id=user_id,
+        claims=[honeypot.id for honeypot in honeypots]
+    )
+
+def fleet_statuses(honeypots: List[HoneypotSchema]) -> List[Dict[str, Any]]:
+    """Container state per honeypot from the reconciler snapshot, or one list call if it's stale"""
+    snapshot = container_reconciler.snapshot()
+    client = honeypot_manager.get_docker_client() if snapshot is None else None
+    if client is not None:
+        snapshot = list_honeypot_containers(client)
+
+    statuses = []
+    for honeypot in honeypots:
+        state = snapshot.get(honeypot.id) if snapshot is not None else None
+        statuses.append({
+            "honeypot_id": honeypot.id,
+            "name": honeypot.name,
+            "status": honeypot.status,
+            "container_status": state.status if state else ("not_deployed" if snapshot is not None else "unknown"),
+            "container_id": state.container_id if state else None
+        })
+    return statuses
@@ -0,0 +1,297 @@
+"""Streaming top-K attacker tracking over sliding time windows.
+
+Counts come from Space-Saving summaries (Metwally et al.) holding at most
+`capacity` source IPs each. For a summary fed N attacks:
+
+* each listed IP's true count lies in [count - error, count], and its
+  error is at most N / capacity;
+* no unlisted IP has more attacks than the smallest listed count (at
+  most N / capacity), so every IP above that is guaranteed to be listed.
+
+Windows are rings of fixed-size time buckets, one summary per bucket.
+Merged summaries keep both per-item guarantees, and the API reports the
+actual `error` of each IP and `unlisted_max` for the window, so callers
+don't have to rely on the N / capacity worst case.
+benchmarks/bench_heavy_hitters.py checks them against exact counts.
+Because buckets are whole, the window actually covered is between
+(buckets - 1) and `buckets` bucket lengths; the 1h window, for example,
+spans 55 to 60 minutes.
+"""
+import heapq
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import engine
+from app.models.attack import Attack
+from app.models.honeypot import Honeypot
+from app.services.rollup_service import as_utc
+
+logger = logging.getLogger(__name__)
+
+# window -> (bucket length in seconds, bucket count)
+WINDOWS = {
+    "1h": (300, 12),
+    "24h": (3600, 24),
+    "7d": (21600, 28),
+}
+
+class SpaceSaving:
+    """Approximate counts of the heaviest items in a stream"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.total = 0
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        self._heap: List[Tuple[int, Hashable]] = []  # Lazy min-heap; stale entries are skipped
+
+    def add(self, item: Hashable, weight: int = 1) -> None:
+        self.total += weight
+        if item in self.counts:
+            self.counts[item] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = weight
+            self.errors[item] = 0
+        else:
+            # Replace the smallest counter; the newcomer inherits its count as error
+            smallest, evicted = self._pop_min()
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[item] = smallest + weight
+            self.errors[item] = smallest
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, key) for key, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def min_count(self) -> int:
+        """Count any unlisted item could have at most (0 until full)"""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def top(self, limit: int) -> List[Tuple[Hashable, int, int]]:
+        """(item, estimated count, maximum overestimate), largest first"""
+        return [
+            (item, count, self.errors[item])
+            for item, count in heapq.nlargest(limit, self.counts.items(), key=lambda entry: entry[1])
+        ]
+
+    @classmethod
+    def merged(cls, summaries: Iterable["SpaceSaving"], capacity: int) -> "SpaceSaving":
+        """Combine summaries of disjoint streams (Agarwal et al., mergeable summaries)"""
+        summaries = [summary for summary in summaries if summary.total]
+        result = cls(capacity)
+        counts: Dict[Hashable, int] = {}
+        errors: Dict[Hashable, int] = {}
+        for summary in summaries:
+            result.total += summary.total
+            for item, count in summary.counts.items():
+                counts[item] = counts.get(item, 0) + count
+                errors[item] = errors.get(item, 0) + summary.errors[item]
+        # An item missing from a full summary may have had up to its minimum there
+        for summary in summaries:
+            floor = summary.min_count()
+            if floor:
+                for item in counts:
+                    if item not in summary.counts:
+                        counts[item] += floor
+                        errors[item] += floor
+        for item, count in heapq.nlargest(capacity, counts.items(), key=lambda entry: entry[1]):
+            result.counts[item] = count
+            result.errors[item] = errors[item]
+        result._heap = [(count, item) for item, count in result.counts.items()]
+        heapq.heapify(result._heap)
+        return result
+
+    def _pop_min(self) -> Tuple[int, Hashable]:
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return count, item
+
+
+class WindowedTopK:
+    """Space-Saving summaries over a sliding ring of time buckets.
+
+    Closed buckets are merged once after the ring advances, so a query
+    merges just two summaries whatever the attack volume.
+    """
+
+    def __init__(self, capacity: int, bucket_seconds: int, buckets: int):
+        self.capacity = capacity
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self._closed: deque = deque()  # (bucket index, SpaceSaving), oldest first
+        self._current: Optional[Tuple[int, SpaceSaving]] = None
+        self._closed_merged: Optional[SpaceSaving] = None
+
+    def add(self, item: Hashable, timestamp: float, weight: int = 1) -> None:
+        bucket = int(timestamp // self.bucket_seconds)
+        self._advance(bucket)
+        if bucket == self._current[0]:
+            self._current[1].add(item, weight)
+            return
+        if bucket <= self._current[0] - self.buckets:
+            return  # Older than the window
+        # Late arrival for a bucket still in the window
+        self._closed_merged = None
+        for position, (index, summary) in enumerate(self._closed):
+            if index == bucket:
+                summary.add(item, weight)
+                return
+            if index > bucket:
+                break
+        else:
+            position = len(self._closed)
+        summary = SpaceSaving(self.capacity)
+        summary.add(item, weight)
+        self._closed.insert(position, (bucket, summary))
+
+    def window(self, now: float) -> SpaceSaving:
+        """Summary of the window ending now"""
+        self._advance(int(now // self.bucket_seconds))
+        if self._closed_merged is None:
+            self._closed_merged = SpaceSaving.merged((summary for _, summary in self._closed), self.capacity)
+        return SpaceSaving.merged([self._closed_merged, self._current[1]], self.capacity)
+
+    def is_empty(self) -> bool:
+        return not self._closed and (self._current is None or not self._current[1].total)
+
+    def _advance(self, bucket: int) -> None:
+        if self._current is None or bucket > self._current[0]:
+            if self._current is not None and self._current[1].total:
+                self._closed.append(self._current)
+            self._current = (bucket, SpaceSaving(self.capacity))
+            self._closed_merged = None
+        oldest = self._current[0] - self.buckets + 1
+        while self._closed and self._closed[0][0] < oldest:
+            self._closed.popleft()
+            self._closed_merged = None
+
+
+class HeavyHitterTracker:
+    """Top attacking source IPs per honeypot and per user over 1h/24h/7d.
+
+    Fed with every stored attack. Honeypot owners are looked up once and
+    cached; ownership never changes. Timestamps ahead of the clock, e.g.
+    from a sensor with a skewed clock, count as now so they can't push the
+    windows past the attacks still arriving. State lives in this process
+    only and is rebuilt from the attacks table by `backfill` at startup,
+    before anything records live attacks.
+    """
+
+    def __init__(self, capacity: int = 64, windows: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.capacity = capacity
+        self.windows = windows or WINDOWS
+        self._owners: Dict[UUID, UUID] = {}
+        self._trackers: Dict[Tuple[str, UUID], Dict[str, WindowedTopK]] = {}
+        self._lock = threading.Lock()
+        self._pruned_at = time.monotonic()
+        self.recorded = 0
+
+    def record_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Count stored attack rows; safe to call from any thread"""
+        rows = [row for row in rows if row.get("source_ip")]
+        if not rows:
+            return
+        self._load_owners({row["honeypot_id"] for row in rows})
+        now = time.time()
+        with self._lock:
+            for row in rows:
+                timestamp = row["timestamp"]
+                seconds = min(as_utc(timestamp).timestamp(), now) if isinstance(timestamp, datetime) else now
+                honeypot_id = row["honeypot_id"]
+                keys = [("honeypot", honeypot_id)]
+                if honeypot_id in self._owners:
+                    keys.append(("user", self._owners[honeypot_id]))
+                for key in keys:
+                    for tracker in self._windows_for(key).values():
+                        tracker.add(row["source_ip"], seconds)
+            self.recorded += len(rows)
+        if time.monotonic() - self._pruned_at > 600:
+            self._pruned_at = time.monotonic()
+            self.prune()
+
+    def top(self, window: str, limit: int, user_id: UUID, honeypot_id: Optional[UUID] = None) -> Dict[str, Any]:
+        """Top-K attackers with their error bars; `window` is one of WINDOWS"""
+        key = ("honeypot", honeypot_id) if honeypot_id is not None else ("user", user_id)
+        with self._lock:
+            trackers = self._trackers.get(key)
+            summary = trackers[window].window(time.time()) if trackers else SpaceSaving(self.capacity)
+        return {
+            "window": window,
+            "total": summary.total,
+            "unlisted_max": summary.min_count(),  # No IP left out has more attacks than this
+            "data": [
+                {"source_ip": ip, "count": count, "error": error}  # True count is within [count - error, count]
+                for ip, count, error in summary.top(limit)
+            ]
+        }
+
+    def backfill(self, days: int = 7, chunk_size: int = 10000) -> None:
+        """Replay the last `days` of attacks from the database"""
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        statement = select(Attack.honeypot_id, Attack.source_ip, Attack.timestamp).where(Attack.timestamp >= since)
+        started = time.perf_counter()
+        count = 0
+        with engine.connect() as conn:
+            result = conn.execution_options(yield_per=chunk_size).execute(statement)
+            for chunk in result.mappings().partitions():
+                self.record_rows(chunk)
+                count += len(chunk)
+        logger.info(f"Backfilled heavy hitters from {count} attacks in {time.perf_counter() - started:.1f}s")
+
+    def run_backfill(self) -> None:
+        """`backfill`, logging rather than raising errors"""
+        try:
+            self.backfill()
+        except Exception as e:
+            logger.error(f"Error backfilling heavy hitters: {str(e)}")
+
+    def prune(self) -> int:
+        """Drop trackers whose windows have emptied"""
+        now = time.time()
+        with self._lock:
+            idle = []
+            for key, trackers in self._trackers.items():
+                for tracker in trackers.values():
+                    tracker._advance(int(now // tracker.bucket_seconds))
+                if all(tracker.is_empty() for tracker in trackers.values()):
+                    idle.append(key)
+            for key in idle:
+                del self._trackers[key]
+        return len(idle)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"capacity": self.capacity, "keys": len(self._trackers), "recorded": self.recorded}
+
+    def _windows_for(self, key: Tuple[str, UUID]) -> Dict[str, WindowedTopK]:
+        # Called with the lock held
+        trackers = self._trackers.get(key)
+        if trackers is None:
+            trackers = self._trackers[key] = {
+                name: WindowedTopK(self.capacity, bucket_seconds, buckets)
+                for name, (bucket_seconds, buckets) in self.windows.items()
+            }
+        return trackers
+
+    def _load_owners(self, honeypot_ids: Iterable[UUID]) -> None:
+        with self._lock:
+            missing = [honeypot_id for honeypot_id in honeypot_ids if honeypot_id not in self._owners]
+        if not missing:
+            return
+        with engine.connect() as conn:
+            owners = dict(conn.execute(select(Honeypot.id, Honeypot.user_id).where(Honeypot.id.in_(missing))).all())
+        with self._lock:
+            self._owners.update(owners)
+
+
+heavy_hitters = HeavyHitterTracker(capacity=settings.HEAVY_HITTERS_CAPACITY)
@@ -1,30 +1,49 @@
 import docker
+import time
 import uuid
 import logging
-from typing import Dict, Optional, List, Any
+from typing import Callable, Dict, Optional, List, Any
 from app.core.config import settings
 from app.models.honeypot import Honeypot
+from app.services.docker_provider import docker_provider
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Docker client
-try:
-    docker_client = docker.from_env()
-    # Create network if it doesn't exist
+def get_docker_client():
+    """The shared Docker client, connected on first use; None if Docker is unavailable"""
+    return docker_provider.get()
+
+def set_docker_client(client) -> None:
+    """Swap the Docker client, e.g. for a FakeDockerClient in tests"""
+    docker_provider.set(client)
+
+def get_honeypot_image(honeypot_type: str) -> str:
+    """Get Docker image name for honeypot type"""
+    return settings.HONEYPOT_IMAGES.get(honeypot_type, "cowrie/cowrie:latest")
+
+def ensure_network() -> None:
+    """Create the honeypot network if it doesn't exist"""
+    docker_client = get_docker_client()
+    if not docker_client:
+        raise RuntimeError("Docker client not available")
     try:
         docker_client.networks.get(settings.DOCKER_NETWORK)
     except docker.errors.NotFound:
         docker_client.networks.create(settings.DOCKER_NETWORK)
         logger.info(f"Created Docker network: {settings.DOCKER_NETWORK}")
-except Exception as e:
-    logger.error(f"Failed to initialize Docker client: {str(e)}")
-    docker_client = None
 
-def get_honeypot_image(honeypot_type: str) -> str:
-    """Get Docker image name for honeypot type"""
-    return settings.HONEYPOT_IMAGES.get(honeypot_type, "cowrie/cowrie:latest")
+def pull_image(image: str) -> None:
+    """Make sure an image is present locally, pulling it if needed"""
+    docker_client = get_docker_client()
+    if not docker_client:
+        raise RuntimeError("Docker client not available")
+    try:
+        docker_client.images.get(image)
+    except docker.errors.ImageNotFound:
+        logger.info(f"Pulling image {image}")
+        docker_client.images.pull(image)
 
 def prepare_environment(honeypot: Honeypot) -> Dict[str, str]:
     """Prepare environment variables for the honeypot container"""
@@ -62,26 +81,62 @@ def prepare_port_mapping(honeypot: Honeypot) -> Dict[str, int]:
     
     return port_mappings
 
-def deploy_honeypot_instance(honeypot: Honeypot) -> bool:
+def discard_container(container) -> None:
+    """Force-remove a container and its log volumes, logging rather than raising"""
+    docker_client = get_docker_client()
+    volume_names = [mount["Name"] for mount in container.attrs.get("Mounts", []) if mount.get("Type") == "volume"]
+    try:
+        container.remove(force=True)
+        for volume_name in volume_names:
+            docker_client.volumes.get(volume_name).remove()
+    except Exception as e:
+        logger.error(f"Error discarding container {container.id}: {str(e)}")
+
+def deploy_honeypot_instance(honeypot: Honeypot, progress: Optional[Callable[[float, str], None]] = None) -> bool:
     """Deploy a honeypot container"""
+    progress = progress or (lambda fraction, message: None)
+    docker_client = get_docker_client()
     if not docker_client:
         logger.error("Docker client not available")
         return False
     
+    from app.services.reconciler import container_reconciler
+    from app.services.warm_pool import warm_pool
+    started = time.perf_counter()
+    container_name = f"honeypot-{honeypot.id}"
+    
     try:
+        # Start a pre-created container from the warm pool when one fits
+        container = warm_pool.acquire(honeypot, container_name)
+        if container is not None:
+            progress(0.4, "Starting warm pool container")
+            try:
+                container.start()
+            except Exception as e:
+                # It already holds the honeypot's name; clear it for the cold path
+                logger.warning(f"Warm pool container {container.id} failed to start, deploying cold: {str(e)}")
+                discard_container(container)
+                container = None
+        if container is not None:
+            container_reconciler.observe(honeypot.id, container)
+            warm_pool.record_deploy((time.perf_counter() - started) * 1000, warm=True)
+            logger.info(f"Deployed honeypot container from warm pool: {container.id} for honeypot {honeypot.id}")
+            return True
+        
         # Get image for honeypot type
         image = get_honeypot_image(honeypot.type)
         
         # Prepare container configuration
         env_vars = prepare_environment(honeypot)
         port_mappings = prepare_port_mapping(honeypot)
-        container_name = f"honeypot-{honeypot.id}"
         
         # Create volume for logs
+        progress(0.2, "Creating log volume")
         volume_name = f"honeypot-logs-{honeypot.id}"
         docker_client.volumes.create(name=volume_name)
         
         # Deploy container
+        progress(0.4, f"Starting container from {image}")
         container = docker_client.containers.run(
             image=image,
             detach=True,
@@ -95,6 +150,8 @@ def deploy_honeypot_instance(honeypot: Honeypot) -> bool:
             restart_policy={"Name": "unless-stopped"}
         )
         
+        container_reconciler.observe(honeypot.id, container)
+        warm_pool.record_deploy((time.perf_counter() - started) * 1000, warm=False)
         logger.info(f"Deployed honeypot container: {container.id} for honeypot {honeypot.id}")
         return True
     
@@ -102,51 +159,64 @@ def deploy_honeypot_instance(honeypot: Honeypot) -> bool:
         logger.error(f"Error deploying honeypot container: {str(e)}")
         return False
 
-def update_honeypot_instance(honeypot: Honeypot) -> bool:
+def update_honeypot_instance(honeypot: Honeypot, progress: Optional[Callable[[float, str], None]] = None) -> bool:
     """Update a honeypot container"""
+    progress = progress or (lambda fraction, message: None)
+    docker_client = get_docker_client()
     if not docker_client:
         return False
     
     try:
         # First stop and remove existing container
+        progress(0.1, "Removing existing container")
         remove_honeypot_instance(honeypot)
         
         # Then create a new container with updated configuration
-        return deploy_honeypot_instance(honeypot)
+        return deploy_honeypot_instance(honeypot, lambda fraction, message: progress(0.5 + fraction / 2, message))
     
     except Exception as e:
         logger.error(f"Error updating honeypot container: {str(e)}")
         return False
 
-def remove_honeypot_instance(honeypot: Honeypot) -> bool:
+def remove_honeypot_instance(honeypot: Honeypot, progress: Optional[Callable[[float, str], None]] = None) -> bool:
     """Remove a honeypot container"""
+    progress = progress or (lambda fraction, message: None)
+    docker_client = get_docker_client()
     if not docker_client:
         return False
     
+    from app.services.reconciler import container_reconciler
     try:
         container_name = f"honeypot-{honeypot.id}"
         
         # Find container by name
         try:
             container = docker_client.containers.get(container_name)
+            # Warm pool containers carry their own log volume name
+            volume_names = {f"honeypot-logs-{honeypot.id}"} | {
+                mount["Name"] for mount in container.attrs.get("Mounts", []) if mount.get("Type") == "volume"
+            }
             
             # Stop and remove container
+            progress(0.3, "Stopping container")
             container.stop()
             container.remove()
             
-            # Remove volume
-            volume_name = f"honeypot-logs-{honeypot.id}"
-            try:
-                volume = docker_client.volumes.get(volume_name)
-                volume.remove()
-            except:
-                pass
+            # Remove volumes
+            for volume_name in volume_names:
+                try:
+                    volume = docker_client.volumes.get(volume_name)
+                    volume.remove()
+                except:
+                    pass
             
+            container_reconciler.forget(honeypot.id)
             logger.info(f"Removed honeypot container for honeypot {honeypot.id}")
             return True
         
         except docker.errors.NotFound:
             # Container not found, consider it removed
+            container_reconciler.forget(honeypot.id)
             return True
     
     except Exception as e:
@@ -155,9 +225,16 @@ def remove_honeypot_instance(honeypot: Honeypot) -> bool:
 
 def get_honeypot_status(honeypot: Honeypot) -> str:
     """Get current status of honeypot container"""
+    docker_client = get_docker_client()
     if not docker_client:
         return "unknown"
     
+    # Served from the reconciler's snapshot while it is fresh
+    from app.services.reconciler import container_reconciler
+    cached = container_reconciler.container_status(honeypot.id)
+    if cached is not None:
+        return cached
+    
     try:
         container_name = f"honeypot-{honeypot.id}"
         
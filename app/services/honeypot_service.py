@@ -1,9 +1,40 @@
-from sqlalchemy.orm import Session, joinedload
+from functools import partial
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, raiseload
 from typing import List, Optional
 from uuid import UUID
 from app.models.honeypot import Honeypot
-from app.schemas.honeypot import HoneypotCreate, HoneypotUpdate
+from app.core.database import SessionLocal
+from app.models.simulation import Simulation
+from app.schemas.honeypot import Honeypot as HoneypotSchema, HoneypotCreate, HoneypotUpdate
+from app.services.event_broker import attack_broker
 from app.services.honeypot_manager import deploy_honeypot_instance, update_honeypot_instance, remove_honeypot_instance
+from app.services.job_manager import Job, JobConflict, job_manager
+
+# Columns the API returns; listings load only these and never touch relationships
+HONEYPOT_RESPONSE_COLUMNS = [getattr(Honeypot, field) for field in HoneypotSchema.model_fields]
+
+def honeypots_statement(user_id: UUID, status: Optional[str] = None, type: Optional[str] = None):
+    """A user's honeypots with optional filters, loading only response columns"""
+    statement = select(Honeypot).options(
+        load_only(*HONEYPOT_RESPONSE_COLUMNS),
+        raiseload("*")
+    ).where(Honeypot.user_id == user_id)
+    
+    if status:
+        statement = statement.where(Honeypot.status == status)
+    
+    if type:
+        statement = statement.where(Honeypot.type == type)
+    
+    return statement
+
+def honeypot_statement(honeypot_id: UUID, user_id: UUID):
+    return select(Honeypot).where(
+        Honeypot.id == honeypot_id,
+        Honeypot.user_id == user_id
+    ).options(raiseload("*"))
 
 def create_honeypot(db: Session, honeypot_in: HoneypotCreate, user_id: UUID) -> Honeypot:
     """Create a new honeypot"""
@@ -13,6 +44,7 @@ def create_honeypot(db: Session, honeypot_in: HoneypotCreate, user_id: UUID) ->
     db.add(db_honeypot)
     db.commit()
     db.refresh(db_honeypot)
+    attack_broker.add_honeypot(user_id, db_honeypot.id)
     return db_honeypot
 
 def get_honeypots(
@@ -24,38 +56,50 @@ def get_honeypots(
     type: Optional[str] = None
 ) -> List[Honeypot]:
     """Get all honeypots for a user with optional filters"""
-    query = db.query(Honeypot).filter(Honeypot.user_id == user_id)
-    
-    if status:
-        query = query.filter(Honeypot.status == status)
-    
-    if type:
-        query = query.filter(Honeypot.type == type)
-    
-    return query.offset(skip).limit(limit).all()
+    return db.scalars(honeypots_statement(user_id, status, type).offset(skip).limit(limit)).all()
 
 def get_honeypot(db: Session, honeypot_id: UUID, user_id: UUID) -> Optional[Honeypot]:
     """Get a specific honeypot by ID"""
-    return db.query(Honeypot).filter(
-        Honeypot.id == honeypot_id,
-        Honeypot.user_id == user_id
-    ).options(joinedload(Honeypot.attacks)).first()
+    return db.scalar(honeypot_statement(honeypot_id, user_id))
+
+def honeypot_exists(db: Session, honeypot_id: UUID, user_id: UUID) -> bool:
+    """Whether a honeypot exists and belongs to the user"""
+    return db.query(
+        db.query(Honeypot.id).filter(Honeypot.id == honeypot_id, Honeypot.user_id == user_id).exists()
+    ).scalar()
+
+def honeypot_ids_statement(user_id: UUID, honeypot_id: Optional[UUID] = None):
+    statement = select(Honeypot.id).where(Honeypot.user_id == user_id)
+    if honeypot_id is not None:
+        statement = statement.where(Honeypot.id == honeypot_id)
+    return statement
+
+def get_honeypot_ids(db: Session, user_id: UUID, honeypot_id: Optional[UUID] = None) -> List[UUID]:
+    """IDs of the user's honeypots, or just `honeypot_id` if it is theirs"""
+    return list(db.scalars(honeypot_ids_statement(user_id, honeypot_id)))
 
 def update_honeypot(db: Session, honeypot: Honeypot, honeypot_in: HoneypotUpdate) -> Honeypot:
     """Update honeypot details"""
     update_data = honeypot_in.dict(exclude_unset=True)
+    job = reserve_instance_job("update", honeypot) if honeypot.status == "active" else None
     
     # Update honeypot in database
-    for field, value in update_data.items():
-        setattr(honeypot, field, value)
-    
-    db.add(honeypot)
-    db.commit()
+    try:
+        for field, value in update_data.items():
+            setattr(honeypot, field, value)
+        
+        db.add(honeypot)
+        db.commit()
+    except Exception:
+        db.rollback()
+        if job:
+            job_manager.release(job)
+        raise
     db.refresh(honeypot)
     
     # If the honeypot is active, update the actual instance
-    if honeypot.status == "active":
-        update_honeypot_instance(honeypot)
+    if job:
+        start_instance_job(job, honeypot)
     
     return honeypot
 
@@ -69,34 +113,176 @@ def delete_honeypot(db: Session, honeypot_id: UUID, user_id: UUID) -> bool:
     if not honeypot:
         return False
     
-    # If the honeypot is active, remove the actual instance
-    if honeypot.status == "active":
-        remove_honeypot_instance(honeypot)
+    job = reserve_instance_job("remove", honeypot)
+    snapshot = HoneypotSchema.model_validate(honeypot)
     
     # Delete from database
-    db.delete(honeypot)
-    db.commit()
+    try:
+        db.delete(honeypot)
+        db.commit()
+    except Exception:
+        db.rollback()
+        job_manager.release(job)
+        raise
+    
+    # If the honeypot has a container, remove it in the background
+    if snapshot.status in DEPLOYED_STATUSES:
+        start_instance_job(job, snapshot)
+    else:
+        job_manager.release(job)
     return True
 
-def deploy_honeypot(db: Session, honeypot_id: UUID, user_id: UUID) -> Optional[Honeypot]:
-    """Deploy a honeypot"""
+def deploy_honeypot(db: Session, honeypot_id: UUID, user_id: UUID) -> Optional[Job]:
+    """Queue a deploy for a honeypot; returns the job, or None if not found"""
     honeypot = get_honeypot(db, honeypot_id, user_id)
     
     if not honeypot:
         return None
     
-    # Call the honeypot manager to deploy the actual honeypot
-    success = deploy_honeypot_instance(honeypot)
-    
-    if success:
-        honeypot.status = "active"
+    job = reserve_instance_job("deploy", honeypot)
+    try:
+        honeypot.status = "deploying"
         db.add(honeypot)
         db.commit()
-        db.refresh(honeypot)
-        return honeypot
-    else:
-        honeypot.status = "error"
-        db.add(honeypot)
+    except Exception:
+        db.rollback()
+        job_manager.release(job)
+        raise
+    db.refresh(honeypot)
+    return start_instance_job(job, honeypot)
+
+# Container work runs as background jobs on job_manager's worker pool. The
+# job slot is reserved before the database change commits, so a conflicting
+# job fails the request without leaving the row changed. Jobs get a detached
+# snapshot of the honeypot and record the outcome in the honeypot's status
+# with their own session.
+
+DEPLOYED_STATUSES = ("active", "error")
+
+def set_honeypot_status(honeypot_id: UUID, status: str) -> None:
+    with SessionLocal() as db:
+        db.execute(update(Honeypot).where(Honeypot.id == honeypot_id).values(status=status))
         db.commit()
-        db.refresh(honeypot)
-        return honeypot
\ No newline at end of file
+
+def run_instance_job(kind: str, honeypot: HoneypotSchema, job: Job) -> dict:
+    if kind == "remove":
+        if not remove_honeypot_instance(honeypot, job.report):
+            raise RuntimeError("Failed to remove honeypot container")
+        return {"removed": True}
+    
+    operation = deploy_honeypot_instance if kind == "deploy" else update_honeypot_instance
+    success = operation(honeypot, job.report)
+    set_honeypot_status(honeypot.id, "active" if success else "error")
+    if not success:
+        raise RuntimeError(f"Failed to {kind} honeypot container")
+    return {"status": "active"}
+
+def reserve_instance_job(kind: str, honeypot) -> Job:
+    """Claim the honeypot's job slot for a deploy, update or remove; raises JobConflict if it is taken"""
+    try:
+        return job_manager.reserve(kind, honeypot.id, owner_id=honeypot.user_id)
+    except JobConflict:
+        job = job_manager.active_job(honeypot.id)
+        raise JobConflict(f"A {job.kind if job else 'container'} job is already in progress for this honeypot")
+
+def start_instance_job(job: Job, honeypot) -> Job:
+    """Start a reserved job against a snapshot of the honeypot as committed"""
+    snapshot = HoneypotSchema.model_validate(honeypot)
+    job_manager.start(job, partial(run_instance_job, job.kind, snapshot))
+    return job
+
+# Async variants used when DATABASE_ASYNC is enabled
+
+async def create_honeypot_async(db: AsyncSession, honeypot_in: HoneypotCreate, user_id: UUID) -> Honeypot:
+    """Create a new honeypot"""
+    db_honeypot = Honeypot(**honeypot_in.dict(), user_id=user_id)
+    
+    db.add(db_honeypot)
+    await db.commit()
+    await db.refresh(db_honeypot)
+    attack_broker.add_honeypot(user_id, db_honeypot.id)
+    return db_honeypot
+
+async def get_honeypots_async(
+    db: AsyncSession,
+    user_id: UUID,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[str] = None,
+    type: Optional[str] = None
+) -> List[Honeypot]:
+    """Get all honeypots for a user with optional filters"""
+    return (await db.scalars(honeypots_statement(user_id, status, type).offset(skip).limit(limit))).all()
+
+async def get_honeypot_async(db: AsyncSession, honeypot_id: UUID, user_id: UUID) -> Optional[Honeypot]:
+    """Get a specific honeypot by ID"""
+    return await db.scalar(honeypot_statement(honeypot_id, user_id))
+
+async def get_honeypot_ids_async(db: AsyncSession, user_id: UUID, honeypot_id: Optional[UUID] = None) -> List[UUID]:
+    return list(await db.scalars(honeypot_ids_statement(user_id, honeypot_id)))
+
+async def update_honeypot_async(db: AsyncSession, honeypot: Honeypot, honeypot_in: HoneypotUpdate) -> Honeypot:
+    """Update honeypot details"""
+    job = reserve_instance_job("update", honeypot) if honeypot.status == "active" else None
+    
+    try:
+        for field, value in honeypot_in.dict(exclude_unset=True).items():
+            setattr(honeypot, field, value)
+        
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        if job:
+            job_manager.release(job)
+        raise
+    await db.refresh(honeypot)
+    
+    if job:
+        start_instance_job(job, honeypot)
+    
+    return honeypot
+
+async def delete_honeypot_async(db: AsyncSession, honeypot_id: UUID, user_id: UUID) -> bool:
+    """Delete a honeypot"""
+    honeypot = await get_honeypot_async(db, honeypot_id, user_id)
+    if not honeypot:
+        return False
+    
+    job = reserve_instance_job("remove", honeypot)
+    snapshot = HoneypotSchema.model_validate(honeypot)
+    
+    # Core statements: relationships can't be lazy-loaded on an AsyncSession.
+    # Attacks and rollups go with the honeypot through ON DELETE CASCADE.
+    try:
+        await db.execute(
+            update(Simulation).where(Simulation.target_honeypot_id == honeypot_id).values(target_honeypot_id=None)
+        )
+        await db.execute(delete(Honeypot).where(Honeypot.id == honeypot_id))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        job_manager.release(job)
+        raise
+    
+    if snapshot.status in DEPLOYED_STATUSES:
+        start_instance_job(job, snapshot)
+    else:
+        job_manager.release(job)
+    return True
+
+async def deploy_honeypot_async(db: AsyncSession, honeypot_id: UUID, user_id: UUID) -> Optional[Job]:
+    """Queue a deploy for a honeypot; returns the job, or None if not found"""
+    honeypot = await get_honeypot_async(db, honeypot_id, user_id)
+    if not honeypot:
+        return None
+    
+    job = reserve_instance_job("deploy", honeypot)
+    try:
+        honeypot.status = "deploying"
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        job_manager.release(job)
+        raise
+    await db.refresh(honeypot)
+    return start_instance_job(job, honeypot)
@@ -0,0 +1,88 @@
+"""HyperLogLog sketches for approximate distinct counts (Flajolet et al.).
+
+A sketch of precision p keeps 2^p one-byte registers and estimates the
+number of distinct items with a relative standard error of about
+1.04 / sqrt(2^p): 1.6% at the default p = 12, whatever the cardinality.
+Sketches of the same precision merge by taking the register-wise maximum,
+so per-honeypot, per-hour sketches combine into any set of honeypots and
+hours. Items are hashed with BLAKE2b rather than hash(), which is salted
+per process, so persisted sketches stay comparable across restarts.
+"""
+import hashlib
+import math
+import zlib
+from typing import Iterable, Optional
+import numpy as np
+
+DEFAULT_PRECISION = 12
+
+class HyperLogLog:
+    """Mergeable approximate distinct counter"""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[bytearray] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = registers if registers is not None else bytearray(1 << precision)
+
+    def add(self, item: str) -> bool:
+        """Count an item; returns whether the sketch changed"""
+        value = int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), "big")
+        width = 64 - self.precision
+        index = value >> width
+        rank = width - (value & ((1 << width) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def update(self, items: Iterable[str]) -> bool:
+        """Count several items; returns whether the sketch changed"""
+        changed = False
+        for item in items:
+            changed = self.add(item) or changed
+        return changed
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Fold another sketch of the same precision into this one"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precision")
+        merged = np.maximum(
+            np.frombuffer(self.registers, dtype=np.uint8),
+            np.frombuffer(other.registers, dtype=np.uint8)
+        )
+        self.registers = bytearray(merged.tobytes())
+
+    def count(self) -> int:
+        """Estimated number of distinct items"""
+        registers = np.frombuffer(self.registers, dtype=np.uint8)
+        size = len(registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / float(np.sum(np.ldexp(1.0, -registers.astype(np.int32))))
+        zeros = int(np.count_nonzero(registers == 0))
+        if estimate <= 2.5 * size and zeros:
+            # Linear counting is more accurate while many registers are empty
+            estimate = size * math.log(size / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        """Compact form for storage: precision byte plus compressed registers.
+
+        Sparse sketches, the common case for a single honeypot-hour,
+        compress to a few dozen bytes.
+        """
+        return bytes([self.precision]) + zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        return cls(data[0], bytearray(zlib.decompress(data[1:])))
+
+    @classmethod
+    def merged(cls, sketches: Iterable[bytes], precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        """Union of stored sketches"""
+        registers = np.zeros(1 << precision, dtype=np.uint8)
+        for data in sketches:
+            if data[0] != precision:
+                raise ValueError("Cannot merge sketches of different precision")
+            np.maximum(registers, np.frombuffer(zlib.decompress(data[1:]), dtype=np.uint8), out=registers)
+        return cls(precision, bytearray(registers.tobytes()))
@@ -0,0 +1,179 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from uuid import UUID
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+@dataclass
+class Job:
+    """A unit of background work against one resource, e.g. deploying a honeypot"""
+    kind: str
+    resource_id: UUID
+    owner_id: Optional[UUID] = None
+    id: UUID = field(default_factory=uuid.uuid4)
+    status: str = "queued"  # queued, running, succeeded, failed
+    progress: float = 0.0
+    message: str = "Queued"
+    result: Dict[str, Any] = field(default_factory=dict)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    claims: List[UUID] = field(default_factory=list)
+
+    def report(self, progress: float, message: str) -> None:
+        """Record progress from inside the job"""
+        self.progress = progress
+        self.message = message
+
+class JobConflict(Exception):
+    """Raised when a resource already has a queued or running job"""
+
+class JobManager:
+    """Runs jobs on a bounded thread pool and remembers their outcome.
+
+    At most one job per resource is queued or running at a time. Finished
+    jobs are kept for lookup until `history_size` newer ones push them out.
+    Jobs live in this process only.
+    """
+
+    def __init__(self, max_workers: int = 4, history_size: int = 1000):
+        self.max_workers = max_workers
+        self.history_size = history_size
+        self._jobs: "OrderedDict[UUID, Job]" = OrderedDict()
+        self._active: Dict[UUID, UUID] = {}  # resource_id -> job id
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(
+        self,
+        kind: str,
+        resource_id: UUID,
+        run: Callable[[Job], Optional[Dict[str, Any]]],
+        owner_id: Optional[UUID] = None,
+        claims: Iterable[UUID] = ()
+    ) -> Job:
+        """Queue `run(job)`; its return value becomes the job result.
+
+        `claims` are further resources the job holds until it finishes, e.g.
+        every honeypot in a fleet operation.
+        """
+        job = self.reserve(kind, resource_id, owner_id, claims)
+        self.start(job, run)
+        return job
+
+    def reserve(
+        self,
+        kind: str,
+        resource_id: UUID,
+        owner_id: Optional[UUID] = None,
+        claims: Iterable[UUID] = ()
+    ) -> Job:
+        """Claim the resources for a job that is started later with `start`.
+
+        Raises JobConflict if any of them is already held. Lets a caller make
+        its database change only once the slot is theirs; `release` gives the
+        slot back if that change fails.
+        """
+        job = Job(kind=kind, resource_id=resource_id, owner_id=owner_id)
+        resources = [resource_id, *claims]
+        with self._lock:
+            for resource in resources:
+                if resource in self._active:
+                    raise JobConflict(f"Job {self._active[resource]} is already in progress for {resource}")
+            for resource in resources:
+                self._active[resource] = job.id
+            job.claims = resources
+            self._jobs[job.id] = job
+            self._trim()
+        return job
+
+    def start(self, job: Job, run: Callable[[Job], Optional[Dict[str, Any]]]) -> None:
+        """Run a reserved job on the worker pool"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+            executor = self._executor
+        executor.submit(self._execute, job, run)
+
+    def release(self, job: Job) -> None:
+        """Give up a reserved job that was never started"""
+        with self._lock:
+            self._free(job)
+            self._jobs.pop(job.id, None)
+
+    def get(self, job_id: UUID) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, owner_id: Optional[UUID] = None, resource_id: Optional[UUID] = None) -> List[Job]:
+        """Known jobs, newest first; `resource_id` also matches claimed resources"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [
+            job for job in reversed(jobs)
+            if (owner_id is None or job.owner_id == owner_id)
+            and (resource_id is None or resource_id in job.claims)
+        ]
+
+    def active_job(self, resource_id: UUID) -> Optional[Job]:
+        """The queued or running job holding a resource, if any"""
+        with self._lock:
+            job_id = self._active.get(resource_id)
+            return self._jobs.get(job_id) if job_id else None
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {"max_workers": self.max_workers, "jobs": counts}
+
+    def _execute(self, job: Job, run: Callable[[Job], Optional[Dict[str, Any]]]) -> None:
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        job.report(0.05, "Running")
+        try:
+            job.result = run(job) or {}
+            job.status = "succeeded"
+            job.report(1.0, "Done")
+        except Exception as e:
+            logger.error(f"{job.kind} job {job.id} failed: {str(e)}")
+            job.status = "failed"
+            job.message = str(e)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            with self._lock:
+                self._free(job)
+
+    def _free(self, job: Job) -> None:
+        for resource in job.claims:
+            if self._active.get(resource) == job.id:
+                del self._active[resource]
+
+    def _trim(self) -> None:
+        # Drop the oldest finished jobs beyond the history size
+        excess = len(self._jobs) - self.history_size
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].status not in ACTIVE_STATUSES:
+                del self._jobs[job_id]
+                excess -= 1
+
+
+job_manager = JobManager(max_workers=settings.DOCKER_JOB_WORKERS, history_size=settings.JOB_HISTORY_SIZE)
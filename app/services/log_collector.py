@@ -0,0 +1,283 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+from app.core.config import settings
+from app.core.database import SessionLocal, dialect_insert, engine
+from app.models.honeypot import Honeypot
+from app.models.log_checkpoint import LogCheckpoint
+from app.schemas.attack import AttackCreate
+from app.services.attack_service import attacks_stored, build_attack_rows, write_attack_rows
+from app.services.log_parsers import PARSERS
+from app.services.reconciler import container_reconciler
+
+logger = logging.getLogger(__name__)
+
+# --- Streaming pipeline: lines -> events -> attacks -> batches. Every stage
+# passes along the byte offset just past the line it came from, so a batch
+# knows exactly where to checkpoint.
+
+def read_lines(
+    path: str,
+    offset: int = 0,
+    chunk_size: int = 65536,
+    max_line: int = 65536,
+    max_bytes: Optional[int] = None
+) -> Iterator[Tuple[Optional[bytes], int]]:
+    """Complete lines from `offset` on, with the offset after each.
+
+    Memory is bounded by `chunk_size` plus `max_line`; longer lines are
+    skipped, yielding None in their place so the checkpoint still moves
+    past them. A trailing partial line is left for the next read.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        position = offset
+        pending = b""
+        skipping = False
+        read = 0
+        while max_bytes is None or read < max_bytes:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            read += len(chunk)
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                position += len(line) + 1
+                if skipping:
+                    skipping = False  # Tail end of an oversized line
+                    yield None, position
+                    continue
+                yield line, position
+            if len(pending) > max_line:
+                if not skipping:
+                    logger.warning(f"Skipping a line over {max_line} bytes in {path}")
+                position += len(pending)
+                pending = b""
+                skipping = True
+                yield None, position
+
+def decode_events(lines: Iterable[Tuple[Optional[bytes], int]]) -> Iterator[Tuple[Optional[Dict[str, Any]], int]]:
+    for line, position in lines:
+        event = None
+        if line and line.strip():
+            try:
+                event = json.loads(line)
+            except ValueError:
+                pass
+        yield (event if isinstance(event, dict) else None), position
+
+def parse_attacks(
+    events: Iterable[Tuple[Optional[Dict[str, Any]], int]],
+    parse: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+    honeypot_id: UUID,
+    counts: Optional[Dict[str, int]] = None
+) -> Iterator[Tuple[Optional[AttackCreate], int]]:
+    """Attacks from events; a malformed event is skipped (and counted in counts["skipped"]) rather than stalling the file"""
+    for event, position in events:
+        attack = None
+        try:
+            fields = parse(event) if event else None
+            if fields:
+                attack = AttackCreate(honeypot_id=honeypot_id, **fields)
+        except Exception as e:
+            if counts is not None:
+                counts["skipped"] = counts.get("skipped", 0) + 1
+            logger.debug(f"Skipping malformed event before offset {position}: {str(e)}")
+        yield attack, position
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+# --- Checkpoints
+
+def load_checkpoints(conn: Connection, honeypot_id: UUID) -> Dict[str, Tuple[int, int]]:
+    rows = conn.execute(
+        select(LogCheckpoint.path, LogCheckpoint.inode, LogCheckpoint.offset)
+        .where(LogCheckpoint.honeypot_id == honeypot_id)
+    )
+    return {path: (inode, offset) for path, inode, offset in rows}
+
+def save_checkpoint(conn: Connection, honeypot_id: UUID, path: str, inode: int, offset: int) -> None:
+    table = LogCheckpoint.__table__
+    stmt = dialect_insert(conn, table).values(honeypot_id=honeypot_id, path=path, inode=inode, offset=offset)
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.honeypot_id, table.c.path],
+        set_={"inode": stmt.excluded.inode, "offset": stmt.excluded.offset}
+    ))
+
+# --- Collection
+
+def collect_file(
+    honeypot_id: UUID,
+    honeypot_type: str,
+    path: str,
+    name: str,
+    checkpoint: Optional[Tuple[int, int]] = None,
+    batch_size: int = 1000,
+    max_bytes: Optional[int] = None
+) -> Dict[str, int]:
+    """Ingest new lines of one log file; attacks and the new offset commit together"""
+    parse = PARSERS.get(honeypot_type)
+    counts = {"lines": 0, "attacks": 0, "skipped": 0}
+    if parse is None:
+        return counts
+
+    inode = os.stat(path).st_ino
+    offset = 0
+    if checkpoint and checkpoint[0] == inode and checkpoint[1] <= os.path.getsize(path):
+        offset = checkpoint[1]  # Otherwise the file was rotated or truncated: start over
+
+    lines = read_lines(path, offset, max_bytes=max_bytes)
+    for batch in batched(parse_attacks(decode_events(lines), parse, honeypot_id, counts), batch_size):
+        attacks = [attack for attack, _ in batch if attack is not None]
+        with engine.begin() as conn:
+            stored = write_attack_rows(conn, build_attack_rows(attacks))
+            save_checkpoint(conn, honeypot_id, name, inode, batch[-1][1])
+        attacks_stored(stored)
+        counts["attacks"] += len(stored)
+        counts["lines"] += len(batch)
+    if counts["skipped"]:
+        logger.warning(f"Skipped {counts['skipped']} malformed events in {path}")
+    return counts
+
+def collect_directory(
+    honeypot_id: UUID,
+    honeypot_type: str,
+    directory: str,
+    pattern: str = "**/*.json",
+    batch_size: int = 1000,
+    max_bytes: Optional[int] = None
+) -> Dict[str, int]:
+    """Ingest every log file under a honeypot's log directory"""
+    with engine.connect() as conn:
+        checkpoints = load_checkpoints(conn, honeypot_id)
+    totals = {"files": 0, "lines": 0, "attacks": 0, "skipped": 0}
+    for path in sorted(glob.glob(os.path.join(directory, pattern), recursive=True)):
+        name = os.path.relpath(path, directory)
+        counts = collect_file(
+            honeypot_id, honeypot_type, path, name,
+            checkpoint=checkpoints.get(name), batch_size=batch_size, max_bytes=max_bytes
+        )
+        totals["files"] += 1
+        totals["lines"] += counts["lines"]
+        totals["attacks"] += counts["attacks"]
+        totals["skipped"] += counts["skipped"]
+    return totals
+
+def log_directories(root: str) -> List[Tuple[UUID, str, str]]:
+    """(honeypot_id, type, directory) for every active honeypot's log volume on this host"""
+    with SessionLocal() as db:
+        honeypots = db.execute(select(Honeypot.id, Honeypot.type).where(Honeypot.status == "active")).all()
+    snapshot = container_reconciler.snapshot()
+
+    directories = []
+    for honeypot_id, honeypot_type in honeypots:
+        state = snapshot.get(honeypot_id) if snapshot is not None else container_reconciler.state(honeypot_id)
+        # Pool containers bring their own volume name and no HONEYPOT_ID, so
+        # the volume is what ties their events to the honeypot
+        volumes = state.volumes if state and state.volumes else [f"honeypot-logs-{honeypot_id}"]
+        for volume in volumes:
+            directory = os.path.join(root, volume, "_data")
+            if os.path.isdir(directory):
+                directories.append((honeypot_id, honeypot_type, directory))
+    return directories
+
+class LogCollector:
+    """Tails honeypot log volumes and feeds their events into the attacks table.
+
+    Reads the volumes straight from the Docker host's volume directory
+    (HONEYPOT_LOG_ROOT), so the API host needs it mounted. Offsets are
+    checkpointed in the same transaction as the attacks they produced,
+    so a restart neither loses nor repeats events. Each file gives up at
+    most `max_bytes` per pass to keep one noisy honeypot from starving the
+    rest.
+    """
+
+    def __init__(self, root: str, pattern: str, interval_seconds: float = 5.0,
+                 batch_size: int = 1000, max_bytes: int = 4 * 1024 * 1024):
+        self.root = root
+        self.pattern = pattern
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.passes = 0
+        self.lines = 0
+        self.attacks = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_pass_ms: Optional[float] = None
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval_seconds <= 0 or not os.path.isdir(self.root):
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="log-collector", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(5)
+        self._thread = None
+
+    def collect(self) -> None:
+        """Run one pass over every active honeypot's logs"""
+        started = time.perf_counter()
+        for honeypot_id, honeypot_type, directory in log_directories(self.root):
+            if self._stopping.is_set():
+                break
+            try:
+                totals = collect_directory(
+                    honeypot_id, honeypot_type, directory, self.pattern, self.batch_size, self.max_bytes
+                )
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error collecting logs for honeypot {honeypot_id}: {str(e)}")
+                continue
+            self.lines += totals["lines"]
+            self.attacks += totals["attacks"]
+            self.skipped += totals["skipped"]
+        self.passes += 1
+        self.last_pass_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self._thread is not None,
+            "passes": self.passes,
+            "lines": self.lines,
+            "attacks": self.attacks,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "last_pass_ms": self.last_pass_ms
+        }
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self.collect()
+            except Exception as e:
+                logger.error(f"Error collecting honeypot logs: {str(e)}")
+            self._stopping.wait(self.interval_seconds)
+
+
+log_collector = LogCollector(
+    root=settings.HONEYPOT_LOG_ROOT,
+    pattern=settings.HONEYPOT_LOG_GLOB,
+    interval_seconds=settings.LOG_COLLECT_INTERVAL,
+    batch_size=settings.LOG_COLLECT_BATCH
+)
@@ -0,0 +1,105 @@
+"""Turn honeypot sensor log events into attacks.
+
+Each parser takes one decoded JSON event and returns the attack fields
+(`source_ip`, `attack_type`, `severity`, `details`, `timestamp`) or None
+for events that aren't attacks, e.g. session bookkeeping.
+"""
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+Event = Dict[str, Any]
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+def source_ip(event: Event) -> Optional[str]:
+    peer = event.get("peer")
+    if isinstance(peer, dict) and peer.get("ip"):
+        return peer["ip"]
+    return event.get("src_ip") or event.get("remote_ip") or event.get("ip")
+
+def attack(event: Event, attack_type: str, severity: str, **details: Any) -> Optional[Dict[str, Any]]:
+    ip = source_ip(event)
+    if not ip:
+        return None
+    return {
+        "source_ip": ip,
+        "attack_type": attack_type,
+        "severity": severity,
+        "details": {key: value for key, value in details.items() if value is not None},
+        "timestamp": parse_timestamp(event.get("timestamp"))
+    }
+
+def parse_cowrie(event: Event) -> Optional[Dict[str, Any]]:
+    """Cowrie SSH/Telnet events (cowrie.json)"""
+    event_id = event.get("eventid", "")
+    session = event.get("session")
+    if event_id == "cowrie.login.failed":
+        return attack(event, "SSH-BRUTEFORCE", "medium",
+                      username=event.get("username"), password=event.get("password"), session=session)
+    if event_id == "cowrie.login.success":
+        return attack(event, "SSH-LOGIN", "high",
+                      username=event.get("username"), password=event.get("password"), session=session)
+    if event_id in ("cowrie.command.input", "cowrie.command.failed"):
+        return attack(event, "SSH-COMMAND", "high", command=event.get("input"), session=session)
+    if event_id in ("cowrie.session.file_download", "cowrie.session.file_upload"):
+        return attack(event, "SSH-MALWARE-DOWNLOAD", "high",
+                      url=event.get("url"), shasum=event.get("shasum"), session=session)
+    return None
+
+def parse_ftp(event: Event) -> Optional[Dict[str, Any]]:
+    """FTP honeypot events: logins and file commands"""
+    kind = event.get("event") or event.get("type")
+    kind = kind.lower() if isinstance(kind, str) else ""
+    command = event.get("command")
+    command = command.upper() if isinstance(command, str) else ""
+    if kind in ("login", "login_failed", "auth") or command in ("USER", "PASS"):
+        return attack(event, "FTP-BRUTEFORCE", "medium",
+                      username=event.get("username"), password=event.get("password"),
+                      success=event.get("success"))
+    if command in ("RETR", "STOR", "DELE", "SITE"):
+        return attack(event, "FTP-FILE-ACCESS", "high" if command in ("STOR", "SITE") else "medium",
+                      command=command, path=event.get("filename") or event.get("args"))
+    return None
+
+# Tanner detection names, as reported through SNARE
+SNARE_DETECTIONS = {
+    "sqli": ("WEB-SQL-INJECTION", "high"),
+    "xss": ("WEB-XSS", "medium"),
+    "lfi": ("WEB-LFI", "high"),
+    "rfi": ("WEB-RFI", "high"),
+    "cmd_exec": ("WEB-COMMAND-INJECTION", "high"),
+    "php_code_injection": ("WEB-CODE-INJECTION", "high"),
+    "php_object_injection": ("WEB-CODE-INJECTION", "high"),
+    "template_injection": ("WEB-CODE-INJECTION", "high"),
+    "xxe_injection": ("WEB-XXE", "high"),
+    "crlf": ("WEB-CRLF-INJECTION", "medium"),
+}
+
+def parse_snare(event: Event) -> Optional[Dict[str, Any]]:
+    """SNARE web requests, classified by Tanner's detection when present"""
+    if not event.get("path") and not event.get("method"):
+        return None
+    detection = event.get("detection")
+    name = detection.get("name") if isinstance(detection, dict) else None
+    if not isinstance(name, str):
+        name = None
+    attack_type, severity = SNARE_DETECTIONS.get(name, ("WEB-SCAN", "low"))
+    headers = event.get("headers")
+    if not isinstance(headers, dict):
+        headers = {}
+    return attack(event, attack_type, severity,
+                  method=event.get("method"), url=event.get("path"),
+                  user_agent=headers.get("user-agent") or headers.get("User-Agent"),
+                  detection=name)
+
+PARSERS: Dict[str, Callable[[Event], Optional[Dict[str, Any]]]] = {
+    "SSH": parse_cowrie,
+    "FTP": parse_ftp,
+    "Web": parse_snare,
+}
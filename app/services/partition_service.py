@@ -0,0 +1,251 @@
+import logging
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.core.config import settings
+from app.core.database import engine
+from app.models.attack import Attack
+
+logger = logging.getLogger(__name__)
+
+TABLE = Attack.__tablename__
+DEFAULT_PARTITION = f"{TABLE}_default"
+LEGACY_TABLE = f"{TABLE}_legacy"
+EXPIRED_TABLE = f"{DEFAULT_PARTITION}_expired"  # Expired default-partition rows when retention only detaches
+MAINTENANCE_LOCK_ID = 0x6174746b  # Serializes maintenance across API workers
+
+BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+def period_start(timestamp: datetime, interval: str) -> datetime:
+    """Lower bound of the partition period containing a timestamp"""
+    start = timestamp.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "month":
+        return start.replace(day=1)
+    if interval == "week":
+        return start - timedelta(days=start.weekday())
+    return start
+
+def next_period(start: datetime, interval: str) -> datetime:
+    """Lower bound of the period after `start`"""
+    if interval == "month":
+        return (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+    if interval == "week":
+        return start + timedelta(weeks=1)
+    return start + timedelta(days=1)
+
+def partition_name(start: datetime) -> str:
+    return f"{TABLE}_p{start:%Y%m%d}"
+
+def is_partitioned(conn: Connection) -> bool:
+    """Whether the attacks table is a native partitioned table"""
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :table AND c.relnamespace = 'public'::regnamespace"
+    ), {"table": TABLE}).scalar())
+
+def list_partitions(conn: Connection) -> List[Tuple[str, datetime, datetime]]:
+    """Range partitions of the attacks table as (name, lower, upper), oldest first"""
+    rows = conn.execute(text(
+        "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+        "FROM pg_inherits i "
+        "JOIN pg_class parent ON parent.oid = i.inhparent "
+        "JOIN pg_class child ON child.oid = i.inhrelid "
+        "WHERE parent.relname = :table"
+    ), {"table": TABLE}).all()
+
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_PATTERN.search(bound or "")
+        if not match:
+            continue  # The default partition has no range
+        partitions.append((name, datetime.fromisoformat(match.group(1)), datetime.fromisoformat(match.group(2))))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+def create_partition(conn: Connection, start: datetime, end: datetime) -> str:
+    """Create the partition for [start, end), moving any rows the default partition already holds for it"""
+    name = partition_name(start)
+    create = (
+        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{TABLE}" '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+    bounds = {"start": start, "end": end}
+    stranded = conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION}).scalar() and conn.execute(text(
+        f'SELECT 1 FROM "{DEFAULT_PARTITION}" WHERE "timestamp" >= :start AND "timestamp" < :end LIMIT 1'
+    ), bounds).scalar()
+    if not stranded:
+        conn.execute(text(create))
+        return name
+
+    # Postgres won't carve a range out of a default partition holding rows
+    # in it (late maintenance, or client timestamps beyond ATTACK_PARTITIONS_AHEAD),
+    # so take the default out while its rows move over
+    columns = ", ".join(f'"{column.name}"' for column in Attack.__table__.columns)
+    conn.execute(text(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{DEFAULT_PARTITION}"'))
+    conn.execute(text(create))
+    moved = conn.execute(text(
+        f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE "timestamp" >= :start AND "timestamp" < :end '
+        f"RETURNING {columns}) "
+        f'INSERT INTO "{name}" ({columns}) SELECT {columns} FROM moved'
+    ), bounds).rowcount
+    conn.execute(text(f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{DEFAULT_PARTITION}" DEFAULT'))
+    logger.info(f"Moved {moved} attack(s) from {DEFAULT_PARTITION} into {name}")
+    return name
+
+def ensure_partitions(
+    conn: Connection,
+    interval: str,
+    ahead: int,
+    since: Optional[datetime] = None
+) -> List[str]:
+    """Create missing partitions from `since` (default: now) through `ahead` future periods"""
+    now = datetime.now(timezone.utc)
+    existing = list_partitions(conn)
+    start = period_start(since or now, interval)
+    end = period_start(now, interval)
+    for _ in range(ahead):
+        end = next_period(end, interval)
+
+    created = []
+    while start <= end:
+        upper = next_period(start, interval)
+        # Skip ranges already covered, e.g. after the interval setting changed
+        if not any(lower < upper and start < existing_upper for _, lower, existing_upper in existing):
+            # One savepoint each, so a partition that can't be created doesn't block the rest or retention
+            try:
+                with conn.begin_nested():
+                    created.append(create_partition(conn, start, upper))
+            except Exception as e:
+                logger.error(f"Could not create attack partition {partition_name(start)}: {str(e)}")
+        start = upper
+
+    conn.execute(text(f'CREATE TABLE IF NOT EXISTS "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT'))
+    for name in created:
+        logger.info(f"Created attack partition {name}")
+    return created
+
+def enforce_retention(conn: Connection, retention_days: int, drop: bool = True) -> List[str]:
+    """Detach (and optionally drop) partitions entirely older than the retention window.
+
+    Backdated attacks from before every range partition, or from a period
+    whose partition is already gone, sit in the default partition; those
+    older than the cutoff are deleted, or moved to attacks_default_expired
+    when partitions are only detached.
+    """
+    if retention_days <= 0:
+        return []
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    removed = []
+    for name, _, upper in list_partitions(conn):
+        if upper > cutoff:
+            break
+        conn.execute(text(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"'))
+        if drop:
+            conn.execute(text(f'DROP TABLE "{name}"'))
+        removed.append(name)
+        logger.info(f"{'Dropped' if drop else 'Detached'} attack partition {name}")
+
+    if conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION}).scalar():
+        expire = f'DELETE FROM "{DEFAULT_PARTITION}" WHERE "timestamp" < :cutoff'
+        if not drop:
+            columns = ", ".join(f'"{column.name}"' for column in Attack.__table__.columns)
+            conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{EXPIRED_TABLE}" (LIKE "{TABLE}" INCLUDING DEFAULTS)'
+            ))
+            expire = (
+                f"WITH moved AS ({expire} RETURNING {columns}) "
+                f'INSERT INTO "{EXPIRED_TABLE}" ({columns}) SELECT {columns} FROM moved'
+            )
+        expired = conn.execute(text(expire), {"cutoff": cutoff}).rowcount
+        if expired:
+            logger.info(f"{'Deleted' if drop else f'Moved to {EXPIRED_TABLE}'} {expired} expired attack(s) from {DEFAULT_PARTITION}")
+    return removed
+
+def run_partition_maintenance() -> None:
+    """Create upcoming partitions and apply retention (PostgreSQL only)"""
+    if engine.dialect.name != "postgresql":
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MAINTENANCE_LOCK_ID})
+        if not is_partitioned(conn):
+            logger.warning("Attacks table is not partitioned; run `python -m app.maintenance migrate-partitions`")
+            return
+        ensure_partitions(conn, settings.ATTACK_PARTITION_INTERVAL, settings.ATTACK_PARTITIONS_AHEAD)
+        enforce_retention(conn, settings.ATTACK_RETENTION_DAYS, settings.ATTACK_RETENTION_DROP)
+
+def migrate_to_partitioned(conn: Connection, drop_legacy: bool = False) -> None:
+    """Convert an existing unpartitioned attacks table into a partitioned one.
+
+    The old table is renamed to attacks_legacy, its rows are copied into
+    partitions covering their full time range, and it is dropped only when
+    `drop_legacy` is set.
+    """
+    if is_partitioned(conn):
+        logger.info("Attacks table is already partitioned")
+        return
+
+    conn.execute(text(f'ALTER TABLE "{TABLE}" RENAME TO "{LEGACY_TABLE}"'))
+    # Free up constraint and index names for the new table, and stop the
+    # legacy copy from blocking honeypot or simulation deletes
+    for name, kind in conn.execute(text(
+        "SELECT conname, contype FROM pg_constraint WHERE conrelid = CAST(:table AS regclass)"
+    ), {"table": LEGACY_TABLE}).all():
+        if kind == "f":
+            conn.execute(text(f'ALTER TABLE "{LEGACY_TABLE}" DROP CONSTRAINT "{name}"'))
+        else:
+            conn.execute(text(f'ALTER TABLE "{LEGACY_TABLE}" RENAME CONSTRAINT "{name}" TO "legacy_{name}"'))
+    for (name,) in conn.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE tablename = :table AND indexname LIKE 'ix_%'"
+    ), {"table": LEGACY_TABLE}).all():
+        conn.execute(text(f'ALTER INDEX "{name}" RENAME TO "legacy_{name}"'))
+
+    Attack.__table__.create(conn)
+
+    oldest = conn.execute(text(f'SELECT min("timestamp") FROM "{LEGACY_TABLE}"')).scalar()
+    ensure_partitions(conn, settings.ATTACK_PARTITION_INTERVAL, settings.ATTACK_PARTITIONS_AHEAD, since=oldest)
+
+    columns = ", ".join(f'"{column.name}"' for column in Attack.__table__.columns)
+    copied = conn.execute(text(
+        f'INSERT INTO "{TABLE}" ({columns}) SELECT {columns} FROM "{LEGACY_TABLE}"'
+    )).rowcount
+    logger.info(f"Copied {copied} attack(s) into the partitioned table")
+
+    if drop_legacy:
+        conn.execute(text(f'DROP TABLE "{LEGACY_TABLE}"'))
+
+class PartitionMaintainer:
+    """Background thread that runs partition maintenance periodically"""
+
+    def __init__(self, interval_seconds: int = 3600):
+        self.interval_seconds = interval_seconds
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None or engine.dialect.name != "postgresql":
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="partition-maintainer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(5)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                run_partition_maintenance()
+            except Exception as e:
+                logger.error(f"Error running partition maintenance: {str(e)}")
+            self._stopping.wait(self.interval_seconds)
+
+
+partition_maintainer = PartitionMaintainer(interval_seconds=settings.PARTITION_MAINTENANCE_INTERVAL)
@@ -0,0 +1,249 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import docker
+from sqlalchemy import bindparam, func, select, update
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.honeypot import Honeypot
+from app.services import honeypot_manager
+from app.services.job_manager import job_manager
+from app.services.rollup_service import as_utc
+
+logger = logging.getLogger(__name__)
+
+CONTAINER_PREFIX = "honeypot-"
+
+# Docker container state -> Honeypot.status
+HONEYPOT_STATUSES = {
+    "running": "active",
+    "restarting": "active",
+    "created": "inactive",
+    "paused": "inactive",
+    "exited": "error",
+    "dead": "error",
+}
+
+@dataclass
+class ContainerState:
+    """What the reconciler last saw of one honeypot's container"""
+    container_id: str
+    status: str
+    image: Optional[str] = None
+    volumes: List[str] = field(default_factory=list)
+    ip_address: Optional[str] = None  # On DOCKER_NETWORK
+
+def container_state(container) -> ContainerState:
+    attrs = container.attrs or {}
+    network = (attrs.get("NetworkSettings") or {}).get("Networks", {}).get(settings.DOCKER_NETWORK) or {}
+    return ContainerState(
+        container_id=container.id,
+        status=container.status,
+        image=attrs.get("Config", {}).get("Image"),
+        volumes=[mount["Name"] for mount in attrs.get("Mounts", []) if mount.get("Type") == "volume"],
+        ip_address=network.get("IPAddress") or None
+    )
+
+def honeypot_id_from_name(name: str) -> Optional[UUID]:
+    name = name.lstrip("/")
+    if not name.startswith(CONTAINER_PREFIX):
+        return None
+    try:
+        return UUID(name[len(CONTAINER_PREFIX):])
+    except ValueError:
+        return None
+
+def list_honeypot_containers(client) -> Dict[UUID, ContainerState]:
+    """Every honeypot container, running or not, from a single list call"""
+    snapshot = {}
+    for container in client.containers.list(all=True, filters={"name": CONTAINER_PREFIX}):
+        honeypot_id = honeypot_id_from_name(container.name)
+        if honeypot_id is not None:
+            snapshot[honeypot_id] = container_state(container)
+    return snapshot
+
+def desired_status(current: str, state: Optional[ContainerState]) -> str:
+    if state is None:
+        return "inactive" if current in ("active", "error", "deploying") else current
+    return HONEYPOT_STATUSES.get(state.status, current)
+
+class ContainerReconciler:
+    """Keeps Honeypot.status and container_id in line with Docker.
+
+    Each pass lists all honeypot containers in one call, diffs them against
+    the honeypots table and writes only the rows that drifted. The snapshot
+    is kept so status reads are a dictionary lookup. Deploys and removals
+    push their outcome in with `observe`/`forget` so reads don't wait for
+    the next pass; a Docker events subscription could feed the same hooks.
+    Honeypots with a queued or running job are left to that job. A
+    "deploying" row with no job in this process may belong to another
+    worker, so it is only settled once untouched for `deploying_after`
+    seconds.
+    """
+
+    def __init__(self, interval_seconds: float = 15.0, deploying_after: float = 300.0):
+        self.interval_seconds = interval_seconds
+        self.deploying_after = deploying_after
+        self._snapshot: Dict[UUID, ContainerState] = {}
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.runs = 0
+        self.rows_updated = 0
+        self.last_run_ms: Optional[float] = None
+        self.last_run_at: Optional[datetime] = None
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval_seconds <= 0:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="container-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(5)
+        self._thread = None
+
+    def reconcile(self) -> int:
+        """Run one pass; returns the number of honeypot rows updated"""
+        client = honeypot_manager.get_docker_client()
+        if client is None:
+            return 0
+        started = time.perf_counter()
+        with SessionLocal() as db:
+            # Read the table before listing containers, so a job that finishes
+            # in between can only make the snapshot newer than the rows
+            rows = db.execute(select(
+                Honeypot.id, Honeypot.status, Honeypot.container_id,
+                func.coalesce(Honeypot.updated_at, Honeypot.created_at)
+            )).all()
+            snapshot = list_honeypot_containers(client)
+            with self._lock:
+                self._snapshot = snapshot
+                self._refreshed_at = time.monotonic()
+
+            stale_before = datetime.now(timezone.utc) - timedelta(seconds=self.deploying_after)
+            changes = []
+            for honeypot_id, current, container_id, touched_at in rows:
+                if job_manager.active_job(honeypot_id) is not None:
+                    continue
+                if current == "deploying" and touched_at is not None and as_utc(touched_at) > stale_before:
+                    continue
+                state = snapshot.get(honeypot_id)
+                status = desired_status(current, state)
+                new_container_id = state.container_id if state else None
+                if status != current or new_container_id != container_id:
+                    changes.append({
+                        "honeypot_id": honeypot_id,
+                        "seen_status": current,
+                        "status": status,
+                        "container_id": new_container_id
+                    })
+
+            if changes:
+                table = Honeypot.__table__
+                db.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("honeypot_id"))
+                    .where(table.c.status == bindparam("seen_status"))  # Skip rows changed since the read
+                    .values(
+                        status=bindparam("status"),
+                        container_id=bindparam("container_id"),
+                        updated_at=table.c.updated_at  # Not an edit by the owner
+                    ),
+                    sorted(changes, key=lambda change: str(change["honeypot_id"]))
+                )
+                db.commit()
+
+        with self._lock:
+            self.runs += 1
+            self.rows_updated += len(changes)
+            self.last_run_ms = round((time.perf_counter() - started) * 1000, 3)
+            self.last_run_at = datetime.now(timezone.utc)
+        if changes:
+            logger.info(f"Reconciled {len(changes)} honeypot statuses")
+        return len(changes)
+
+    def snapshot(self) -> Optional[Dict[UUID, ContainerState]]:
+        """A copy of the last snapshot, or None when the reconciler isn't keeping it fresh"""
+        with self._lock:
+            return dict(self._snapshot) if self._is_fresh() else None
+
+    def container_status(self, honeypot_id: UUID) -> Optional[str]:
+        """Cached container status, "not_deployed", or None when there's no fresh snapshot"""
+        with self._lock:
+            if not self._is_fresh():
+                return None
+            state = self._snapshot.get(honeypot_id)
+        return state.status if state else "not_deployed"
+
+    def state(self, honeypot_id: UUID) -> Optional[ContainerState]:
+        """A honeypot's container, from the snapshot while it is fresh or else from Docker"""
+        with self._lock:
+            state = self._snapshot.get(honeypot_id) if self._is_fresh() else None
+        if state is None:
+            client = honeypot_manager.get_docker_client()
+            if client is None:
+                return None
+            try:
+                state = container_state(client.containers.get(f"{CONTAINER_PREFIX}{honeypot_id}"))
+            except docker.errors.NotFound:
+                return None
+        return state
+
+    def deployed_address(self, honeypot_id: UUID) -> Optional[str]:
+        """Address of a honeypot's running container on DOCKER_NETWORK"""
+        state = self.state(honeypot_id)
+        return state.ip_address if state and state.status == "running" else None
+
+    def _is_fresh(self) -> bool:
+        # Called with the lock held
+        if self._refreshed_at is None or self._thread is None:
+            return False
+        return time.monotonic() - self._refreshed_at < 2 * self.interval_seconds
+
+    def observe(self, honeypot_id: UUID, container) -> None:
+        """Record a container just created or changed by this process"""
+        state = container_state(container)
+        with self._lock:
+            self._snapshot[honeypot_id] = state
+
+    def forget(self, honeypot_id: UUID) -> None:
+        """Record that a honeypot's container was removed"""
+        with self._lock:
+            self._snapshot.pop(honeypot_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self._thread is not None,
+                "containers": len(self._snapshot),
+                "fresh": self._is_fresh(),
+                "runs": self.runs,
+                "rows_updated": self.rows_updated,
+                "last_run_ms": self.last_run_ms,
+                "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None
+            }
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self.reconcile()
+            except Exception as e:
+                logger.error(f"Error reconciling honeypot containers: {str(e)}")
+            self._stopping.wait(self.interval_seconds)
+
+
+container_reconciler = ContainerReconciler(
+    interval_seconds=settings.RECONCILE_INTERVAL,
+    deploying_after=settings.RECONCILE_DEPLOYING_AFTER
+)
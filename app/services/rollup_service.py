@@ -0,0 +1,202 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import Any, Dict, List, Set, Tuple
+from uuid import UUID
+from sqlalchemy import bindparam, case, delete, func, insert, select, tuple_, update
+from sqlalchemy.engine import Connection
+from app.core.database import dialect_insert
+from app.models.attack import Attack
+from app.models.attack_rollup import AttackDistinctSketch, AttackHourlyRollup, AttackSourceCount
+from app.models.honeypot import Honeypot
+from app.services.hyperloglog import HyperLogLog
+
+UNKNOWN = "unknown"
+
+def as_utc(timestamp: datetime) -> datetime:
+    """Normalize a timestamp to timezone-aware UTC (naive values are taken as UTC)"""
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+def hour_bucket(timestamp: datetime) -> datetime:
+    """Start of the UTC hour containing a timestamp"""
+    return as_utc(timestamp).replace(minute=0, second=0, microsecond=0)
+
+def next_hour_boundary(timestamp: datetime) -> datetime:
+    """First hour boundary at or after a timestamp"""
+    bucket = hour_bucket(timestamp)
+    return bucket if bucket == as_utc(timestamp) else bucket + timedelta(hours=1)
+
+def apply_attack_rows(conn: Connection, rows: List[Dict[str, Any]]) -> None:
+    """Fold a batch of newly inserted attacks into the rollups and honeypot attack counts.
+
+    Runs in the same transaction as the insert so rollups never drift
+    from the raw table.
+    """
+    if not rows:
+        return
+
+    hourly = Counter()
+    per_honeypot = Counter(row["honeypot_id"] for row in rows)
+    sources: Dict[Tuple[UUID, str], List[Any]] = {}
+    distinct: Dict[Tuple[UUID, datetime], Set[str]] = {}
+    for row in rows:
+        timestamp = as_utc(row["timestamp"])
+        bucket = timestamp.replace(minute=0, second=0, microsecond=0)
+        hourly[(
+            row["honeypot_id"],
+            bucket,
+            row.get("attack_type") or UNKNOWN,
+            row.get("severity") or UNKNOWN
+        )] += 1
+        distinct.setdefault((row["honeypot_id"], bucket), set()).add(row.get("source_ip") or UNKNOWN)
+
+        key = (row["honeypot_id"], row.get("source_ip") or UNKNOWN)
+        entry = sources.get(key)
+        if entry is None:
+            sources[key] = [1, timestamp, timestamp]
+        else:
+            entry[0] += 1
+            entry[1] = min(entry[1], timestamp)
+            entry[2] = max(entry[2], timestamp)
+
+    # Update in key order so concurrent writers lock rows in the same order
+    conn.execute(
+        update(Honeypot.__table__)
+        .where(Honeypot.__table__.c.id == bindparam("honeypot_id"))
+        .values(
+            attack_count=func.coalesce(Honeypot.__table__.c.attack_count, 0) + bindparam("added"),
+            updated_at=Honeypot.__table__.c.updated_at  # Counting attacks isn't an edit
+        ),
+        [{"honeypot_id": hp, "added": count} for hp, count in sorted(per_honeypot.items(), key=lambda item: str(item[0]))]
+    )
+
+    table = AttackHourlyRollup.__table__
+    stmt = dialect_insert(conn, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.honeypot_id, table.c.bucket, table.c.attack_type, table.c.severity],
+        set_={"count": table.c.count + stmt.excluded["count"]}
+    )
+    conn.execute(stmt, [
+        {"honeypot_id": hp, "bucket": bucket, "attack_type": attack_type, "severity": severity, "count": count}
+        for (hp, bucket, attack_type, severity), count in sorted(hourly.items(), key=lambda item: str(item[0]))
+    ])
+
+    table = AttackSourceCount.__table__
+    stmt = dialect_insert(conn, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.honeypot_id, table.c.source_ip],
+        set_={
+            "count": table.c.count + stmt.excluded["count"],
+            "first_seen": case(
+                (stmt.excluded.first_seen < table.c.first_seen, stmt.excluded.first_seen),
+                else_=table.c.first_seen
+            ),
+            "last_seen": case(
+                (stmt.excluded.last_seen > table.c.last_seen, stmt.excluded.last_seen),
+                else_=table.c.last_seen
+            )
+        }
+    )
+    conn.execute(stmt, [
+        {"honeypot_id": hp, "source_ip": source_ip, "count": count, "first_seen": first_seen, "last_seen": last_seen}
+        for (hp, source_ip), (count, first_seen, last_seen) in sorted(sources.items(), key=lambda item: str(item[0]))
+    ])
+
+    apply_distinct_sketches(conn, distinct)
+
+def apply_distinct_sketches(conn: Connection, distinct: Dict[Tuple[UUID, datetime], Set[str]]) -> None:
+    """Add source IPs to the hourly HyperLogLog sketches.
+
+    Registers can't be merged in SQL, so missing rows are created empty,
+    then the touched rows are locked, merged here and written back. Rows
+    whose registers didn't change, the usual case for repeat attackers,
+    aren't rewritten.
+    """
+    if not distinct:
+        return
+
+    table = AttackDistinctSketch.__table__
+    keys = sorted(distinct, key=str)
+    empty = HyperLogLog().to_bytes()
+    conn.execute(
+        dialect_insert(conn, table).on_conflict_do_nothing(index_elements=[table.c.honeypot_id, table.c.bucket]),
+        [{"honeypot_id": hp, "bucket": bucket, "registers": empty} for hp, bucket in keys]
+    )
+    stored = conn.execute(
+        select(table.c.honeypot_id, table.c.bucket, table.c.registers)
+        .where(tuple_(table.c.honeypot_id, table.c.bucket).in_(keys))
+        .order_by(table.c.honeypot_id, table.c.bucket)
+        .with_for_update()
+    ).all()
+
+    changed = []
+    for hp, bucket, registers in stored:
+        ips = distinct.get((hp, as_utc(bucket)))
+        if not ips:
+            continue
+        sketch = HyperLogLog.from_bytes(registers)
+        if sketch.update(ips):
+            changed.append({"key_honeypot_id": hp, "key_bucket": bucket, "registers": sketch.to_bytes()})
+    if changed:
+        conn.execute(
+            update(table)
+            .where(table.c.honeypot_id == bindparam("key_honeypot_id"), table.c.bucket == bindparam("key_bucket"))
+            .values(registers=bindparam("registers")),
+            changed
+        )
+
+def rebuild_rollups(conn: Connection) -> None:
+    """Recompute every rollup and honeypot attack count from the raw attacks table"""
+    conn.execute(delete(AttackHourlyRollup))
+    conn.execute(delete(AttackSourceCount))
+    conn.execute(delete(AttackDistinctSketch))
+
+    if conn.dialect.name == "postgresql":
+        bucket = func.timezone("UTC", func.date_trunc("hour", func.timezone("UTC", Attack.timestamp)))
+    else:
+        bucket = func.strftime("%Y-%m-%d %H:00:00.000000", Attack.timestamp)  # SQLAlchemy storage format
+    attack_type = func.coalesce(Attack.attack_type, UNKNOWN)
+    severity = func.coalesce(Attack.severity, UNKNOWN)
+    source_ip = func.coalesce(Attack.source_ip, UNKNOWN)
+
+    conn.execute(insert(AttackHourlyRollup).from_select(
+        ["honeypot_id", "bucket", "attack_type", "severity", "count"],
+        select(Attack.honeypot_id, bucket, attack_type, severity, func.count())
+        .where(Attack.honeypot_id.isnot(None))
+        .group_by(Attack.honeypot_id, bucket, attack_type, severity)
+    ))
+    conn.execute(insert(AttackSourceCount).from_select(
+        ["honeypot_id", "source_ip", "count", "first_seen", "last_seen"],
+        select(Attack.honeypot_id, source_ip, func.count(), func.min(Attack.timestamp), func.max(Attack.timestamp))
+        .where(Attack.honeypot_id.isnot(None))
+        .group_by(Attack.honeypot_id, source_ip)
+    ))
+    conn.execute(update(Honeypot).values(
+        attack_count=select(func.count()).where(Attack.honeypot_id == Honeypot.id).scalar_subquery(),
+        updated_at=Honeypot.updated_at
+    ))
+
+    rebuild_distinct_sketches(conn, bucket, source_ip)
+
+def rebuild_distinct_sketches(conn: Connection, bucket, source_ip, chunk_size: int = 1000) -> None:
+    """Build the hourly sketches from the distinct (honeypot, hour, source IP) triples, streamed in order"""
+    triples = conn.execution_options(yield_per=10 * chunk_size).execute(
+        select(Attack.honeypot_id, bucket, source_ip)
+        .where(Attack.honeypot_id.isnot(None))
+        .group_by(Attack.honeypot_id, bucket, source_ip)
+        .order_by(Attack.honeypot_id, bucket)
+    )
+    sketches = []
+    for (hp, hour), group in groupby(triples, key=lambda row: (row[0], row[1])):
+        sketch = HyperLogLog()
+        sketch.update(ip for _, _, ip in group)
+        if not isinstance(hour, datetime):
+            hour = datetime.fromisoformat(hour)  # SQLite returns the strftime text
+        sketches.append({"honeypot_id": hp, "bucket": as_utc(hour), "registers": sketch.to_bytes()})
+        if len(sketches) >= chunk_size:
+            conn.execute(insert(AttackDistinctSketch), sketches)
+            sketches = []
+    if sketches:
+        conn.execute(insert(AttackDistinctSketch), sketches)
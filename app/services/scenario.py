@@ -0,0 +1,361 @@
+"""Attack scenarios: recorded or hand-written traffic shapes that simulations replay.
+
+A scenario is an NDJSON file, gzip-compressed when its name ends in .gz,
+with one JSON object per line. The "type" key says what each line is:
+
+    {"type": "scenario", "name": "office-hours", "duration_seconds": 3600, "seed": 7}
+        Optional header. A replay lasts at least `duration_seconds`.
+    {"type": "pool", "name": "attackers", "values": ["203.0.113.9", ...], "weights": [40, ...]}
+        Source IPs, optionally weighted. Lines with the same name extend one pool.
+    {"type": "dictionary", "name": "ssh-users", "values": ["root", ...], "weights": [...]}
+        Payload values, likewise.
+    {"type": "segment", "start": 0, "duration": 600, "rate": [0.5, 5.0],
+     "mix": {"SSH-BRUTEFORCE": 3, "FTP-BRUTEFORCE": 1}, "ips": "attackers",
+     "payloads": {"SSH-BRUTEFORCE": {"username": "ssh-users", "password": "ssh-passwords"}},
+     "severity": {"SSH-BRUTEFORCE": "low"}}
+        Attacks from `start` for `duration` seconds at a rate per second
+        that ramps linearly between the two `rate` values, evenly spaced.
+        Types are drawn from the weighted `mix`, source IPs from the `ips`
+        pool (random addresses without one), and each details field from
+        its dictionary; types without `payloads` get the simulator's own
+        patterns.
+    {"type": "attack", "at": 12.5, "source_ip": "...", "attack_type": "...", "severity": "...", "details": {}}
+        One exact attack `at` seconds into the scenario. Attack lines must
+        be in time order.
+
+Pools, dictionaries and segments are loaded up front; attack lines are
+streamed, so replaying a recording of any length needs memory only for
+its definitions. Replays are deterministic for a given seed, shard and
+shard count: event i of the merged timeline belongs to shard
+i % shards, which is what lets a resumed shard skip what it already
+emitted.
+"""
+import gzip
+import heapq
+import json
+import math
+import os
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+from uuid import UUID
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+from app.core.config import settings
+from app.models.attack import Attack
+from app.services.attack_simulator import generate_attack_batch
+from app.services.heavy_hitters import SpaceSaving
+from app.services.rollup_service import as_utc
+
+def scenario_path(name: str) -> str:
+    """Path of a scenario in SCENARIO_DIR; raises ValueError for names that would leave it"""
+    root = os.path.realpath(settings.SCENARIO_DIR)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"Scenario {name} is outside SCENARIO_DIR")
+    return path
+
+def open_scenario(path: str, mode: str = "r") -> TextIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    with open_scenario(path) as lines:
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: {e}") from None
+
+
+class WeightedValues:
+    """A pool or dictionary to sample from"""
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self.weights: List[float] = []
+        self._cumulative: Optional[np.ndarray] = None
+
+    def extend(self, values: List[Any], weights: Optional[List[float]] = None) -> None:
+        self.values.extend(values)
+        self.weights.extend(weights if weights is not None else [1.0] * len(values))
+        self._cumulative = None
+
+    def sample(self, rng: np.random.Generator) -> Any:
+        if self._cumulative is None:
+            self._cumulative = np.cumsum(self.weights, dtype=float)
+        return self.values[int(np.searchsorted(self._cumulative, rng.random() * self._cumulative[-1], side="right"))]
+
+
+@dataclass
+class Segment:
+    """A stretch of the timeline with a linear rate ramp"""
+    start: float
+    duration: float
+    rate_start: float
+    rate_end: float
+    mix: WeightedValues
+    ips: Optional[str] = None
+    payloads: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    severity: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "Segment":
+        rate = record.get("rate", 1.0)
+        rate_start, rate_end = (rate, rate) if isinstance(rate, (int, float)) else rate
+        weights = record.get("mix") or {"GENERIC": 1}
+        mix = WeightedValues()
+        mix.extend(list(weights), list(weights.values()))
+        return cls(
+            start=float(record.get("start", 0.0)),
+            duration=float(record["duration"]),
+            rate_start=float(rate_start),
+            rate_end=float(rate_end),
+            mix=mix,
+            ips=record.get("ips"),
+            payloads=record.get("payloads", {}),
+            severity=record.get("severity", {})
+        )
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+    def count(self) -> int:
+        return int(round((self.rate_start + self.rate_end) / 2 * self.duration))
+
+    def arrivals(self) -> Iterator[Tuple[float, "Segment"]]:
+        """(time, segment) per attack: the n-th is due when the integrated rate reaches n + 0.5"""
+        slope = (self.rate_end - self.rate_start) / self.duration if self.duration else 0.0
+        for n in range(self.count()):
+            target = n + 0.5
+            if abs(slope) < 1e-12:
+                offset = target / self.rate_start
+            else:
+                # Solve rate_start * t + slope * t^2 / 2 = target
+                offset = (math.sqrt(self.rate_start ** 2 + 2 * slope * target) - self.rate_start) / slope
+            yield self.start + offset, self
+
+
+@dataclass
+class Scenario:
+    """A scenario's definitions, plus what a pass over its attack lines found"""
+    path: str
+    name: str = ""
+    seed: int = 0
+    header_duration: float = 0.0
+    pools: Dict[str, WeightedValues] = field(default_factory=dict)
+    dictionaries: Dict[str, WeightedValues] = field(default_factory=dict)
+    segments: List[Segment] = field(default_factory=list)
+    recorded_attacks: int = 0
+    last_attack_at: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        return max([self.header_duration, self.last_attack_at] + [segment.end for segment in self.segments])
+
+    def total_attacks(self) -> int:
+        return self.recorded_attacks + sum(segment.count() for segment in self.segments)
+
+    def shard_target(self, shard: int, shards: int) -> int:
+        """Attacks that fall to `shard` when the timeline is dealt round-robin"""
+        total = self.total_attacks()
+        return total // shards + (shard < total % shards)
+
+    def replay(self, shard: int = 0, shards: int = 1, seed: Optional[int] = None) -> Iterator[Tuple[float, Dict[str, Any]]]:
+        """(seconds into the scenario, attack) for this shard's events, in time order"""
+        rng = np.random.default_rng([self.seed if seed is None else seed, shard])
+        timelines = [segment.arrivals() for segment in self.segments]
+        timelines.append((record["at"], record) for record in read_records(self.path) if record.get("type") == "attack")
+        for index, (at, source) in enumerate(heapq.merge(*timelines, key=itemgetter(0))):
+            if index % shards == shard:
+                yield at, (self._attack(source, rng) if isinstance(source, Segment) else recorded_attack(source))
+
+    def _attack(self, segment: Segment, rng: np.random.Generator) -> Dict[str, Any]:
+        attack_type = segment.mix.sample(rng)
+        pool = self.pools.get(segment.ips) if segment.ips else None
+        if pool is not None:
+            source_ip = pool.sample(rng)
+        else:
+            source_ip = ".".join(str(octet) for octet in rng.integers(1, 256, size=4))
+        payload = segment.payloads.get(attack_type)
+        if payload:
+            details = {name: self.dictionaries[dictionary].sample(rng) for name, dictionary in payload.items()}
+            severity = segment.severity.get(attack_type, "medium")
+        else:
+            batch = generate_attack_batch(attack_type, 5, 1, rng=rng)
+            details = batch.details[0]
+            severity = segment.severity.get(attack_type, batch.severities[0])
+        return {"source_ip": source_ip, "attack_type": attack_type, "severity": severity, "details": details}
+
+
+def recorded_attack(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "source_ip": record["source_ip"],
+        "attack_type": record["attack_type"],
+        "severity": record.get("severity", "medium"),
+        "details": record.get("details", {})
+    }
+
+def load_scenario(path: str) -> Scenario:
+    """Read a scenario's definitions and count its attack lines in one streaming pass"""
+    scenario = Scenario(path=path)
+    for record in read_records(path):
+        kind = record.get("type")
+        if kind == "scenario":
+            scenario.name = record.get("name", "")
+            scenario.seed = int(record.get("seed", 0))
+            scenario.header_duration = float(record.get("duration_seconds", 0.0))
+        elif kind in ("pool", "dictionary"):
+            target = scenario.pools if kind == "pool" else scenario.dictionaries
+            target.setdefault(record["name"], WeightedValues()).extend(record["values"], record.get("weights"))
+        elif kind == "segment":
+            scenario.segments.append(Segment.from_record(record))
+        elif kind == "attack":
+            if record["at"] < scenario.last_attack_at:
+                raise ValueError(f"{path}: attack lines are not in time order at {record['at']}")
+            scenario.recorded_attacks += 1
+            scenario.last_attack_at = record["at"]
+        else:
+            raise ValueError(f"{path}: unknown record type {kind!r}")
+    for segment in scenario.segments:
+        if segment.ips and segment.ips not in scenario.pools:
+            raise ValueError(f"{path}: segment uses undefined pool {segment.ips!r}")
+        for payload in segment.payloads.values():
+            for dictionary in payload.values():
+                if dictionary not in scenario.dictionaries:
+                    raise ValueError(f"{path}: segment uses undefined dictionary {dictionary!r}")
+    return scenario
+
+def attack_rows(attacks: List[Dict[str, Any]], honeypot_id: UUID, simulation_id: Optional[UUID] = None) -> List[Dict[str, Any]]:
+    """Rows ready for attack_service.write_attacks, stamped now"""
+    timestamp = datetime.now(timezone.utc)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "honeypot_id": honeypot_id,
+            "simulation_id": simulation_id,
+            "is_simulated": True,
+            "timestamp": timestamp,
+            **attack
+        } for attack in attacks
+    ]
+
+# Recording
+
+def recorded_attacks_statement(since: datetime, until: datetime, honeypot_id: Optional[UUID] = None):
+    statement = select(
+        Attack.timestamp, Attack.source_ip, Attack.attack_type, Attack.severity, Attack.details
+    ).where(Attack.timestamp >= since, Attack.timestamp < until)
+    if honeypot_id is not None:
+        statement = statement.where(Attack.honeypot_id == honeypot_id)
+    return statement.order_by(Attack.timestamp)
+
+def write_record(out: TextIO, record: Dict[str, Any]) -> None:
+    out.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+
+def record_events(
+    conn: Connection,
+    out: TextIO,
+    since: datetime,
+    until: datetime,
+    honeypot_id: Optional[UUID] = None,
+    name: str = "",
+    chunk_size: int = 10000
+) -> int:
+    """Write every attack in [since, until) as an attack line; returns how many"""
+    write_record(out, {"type": "scenario", "name": name, "duration_seconds": (until - since).total_seconds()})
+    count = 0
+    result = conn.execution_options(yield_per=chunk_size).execute(recorded_attacks_statement(since, until, honeypot_id))
+    for row in result:
+        write_record(out, {
+            "type": "attack",
+            "at": round((as_utc(row.timestamp) - since).total_seconds(), 6),
+            "source_ip": row.source_ip,
+            "attack_type": row.attack_type,
+            "severity": row.severity,
+            "details": row.details or {}
+        })
+        count += 1
+    return count
+
+def record_profile(
+    conn: Connection,
+    out: TextIO,
+    since: datetime,
+    until: datetime,
+    honeypot_id: Optional[UUID] = None,
+    name: str = "",
+    bucket_seconds: int = 300,
+    capacity: int = 1000,
+    chunk_size: int = 10000
+) -> int:
+    """Summarize the attacks in [since, until) as one segment per bucket; returns how many were read.
+
+    Each segment keeps its bucket's rate and attack-type mix. Source IPs
+    and each scalar details field per attack type keep their heaviest
+    `capacity` values, counted with Space-Saving, so memory stays bounded
+    whatever the volume; rarer values are left out of the pools and
+    dictionaries, and fields are sampled independently on replay.
+    """
+    ips = SpaceSaving(capacity)
+    fields: Dict[Tuple[str, str], SpaceSaving] = {}
+    severities: Dict[str, Counter] = defaultdict(Counter)
+    segments: List[Dict[str, Any]] = []
+    bucket, mix = None, Counter()
+
+    def flush() -> None:
+        if mix:
+            count = sum(mix.values())
+            segments.append({
+                "type": "segment",
+                "start": bucket * bucket_seconds,
+                "duration": bucket_seconds,
+                "rate": [count / bucket_seconds, count / bucket_seconds],
+                "mix": dict(mix),
+                "ips": "attackers"
+            })
+
+    count = 0
+    result = conn.execution_options(yield_per=chunk_size).execute(recorded_attacks_statement(since, until, honeypot_id))
+    for row in result:
+        row_bucket = int((as_utc(row.timestamp) - since).total_seconds() // bucket_seconds)
+        if row_bucket != bucket:
+            flush()
+            bucket, mix = row_bucket, Counter()
+        mix[row.attack_type] += 1
+        ips.add(row.source_ip)
+        severities[row.attack_type][row.severity] += 1
+        for key, value in (row.details or {}).items():
+            if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+                fields.setdefault((row.attack_type, key), SpaceSaving(capacity)).add(value)
+        count += 1
+    flush()
+
+    payloads: Dict[str, Dict[str, str]] = defaultdict(dict)
+    for attack_type, key in fields:
+        payloads[attack_type][key] = f"{attack_type}.{key}"
+    severity = {attack_type: counts.most_common(1)[0][0] for attack_type, counts in severities.items()}
+
+    write_record(out, {"type": "scenario", "name": name, "duration_seconds": (until - since).total_seconds()})
+    top = ips.top(capacity)
+    write_record(out, {"type": "pool", "name": "attackers", "values": [ip for ip, _, _ in top], "weights": [n for _, n, _ in top]})
+    for (attack_type, key), summary in fields.items():
+        top = summary.top(capacity)
+        write_record(out, {
+            "type": "dictionary", "name": f"{attack_type}.{key}",
+            "values": [value for value, _, _ in top], "weights": [n for _, n, _ in top]
+        })
+    for segment in segments:
+        types = segment["mix"]
+        segment["payloads"] = {attack_type: payloads[attack_type] for attack_type in types if attack_type in payloads}
+        segment["severity"] = {attack_type: severity[attack_type] for attack_type in types}
+        write_record(out, segment)
+    return count
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID
+import numpy as np
+from app.core.database import SessionLocal
+from app.core.metrics import summarize_latencies
+from app.models.simulation import Simulation
+from app.schemas.simulation import SimulationUpdate
+from app.services import simulation_service
+from app.services.attack_service import write_attacks
+from app.services.attack_simulator import generate_attack_batch
+
+logger = logging.getLogger(__name__)
+
+def update_simulation_status(simulation_id: UUID, **fields: Any) -> None:
+    """Apply a status transition through simulation_service in a fresh session"""
+    db = SessionLocal()
+    try:
+        simulation = db.query(Simulation).filter(Simulation.id == simulation_id).first()
+        if simulation:
+            simulation_service.update_simulation(db=db, simulation=simulation, simulation_in=SimulationUpdate(**fields))
+    finally:
+        db.close()
+
+async def run_simulation(
+    simulation_id: UUID,
+    target_honeypot_id: UUID,
+    attack_type: str,
+    node_count: int,
+    duration_minutes: int,
+    intensity: int,
+    seed: Optional[int] = None
+) -> None:
+    """Run an attack simulation inside the app, bulk-writing each tick's attacks"""
+    rng = np.random.default_rng(seed)
+    try:
+        await asyncio.to_thread(update_simulation_status, simulation_id, status="running")
+
+        started = time.perf_counter()
+        end_time = datetime.now() + timedelta(minutes=duration_minutes)
+
+        # Calculate attack frequency
+        total_attacks = intensity * 10 * duration_minutes
+        delay_between_attacks = (duration_minutes * 60) / total_attacks
+
+        attack_count = 0
+        write_latencies = []
+        while datetime.now() < end_time:
+            # Each node attacks with a 70% chance per tick
+            batch = generate_attack_batch(attack_type, intensity, int(rng.binomial(node_count, 0.7)), rng=rng)
+
+            if len(batch):
+                rows = batch.to_rows(target_honeypot_id, simulation_id)
+                write_started = time.perf_counter()
+                attack_count += await asyncio.to_thread(write_attacks, rows)
+                write_latencies.append((time.perf_counter() - write_started) * 1000)
+
+            # Wait before next attack
+            await asyncio.sleep(delay_between_attacks)
+
+        elapsed = time.perf_counter() - started
+        await asyncio.to_thread(
+            update_simulation_status,
+            simulation_id,
+            status="completed",
+            end_time=datetime.now(),
+            results={
+                "total_attacks": attack_count,
+                "attack_type": attack_type,
+                "duration_minutes": duration_minutes,
+                "intensity": intensity,
+                "node_count": node_count,
+                "mode": "inprocess",
+                "attacks_per_second": round(attack_count / elapsed, 3) if elapsed else 0.0,
+                "write_latency_ms": summarize_latencies(write_latencies)
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Error in simulation {simulation_id}: {str(e)}")
+
+        # Update simulation to failed status
+        try:
+            await asyncio.to_thread(
+                update_simulation_status,
+                simulation_id,
+                status="failed",
+                results={"error": str(e)}
+            )
+        except Exception:
+            pass
@@ -0,0 +1,856 @@
+"""Sharded simulation runs that survive worker restarts.
+
+A simulation's virtual nodes are split into up to SIMULATION_WORKERS
+shards, each run by its own process. A shard owns a fixed share of the
+requested attacks, proportional to its nodes, and paces them with a token
+bucket so the achieved rate tracks `intensity * 10` attacks per minute
+however long each write takes.
+
+Every batch of attacks commits together with the shard's checkpoint row,
+so counts never drift from the attacks table. A checkpoint is leased to
+one API worker; a lease that isn't renewed within SIMULATION_LEASE_SECONDS,
+because that worker died or was restarted, is taken over by any worker,
+which resumes the shard from its last checkpoint. Time spent without an
+owner doesn't count towards the run.
+
+In traffic mode a shard's attacks are real connections to the target
+honeypot (see traffic_generator) rather than rows; its checkpoint carries
+the attempts made so far and their outcome statistics instead.
+
+A simulation whose options name a scenario replays it instead of drawing
+from the attack type's patterns: its timeline is dealt round-robin to
+the shards, and each attack is due when the replay clock, running
+`speed` times faster than real time, reaches it.
+"""
+import asyncio
+import itertools
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import socket
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import bindparam, func, insert, or_, select, update
+from sqlalchemy.engine import Connection
+from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import summarize_latencies
+from app.core.pacing import TokenBucket
+from app.models import init as models  # noqa: F401 - shard processes need every model registered on Base
+from app.models.honeypot import Honeypot
+from app.models.simulation import Simulation
+from app.models.simulation_checkpoint import SimulationCheckpoint
+from app.services.attack_service import attacks_stored, write_attack_rows
+from app.services.attack_simulator import generate_attack_batch
+from app.services.reconciler import container_reconciler
+from app.services.scenario import attack_rows, load_scenario, scenario_path
+from app.services.traffic_generator import TrafficStats, TrafficTarget, honeypot_target, run_traffic, traffic_concurrency
+
+logger = logging.getLogger(__name__)
+
+class LeaseLost(Exception):
+    """Raised when a shard's checkpoint was taken over or its simulation stopped running"""
+
+
+@dataclass
+class ShardSpec:
+    """Everything a shard process needs to run or resume"""
+    simulation_id: UUID
+    shard: int
+    target_honeypot_id: UUID
+    attack_type: str
+    intensity: int
+    duration_seconds: float
+    target: int
+    emitted: int = 0
+    elapsed: float = 0.0
+    mode: str = "records"
+    traffic: Optional[TrafficTarget] = None
+    concurrency: int = 1  # Traffic sessions of this shard
+    stats: Optional[Dict[str, Any]] = None  # From the checkpoint, so traffic statistics carry over a resume
+    scenario: Optional[str] = None  # Path of the scenario to replay
+    speed: float = 1.0
+    shards: int = 1  # Shards sharing the scenario's timeline
+
+    @property
+    def key(self) -> Tuple[UUID, int]:
+        return self.simulation_id, self.shard
+
+
+TRAFFIC_CHECKPOINT_SECONDS = 1.0
+MAX_REPLAY_BATCH = 5000  # Attacks a replaying shard writes at once, however far behind it is
+
+def requested_attacks(intensity: int, duration_minutes: int) -> int:
+    return intensity * 10 * duration_minutes
+
+def plan_shards(node_count: int, total: int, workers: int) -> List[Tuple[int, int]]:
+    """(nodes, target attacks) per shard; targets are proportional to nodes and sum to `total`"""
+    node_count = max(node_count, 1)
+    shards = max(1, min(workers, node_count))
+    base, extra = divmod(node_count, shards)
+    plan = []
+    assigned_nodes = assigned_attacks = 0
+    for shard in range(shards):
+        nodes = base + (shard < extra)
+        assigned_nodes += nodes
+        target = total * assigned_nodes // node_count - assigned_attacks
+        assigned_attacks += target
+        plan.append((nodes, target))
+    return plan
+
+def traffic_target(row) -> Optional[TrafficTarget]:
+    """Where a traffic simulation connects, from a row with the simulation and its honeypot; None in records mode.
+
+    Raises ValueError unless the honeypot is the simulation owner's, active,
+    and running a container whose address is allowed.
+    """
+    if row.mode != "traffic":
+        return None
+    if row.honeypot_user_id is None or row.honeypot_user_id != row.user_id:
+        raise ValueError("Traffic mode needs a honeypot of the simulation's owner")
+    if row.honeypot_status != "active":
+        raise ValueError("Traffic mode needs an active honeypot")
+    address = container_reconciler.deployed_address(row.target_honeypot_id)
+    if address is None:
+        raise ValueError(f"Honeypot {row.target_honeypot_id} has no running container on {settings.DOCKER_NETWORK}")
+    return honeypot_target(row.honeypot_type, address, row.port, row.options)
+
+def traffic_fields(row, target: Optional[TrafficTarget], nodes: int, node_count: int) -> Dict[str, Any]:
+    """ShardSpec fields for a shard of `nodes` nodes of a traffic simulation"""
+    if target is None:
+        return {}
+    return {"mode": "traffic", "traffic": target, "concurrency": traffic_concurrency(row.options, nodes, node_count)}
+
+def replay_events(spec: ShardSpec) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """The shard's remaining scenario events; a resumed shard regenerates and skips those it emitted"""
+    events = load_scenario(spec.scenario).replay(spec.shard, spec.shards)
+    return itertools.islice(events, spec.emitted, None)
+
+
+class GeneratedAttacks:
+    """A shard's attacks drawn from its attack type's patterns at a steady rate"""
+
+    def __init__(self, spec: ShardSpec):
+        self.spec = spec
+        rate = spec.target / spec.duration_seconds if spec.duration_seconds else 0.0
+        # One token of headroom so oversleeping a whole token doesn't spill it. A resumed
+        # shard starts with the fraction of an attack it was owed when it stopped.
+        self.bucket = TokenBucket(rate, rate * settings.SIMULATION_BURST_SECONDS + 1, tokens=rate * spec.elapsed - spec.emitted)
+
+    def take(self, now: float, elapsed: float, limit: int) -> List[Dict[str, Any]]:
+        """Rows of the attacks due now, at most `limit`"""
+        count = self.bucket.take(now, limit, round_up=self.finished(elapsed))
+        if not count:
+            return []
+        return generate_attack_batch(self.spec.attack_type, self.spec.intensity, count).to_rows(
+            self.spec.target_honeypot_id, self.spec.simulation_id
+        )
+
+    def finished(self, elapsed: float) -> bool:
+        return elapsed >= self.spec.duration_seconds
+
+    def wait_time(self, elapsed: float) -> float:
+        return self.bucket.wait_time()
+
+
+class ReplayedAttacks:
+    """A shard's share of a scenario, each attack due when the replay clock reaches it"""
+
+    def __init__(self, spec: ShardSpec):
+        self.spec = spec
+        self._events = replay_events(spec)
+        self._next = next(self._events, None)
+
+    def take(self, now: float, elapsed: float, limit: int) -> List[Dict[str, Any]]:
+        clock = elapsed * self.spec.speed
+        limit = min(limit, MAX_REPLAY_BATCH)
+        attacks = []
+        while self._next is not None and self._next[0] <= clock and len(attacks) < limit:
+            attacks.append(self._next[1])
+            self._next = next(self._events, None)
+        return attack_rows(attacks, self.spec.target_honeypot_id, self.spec.simulation_id)
+
+    def finished(self, elapsed: float) -> bool:
+        return self._next is None
+
+    def wait_time(self, elapsed: float) -> float:
+        if self._next is None:
+            return 0.0
+        return max(0.0, self._next[0] / self.spec.speed - elapsed)
+
+
+def save_progress(
+    conn: Connection,
+    spec: ShardSpec,
+    owner: str,
+    emitted: int,
+    elapsed: float,
+    done: bool = False,
+    release: bool = False,
+    stats: Optional[Dict[str, Any]] = None
+) -> None:
+    """Record a shard's progress and renew its lease; raises LeaseLost if it isn't ours to record"""
+    table = SimulationCheckpoint.__table__
+    values: Dict[str, Any] = {
+        "emitted": emitted,
+        "elapsed": elapsed,
+        "done": done,
+        "heartbeat_at": datetime.now(timezone.utc)
+    }
+    if done or release:
+        values["owner"] = None
+    if stats is not None:
+        values["stats"] = stats
+    result = conn.execute(update(table).where(
+        table.c.simulation_id == spec.simulation_id,
+        table.c.shard == spec.shard,
+        table.c.owner == owner
+    ).values(**values))
+    if result.rowcount != 1:
+        raise LeaseLost(f"Shard {spec.shard} of simulation {spec.simulation_id} is no longer held by {owner}")
+
+def ensure_running(conn: Connection, simulation_id: UUID) -> None:
+    """Share-lock the simulation row for this transaction; raises LeaseLost unless it is running.
+
+    Pause and cancel lock the row for update, so they wait for batches in
+    flight and every later batch sees the new status.
+    """
+    status = conn.execute(
+        select(Simulation.status).where(Simulation.id == simulation_id).with_for_update(read=True)
+    ).scalar()
+    if status != "running":
+        raise LeaseLost(f"Simulation {simulation_id} is {status or 'gone'}")
+
+def run_shard(spec: ShardSpec, owner: str, stop, messages) -> None:
+    """Process entry point: emit a shard's remaining attacks at its share of the rate.
+
+    Stored rows and progress go back to the parent over `messages` so it
+    can feed live subscribers and the top-K trackers.
+    """
+    if spec.mode == "traffic":
+        return run_traffic_shard(spec, owner, stop, messages)
+
+    heartbeat = settings.SIMULATION_LEASE_SECONDS / 3
+    emitted = spec.emitted
+    saved_elapsed = spec.elapsed
+    started = last_saved = time.monotonic()
+    latencies: List[float] = []
+
+    def elapsed_now() -> float:
+        return spec.elapsed + time.monotonic() - started
+
+    try:
+        source = ReplayedAttacks(spec) if spec.scenario else GeneratedAttacks(spec)
+        while not stop.is_set():
+            now = time.monotonic()
+            elapsed = elapsed_now()
+            rows = source.take(now, elapsed, spec.target - emitted)
+            count = len(rows)
+            done = source.finished(elapsed) or emitted + count >= spec.target
+
+            if count or done or now - last_saved >= heartbeat:
+                write_started = time.perf_counter()
+                with engine.begin() as conn:
+                    ensure_running(conn, spec.simulation_id)
+                    rows = write_attack_rows(conn, rows)
+                    stats = {"write_latency_ms": summarize_latencies(latencies)} if done else None
+                    save_progress(conn, spec, owner, emitted + count, elapsed, done=done, stats=stats)
+                if count:
+                    latencies.append((time.perf_counter() - write_started) * 1000)
+                emitted += count
+                saved_elapsed = elapsed
+                last_saved = now
+                if rows:
+                    messages.put(("stored", rows))
+                messages.put(("progress", spec.simulation_id, spec.shard, emitted, elapsed))
+                if done:
+                    messages.put(("done", spec.simulation_id, spec.shard))
+                    return
+
+            remaining = spec.duration_seconds - elapsed_now()
+            stop.wait(max(0.0, min(
+                max(source.wait_time(elapsed_now()), settings.SIMULATION_MIN_BATCH_INTERVAL),
+                remaining,
+                heartbeat
+            )))
+
+        saved_elapsed = elapsed_now()  # Asked to stop, e.g. at shutdown or pause
+    except LeaseLost as e:
+        # Paused or cancelled elsewhere, or taken over; time since the last batch doesn't count
+        logger.info(str(e))
+    except Exception as e:
+        logger.error(f"Error in shard {spec.shard} of simulation {spec.simulation_id}: {str(e)}")
+        messages.put(("failed", spec.simulation_id, spec.shard, str(e)))
+        return
+
+    # Hand the shard back so whichever worker resumes the simulation can adopt it at once
+    try:
+        with engine.begin() as conn:
+            save_progress(conn, spec, owner, emitted, saved_elapsed, release=True,
+                          stats={"write_latency_ms": summarize_latencies(latencies)})
+    except LeaseLost:
+        pass  # Another worker holds it now
+
+def run_traffic_shard(spec: ShardSpec, owner: str, stop, messages) -> None:
+    """Process entry point in traffic mode: make the shard's remaining attempts against the honeypot.
+
+    Checkpoints every TRAFFIC_CHECKPOINT_SECONDS from a thread, so the
+    event loop keeps driving connections while the database is written.
+    """
+    try:
+        asyncio.run(_drive_traffic(spec, owner, stop, messages))
+    except LeaseLost as e:
+        logger.info(str(e))
+    except Exception as e:
+        logger.error(f"Error in shard {spec.shard} of simulation {spec.simulation_id}: {str(e)}")
+        messages.put(("failed", spec.simulation_id, spec.shard, str(e)))
+
+async def _drive_traffic(spec: ShardSpec, owner: str, stop, messages) -> None:
+    loop = asyncio.get_running_loop()
+    stats = TrafficStats.from_dict((spec.stats or {}).get("traffic"))
+    initial_attempts = stats.attempts
+    rate = spec.target / spec.duration_seconds if spec.duration_seconds else 0.0
+    halt = asyncio.Event()
+    schedule = None
+    if spec.scenario:
+        schedule = ((at / spec.speed - spec.elapsed, attack["details"]) for at, attack in replay_events(spec))
+    started = time.monotonic()
+    run = asyncio.create_task(run_traffic(
+        spec.traffic, spec.attack_type, spec.intensity, spec.target - spec.emitted, rate, spec.concurrency, stats, halt,
+        tokens=rate * spec.elapsed - spec.emitted, burst_seconds=settings.SIMULATION_BURST_SECONDS, schedule=schedule
+    ))
+
+    def checkpoint(emitted: int, elapsed: float, snapshot: Dict[str, Any], done: bool = False, release: bool = False) -> None:
+        with engine.begin() as conn:
+            if not release:
+                ensure_running(conn, spec.simulation_id)
+            save_progress(conn, spec, owner, emitted, elapsed, done=done, release=release, stats={"traffic": snapshot})
+        messages.put(("progress", spec.simulation_id, spec.shard, emitted, elapsed))
+
+    async def save(done: bool = False, release: bool = False) -> None:
+        # Snapshot on the loop, which is the only writer of `stats`
+        emitted = spec.emitted + stats.attempts - initial_attempts
+        elapsed = spec.elapsed + time.monotonic() - started
+        await loop.run_in_executor(None, checkpoint, emitted, elapsed, stats.to_dict(), done, release)
+
+    last_saved = time.monotonic()
+    try:
+        while not run.done():
+            await asyncio.wait([run], timeout=settings.SIMULATION_MIN_BATCH_INTERVAL)
+            if stop.is_set():
+                halt.set()  # Shutdown or pause; attempts in flight finish and are counted
+            elif not run.done() and time.monotonic() - last_saved >= TRAFFIC_CHECKPOINT_SECONDS:
+                last_saved = time.monotonic()
+                await save()
+        run.result()
+    except LeaseLost as e:
+        logger.info(str(e))
+        halt.set()
+        await run
+    except BaseException:
+        halt.set()
+        run.cancel()
+        raise
+
+    if not halt.is_set():
+        try:
+            await save(done=True)
+            messages.put(("done", spec.simulation_id, spec.shard))
+            return
+        except LeaseLost as e:
+            logger.info(str(e))
+    try:
+        await save(release=True)
+    except LeaseLost:
+        pass  # Another worker holds it now
+
+def run_seconds(simulation) -> float:
+    """How long a simulation is meant to run; replays record theirs at launch"""
+    options = getattr(simulation, "options", None) or {}
+    return options.get("replay_seconds") or simulation.duration_minutes * 60
+
+def simulation_results(simulation, checkpoints) -> Dict[str, Any]:
+    """Final results of a sharded run, comparing the achieved rate with the requested one"""
+    requested = sum(checkpoint.target for checkpoint in checkpoints)
+    emitted = sum(checkpoint.emitted for checkpoint in checkpoints)
+    elapsed = max((checkpoint.elapsed for checkpoint in checkpoints), default=0.0)
+    duration = run_seconds(simulation)
+    achieved_rate = round(emitted / elapsed, 3) if elapsed else 0.0
+    results = {
+        "total_attacks": emitted,
+        "requested_attacks": requested,
+        "attack_type": simulation.attack_type,
+        "duration_minutes": simulation.duration_minutes,
+        "intensity": simulation.intensity,
+        "node_count": simulation.node_count,
+        "mode": "sharded",
+        "workers": len(checkpoints),
+        "requested_rate": round(requested / duration, 3) if duration else 0.0,
+        "achieved_rate": achieved_rate,
+        "attacks_per_second": achieved_rate,
+        "elapsed_seconds": round(elapsed, 3),
+        "shards": [
+            {
+                "shard": checkpoint.shard,
+                "node_count": checkpoint.node_count,
+                "target": checkpoint.target,
+                "emitted": checkpoint.emitted,
+                "elapsed_seconds": round(checkpoint.elapsed, 3),
+                **shard_stats(checkpoint.stats)
+            } for checkpoint in sorted(checkpoints, key=lambda checkpoint: checkpoint.shard)
+        ]
+    }
+    options = getattr(simulation, "options", None) or {}
+    if options.get("scenario"):
+        results["scenario"] = {
+            "name": options["scenario"], "speed": options.get("speed") or 1.0, "duration_seconds": round(duration, 3)
+        }
+    if getattr(simulation, "mode", None) == "traffic":
+        results["traffic"] = TrafficStats.merged(
+            (checkpoint.stats or {}).get("traffic") for checkpoint in checkpoints
+        ).summary()
+    return results
+
+def shard_stats(stats: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """A checkpoint's stats as shown in the results; traffic statistics are summarized"""
+    stats = stats or {}
+    if "traffic" in stats:
+        return {"traffic": TrafficStats.from_dict(stats["traffic"]).summary()}
+    return stats
+
+def progress_summary(shards: Iterable[Any], current_rate: float = 0.0) -> Dict[str, Any]:
+    """Totals over shards with `emitted`, `target` and `elapsed`, e.g. checkpoints"""
+    shards = list(shards)
+    emitted = sum(shard.emitted for shard in shards)
+    target = sum(shard.target for shard in shards)
+    return {
+        "emitted": emitted,
+        "target": target,
+        "percent": round(100 * emitted / target, 1) if target else 100.0,
+        "elapsed_seconds": round(max((shard.elapsed for shard in shards), default=0.0), 3),
+        "current_rate": round(current_rate, 3)
+    }
+
+
+class ShardProgress:
+    """Live counters of one shard and its rate over the last `window` seconds it ran"""
+
+    def __init__(self, target: int, emitted: int = 0, elapsed: float = 0.0, window: float = 10.0):
+        self.target = target
+        self.emitted = emitted
+        self.elapsed = elapsed
+        self.window = window
+        self._samples: deque = deque([(elapsed, emitted)])
+
+    def observe(self, emitted: int, elapsed: float) -> None:
+        if elapsed < self.elapsed:
+            return  # Older than what we already know, e.g. a persisted snapshot
+        self.emitted = emitted
+        self.elapsed = elapsed
+        self._samples.append((elapsed, emitted))
+        while len(self._samples) > 2 and self._samples[1][0] <= elapsed - self.window:
+            self._samples.popleft()
+
+    def rate(self) -> float:
+        (first_elapsed, first_emitted), (last_elapsed, last_emitted) = self._samples[0], self._samples[-1]
+        if last_elapsed <= first_elapsed:
+            return 0.0
+        return (last_emitted - first_emitted) / (last_elapsed - first_elapsed)
+
+
+class SimulationScheduler:
+    """Runs simulation shards in worker processes and adopts orphaned ones.
+
+    The scheduler thread launches submitted simulations, relays what the
+    shard processes report, finalizes simulations whose shards are all
+    done and takes over shards whose lease has expired. It is also the
+    registry of live runs: progress is served from memory, and written to
+    `Simulation.results` for all local simulations every
+    SIMULATION_PROGRESS_INTERVAL seconds in one batch.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        lease_seconds: float = 30,
+        progress_interval: float = 5,
+        worker_id: Optional[str] = None
+    ):
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.progress_interval = progress_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._context = multiprocessing.get_context("spawn")  # Forked children would share the parent's DB connections
+        self._messages = None
+        self._submitted: "queue.Queue[UUID]" = queue.Queue()
+        self._shards: Dict[Tuple[UUID, int], Tuple[Any, Any]] = {}  # (simulation, shard) -> (process, stop event)
+        self._progress: Dict[Tuple[UUID, int], ShardProgress] = {}
+        self._lock = threading.Lock()
+        self._scan_now = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.launched = 0
+        self.adopted = 0
+        self.completed = 0
+        self.failed = 0
+        self.relayed = 0
+
+    def submit(self, simulation_id: UUID) -> None:
+        """Launch a simulation in status `starting`; returns at once"""
+        self._submitted.put(simulation_id)
+        self.start()
+
+    def resume(self, simulation_id: UUID) -> None:
+        """Adopt the released shards of a simulation set back to `running` without waiting for the next scan"""
+        self._scan_now.set()
+        self.start()
+
+    def stop_simulation(self, simulation_id: UUID) -> int:
+        """Stop this worker's shards of a paused or cancelled simulation; returns how many"""
+        stopped = 0
+        for (shard_simulation, _), (_, stop) in list(self._shards.items()):
+            if shard_simulation == simulation_id:
+                stop.set()
+                stopped += 1
+        return stopped
+
+    def progress(self, simulation_id: UUID) -> Optional[Dict[str, Any]]:
+        """Live progress of a simulation with shards on this worker, or None"""
+        with self._lock:
+            shards = [shard for (key, _), shard in self._progress.items() if key == simulation_id]
+            if not shards:
+                return None
+            return progress_summary(shards, sum(shard.rate() for shard in shards))
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._messages = self._context.Queue()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="simulation-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop local shards; they checkpoint and release their leases for the next worker"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        shards = list(self._shards.values())
+        for _, stop in shards:
+            stop.set()
+        deadline = time.monotonic() + timeout
+        for process, _ in shards:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+        self._stopping.set()
+        thread.join(timeout=5)
+        self._shards.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "shards": len(self._shards),
+            "simulations": len({simulation_id for simulation_id, _ in self._shards}),
+            "launched": self.launched,
+            "adopted": self.adopted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "relayed_attacks": self.relayed
+        }
+
+    def _run(self) -> None:
+        next_scan = next_persist = 0.0
+        while not self._stopping.is_set():
+            try:
+                while not self._submitted.empty():
+                    self._launch(self._submitted.get_nowait())
+                if time.monotonic() >= next_scan or self._scan_now.is_set():
+                    self._scan_now.clear()
+                    next_scan = time.monotonic() + self.lease_seconds / 3
+                    self._adopt_orphans()
+                    self._finalize_finished()
+                self._relay(timeout=0.5)
+                self._reap()
+                if time.monotonic() >= next_persist:
+                    next_persist = time.monotonic() + self.progress_interval
+                    self._persist_progress()
+            except Exception as e:
+                logger.error(f"Error in simulation scheduler: {str(e)}")
+                self._stopping.wait(1)
+
+    def _launch(self, simulation_id: UUID) -> None:
+        now = datetime.now(timezone.utc)
+        with engine.begin() as conn:
+            simulation = conn.execute(select(
+                Simulation.__table__, Honeypot.type.label("honeypot_type"), Honeypot.port,
+                Honeypot.status.label("honeypot_status"), Honeypot.user_id.label("honeypot_user_id")
+            ).outerjoin(Honeypot, Honeypot.id == Simulation.target_honeypot_id).where(
+                Simulation.id == simulation_id, Simulation.status == "starting"
+            )).first()
+            if simulation is None:
+                return
+            options = simulation.options or {}
+            duration_seconds = simulation.duration_minutes * 60
+            replay: Dict[str, Any] = {}
+            try:
+                if options.get("scenario"):
+                    path = scenario_path(options["scenario"])
+                    scenario = load_scenario(path)
+                    plan = plan_shards(simulation.node_count, scenario.total_attacks(), self.workers)
+                    plan = [(nodes, scenario.shard_target(shard, len(plan))) for shard, (nodes, _) in enumerate(plan)]
+                    replay = {"scenario": path, "speed": options.get("speed") or 1.0, "shards": len(plan)}
+                    duration_seconds = scenario.duration / replay["speed"]
+                else:
+                    plan = plan_shards(
+                        simulation.node_count,
+                        requested_attacks(simulation.intensity, simulation.duration_minutes),
+                        self.workers
+                    )
+                target = traffic_target(simulation)
+                fields = [{**traffic_fields(simulation, target, nodes, simulation.node_count), **replay} for nodes, _ in plan]
+            except (ValueError, OSError) as e:
+                conn.execute(update(Simulation).where(Simulation.id == simulation_id).values(
+                    status="failed", end_time=now, results={"error": str(e)}
+                ))
+                self.failed += 1
+                return
+            conn.execute(insert(SimulationCheckpoint), [
+                {
+                    "simulation_id": simulation_id, "shard": shard, "node_count": nodes, "target": target,
+                    "emitted": 0, "elapsed": 0.0, "done": False, "owner": self.worker_id, "heartbeat_at": now, "stats": {}
+                } for shard, (nodes, target) in enumerate(plan)
+            ])
+            conn.execute(update(Simulation).where(Simulation.id == simulation_id).values(
+                status="running",
+                # A replay lasts as long as its scenario at the requested speed
+                duration_minutes=math.ceil(duration_seconds / 60) if replay else simulation.duration_minutes,
+                options={**options, "replay_seconds": duration_seconds} if replay else options
+            ))
+
+        for shard, (_, target) in enumerate(plan):
+            self._spawn(ShardSpec(
+                simulation_id=simulation_id,
+                shard=shard,
+                target_honeypot_id=simulation.target_honeypot_id,
+                attack_type=simulation.attack_type,
+                intensity=simulation.intensity,
+                duration_seconds=duration_seconds,
+                target=target,
+                **fields[shard]
+            ))
+        self.launched += 1
+        logger.info(f"Launched simulation {simulation_id} on {len(plan)} shard(s)")
+
+    def _adopt_orphans(self) -> None:
+        """Claim shards of running simulations whose lease was released or has expired"""
+        table = SimulationCheckpoint.__table__
+        now = datetime.now(timezone.utc)
+        orphaned = or_(table.c.owner.is_(None), table.c.heartbeat_at < now - timedelta(seconds=self.lease_seconds))
+        siblings = table.alias("siblings")
+        shard_count = select(func.count()).where(siblings.c.simulation_id == table.c.simulation_id).scalar_subquery()
+        with engine.connect() as conn:
+            rows = conn.execute(select(
+                table, Simulation.target_honeypot_id, Simulation.attack_type, Simulation.intensity, Simulation.duration_minutes,
+                Simulation.node_count.label("simulation_node_count"), Simulation.mode, Simulation.options, Simulation.user_id,
+                Honeypot.type.label("honeypot_type"), Honeypot.port, Honeypot.status.label("honeypot_status"),
+                Honeypot.user_id.label("honeypot_user_id"), shard_count.label("shard_count")
+            ).join(Simulation, Simulation.id == table.c.simulation_id).outerjoin(
+                Honeypot, Honeypot.id == Simulation.target_honeypot_id
+            ).where(
+                Simulation.status == "running", table.c.done.is_(False), orphaned
+            )).all()
+
+        targets: Dict[UUID, Optional[TrafficTarget]] = {}
+        unreachable = set()
+        for row in rows:
+            if (row.simulation_id, row.shard) in self._shards or row.simulation_id in unreachable:
+                continue
+            if row.simulation_id not in targets:
+                try:
+                    targets[row.simulation_id] = traffic_target(row)
+                except ValueError as e:
+                    # The honeypot was stopped, deleted or moved off the allowed networks
+                    unreachable.add(row.simulation_id)
+                    self._fail(row.simulation_id, str(e))
+                    continue
+            fields = {
+                "duration_seconds": row.duration_minutes * 60,
+                **traffic_fields(row, targets[row.simulation_id], row.node_count, row.simulation_node_count)
+            }
+            options = row.options or {}
+            if options.get("scenario"):
+                fields.update(
+                    scenario=scenario_path(options["scenario"]), speed=options.get("speed") or 1.0,
+                    shards=row.shard_count, duration_seconds=options["replay_seconds"]
+                )
+            with engine.begin() as conn:
+                claimed = conn.execute(update(table).where(
+                    table.c.simulation_id == row.simulation_id,
+                    table.c.shard == row.shard,
+                    table.c.done.is_(False),
+                    orphaned
+                ).values(owner=self.worker_id, heartbeat_at=now)).rowcount
+            if not claimed:
+                continue  # Another worker got there first
+            self._spawn(ShardSpec(
+                simulation_id=row.simulation_id,
+                shard=row.shard,
+                target_honeypot_id=row.target_honeypot_id,
+                attack_type=row.attack_type,
+                intensity=row.intensity,
+                target=row.target,
+                emitted=row.emitted,
+                elapsed=row.elapsed,
+                stats=row.stats,
+                **fields
+            ))
+            self.adopted += 1
+            logger.info(f"Resumed shard {row.shard} of simulation {row.simulation_id} at {row.emitted}/{row.target} attacks")
+
+    def _finalize_finished(self) -> None:
+        """Complete running simulations whose shards all finished but whose "done" was never relayed,
+        e.g. because the worker that ran the last shard stopped first"""
+        table = SimulationCheckpoint.__table__
+        unfinished = select(table.c.simulation_id).where(table.c.simulation_id == Simulation.id, table.c.done.is_(False))
+        started = select(table.c.simulation_id).where(table.c.simulation_id == Simulation.id)
+        with engine.connect() as conn:
+            finished = conn.scalars(select(Simulation.id).where(
+                Simulation.status == "running", started.exists(), ~unfinished.exists()
+            )).all()
+        for simulation_id in finished:
+            self._finalize(simulation_id)
+
+    def _spawn(self, spec: ShardSpec) -> None:
+        stop = self._context.Event()
+        process = self._context.Process(
+            target=run_shard,
+            args=(spec, self.worker_id, stop, self._messages),
+            name=f"simulation-shard-{spec.shard}",
+            daemon=True
+        )
+        process.start()
+        self._shards[spec.key] = (process, stop)
+        with self._lock:
+            self._progress[spec.key] = ShardProgress(spec.target, spec.emitted, spec.elapsed)
+
+    def _relay(self, timeout: float) -> None:
+        """Handle what the shards reported, waiting up to `timeout` for the first message"""
+        try:
+            message = self._messages.get(timeout=timeout)
+        except queue.Empty:
+            return
+        for _ in range(1000):
+            kind = message[0]
+            if kind == "stored":
+                attacks_stored(message[1])
+                self.relayed += len(message[1])
+            elif kind == "progress":
+                _, simulation_id, shard, emitted, elapsed = message
+                with self._lock:
+                    if (simulation_id, shard) in self._progress:
+                        self._progress[(simulation_id, shard)].observe(emitted, elapsed)
+            elif kind == "done":
+                self._finalize(message[1])
+            elif kind == "failed":
+                self._fail(message[1], message[3])
+            try:
+                message = self._messages.get_nowait()
+            except queue.Empty:
+                return
+
+    def _reap(self) -> None:
+        for key, (process, _) in list(self._shards.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self._shards[key]
+            if not any(simulation_id == key[0] for simulation_id, _ in self._shards):
+                with self._lock:
+                    for stale in [progress_key for progress_key in self._progress if progress_key[0] == key[0]]:
+                        del self._progress[stale]
+            if process.exitcode:
+                # The lease runs out and the shard is resumed from its checkpoint
+                logger.warning(f"Shard {key[1]} of simulation {key[0]} exited with code {process.exitcode}")
+
+    def _persist_progress(self) -> None:
+        """Write the progress of every simulation with local shards in one batch.
+
+        Totals come from the checkpoints, so shards run by other workers
+        are included and refresh the in-memory view too. Simulations no
+        longer running here are dropped from the registry.
+        """
+        simulation_ids = {simulation_id for simulation_id, _ in self._shards}
+        with self._lock:
+            for key in [key for key in self._progress if key[0] not in simulation_ids]:
+                del self._progress[key]
+        if not simulation_ids:
+            return
+
+        table = SimulationCheckpoint.__table__
+        simulations = Simulation.__table__
+        with engine.begin() as conn:
+            rows = conn.execute(select(
+                table.c.simulation_id, table.c.shard, table.c.target, table.c.emitted, table.c.elapsed
+            ).where(table.c.simulation_id.in_(simulation_ids))).all()
+            with self._lock:
+                for row in rows:
+                    shard = self._progress.setdefault((row.simulation_id, row.shard), ShardProgress(row.target))
+                    shard.observe(row.emitted, row.elapsed)
+            updates = []
+            for simulation_id in simulation_ids:
+                progress = self.progress(simulation_id)
+                if progress is not None:
+                    updates.append({"key_id": simulation_id, "results": {"progress": progress}})
+            conn.execute(
+                update(simulations)
+                .where(simulations.c.id == bindparam("key_id"), simulations.c.status == "running")
+                .values(results=bindparam("results")),
+                updates
+            )
+
+    def _finalize(self, simulation_id: UUID) -> None:
+        """Complete a simulation once every shard is done"""
+        with engine.begin() as conn:
+            checkpoints = conn.execute(
+                select(SimulationCheckpoint.__table__).where(SimulationCheckpoint.simulation_id == simulation_id)
+            ).all()
+            if not checkpoints or not all(checkpoint.done for checkpoint in checkpoints):
+                return
+            simulation = conn.execute(select(Simulation.__table__).where(Simulation.id == simulation_id)).one()
+            completed = conn.execute(update(Simulation).where(
+                Simulation.id == simulation_id, Simulation.status == "running"
+            ).values(
+                status="completed",
+                end_time=datetime.now(timezone.utc),
+                results=simulation_results(simulation, checkpoints)
+            )).rowcount
+        if completed:
+            self.completed += 1
+            logger.info(f"Simulation {simulation_id} completed")
+
+    def _fail(self, simulation_id: UUID, error: str) -> None:
+        """Fail a simulation; its other shards stop at their next checkpoint"""
+        with engine.begin() as conn:
+            failed = conn.execute(update(Simulation).where(
+                Simulation.id == simulation_id, Simulation.status == "running"
+            ).values(status="failed", end_time=datetime.now(timezone.utc), results={"error": error})).rowcount
+        if failed:
+            self.failed += 1
+
+
+simulation_scheduler = SimulationScheduler(
+    workers=settings.SIMULATION_WORKERS,
+    lease_seconds=settings.SIMULATION_LEASE_SECONDS,
+    progress_interval=settings.SIMULATION_PROGRESS_INTERVAL
+)
@@ -1,10 +1,25 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timezone
 from app.models.simulation import Simulation
+from app.models.simulation_checkpoint import SimulationCheckpoint
 from app.schemas.simulation import SimulationCreate, SimulationUpdate
 from app.services.attack_simulator import start_simulation_background_task
+from app.services.simulation_scheduler import progress_summary, requested_attacks, run_seconds, simulation_results, simulation_scheduler
+
+CANCELLABLE_STATUSES = ("starting", "running", "paused")
+
+def simulations_statement(user_id: UUID):
+    return select(Simulation).where(Simulation.user_id == user_id).order_by(Simulation.created_at.desc())
+
+def simulation_statement(simulation_id: UUID, user_id: UUID):
+    return select(Simulation).where(Simulation.id == simulation_id, Simulation.user_id == user_id)
+
+def checkpoints_statement(simulation_id: UUID):
+    return select(SimulationCheckpoint).where(SimulationCheckpoint.simulation_id == simulation_id)
 
 def create_simulation(db: Session, simulation_in: SimulationCreate, user_id: UUID) -> Simulation:
     """Create a new simulation"""
@@ -18,16 +33,11 @@ def create_simulation(db: Session, simulation_in: SimulationCreate, user_id: UUI
 
 def get_simulations(db: Session, user_id: UUID, skip: int = 0, limit: int = 100) -> List[Simulation]:
     """Get all simulations for a user"""
-    return db.query(Simulation).filter(Simulation.user_id == user_id).order_by(
-        Simulation.created_at.desc()
-    ).offset(skip).limit(limit).all()
+    return db.scalars(simulations_statement(user_id).offset(skip).limit(limit)).all()
 
 def get_simulation(db: Session, simulation_id: UUID, user_id: UUID) -> Optional[Simulation]:
     """Get a specific simulation by ID"""
-    return db.query(Simulation).filter(
-        Simulation.id == simulation_id,
-        Simulation.user_id == user_id
-    ).first()
+    return db.scalar(simulation_statement(simulation_id, user_id))
 
 def update_simulation(db: Session, simulation: Simulation, simulation_in: SimulationUpdate) -> Simulation:
     """Update simulation details"""
@@ -54,7 +64,82 @@ def start_simulation(db: Session, simulation_id: UUID, user_id: UUID) -> Optiona
     db.commit()
     db.refresh(simulation)
     
-    # Start the background task
+    launch_simulation(simulation)
+    return simulation
+
+def pause_simulation(db: Session, simulation_id: UUID, user_id: UUID) -> Optional[Simulation]:
+    """Pause a running simulation; its shards stop after their current batch and keep their checkpoints.
+
+    Locking the row waits out batches in flight, so the progress recorded
+    here is exact.
+    """
+    simulation = db.scalar(simulation_statement(simulation_id, user_id).with_for_update())
+    if not simulation or simulation.status != "running":
+        return None
+
+    simulation.status = "paused"
+    simulation.results = {"progress": progress_summary(db.scalars(checkpoints_statement(simulation_id)).all())}
+    db.commit()
+    db.refresh(simulation)
+    simulation_scheduler.stop_simulation(simulation_id)
+    return simulation
+
+def resume_simulation(db: Session, simulation_id: UUID, user_id: UUID) -> Optional[Simulation]:
+    """Resume a paused simulation from its checkpoints"""
+    simulation = db.scalar(simulation_statement(simulation_id, user_id).with_for_update())
+    if not simulation or simulation.status != "paused":
+        return None
+
+    simulation.status = "running"
+    db.commit()
+    db.refresh(simulation)
+    simulation_scheduler.resume(simulation_id)
+    return simulation
+
+def cancel_simulation(db: Session, simulation_id: UUID, user_id: UUID) -> Optional[Simulation]:
+    """Cancel a simulation that hasn't finished, recording what it emitted so far"""
+    simulation = db.scalar(simulation_statement(simulation_id, user_id).with_for_update())
+    if not simulation or simulation.status not in CANCELLABLE_STATUSES:
+        return None
+
+    checkpoints = db.scalars(checkpoints_statement(simulation_id)).all()
+    simulation.status = "cancelled"
+    simulation.end_time = datetime.now(timezone.utc)
+    simulation.results = simulation_results(simulation, checkpoints) if checkpoints else {}
+    db.commit()
+    db.refresh(simulation)
+    simulation_scheduler.stop_simulation(simulation_id)
+    return simulation
+
+def simulation_progress(simulation: Simulation) -> Dict[str, Any]:
+    """Progress from the scheduler's memory while this worker runs the simulation, else from its results"""
+    results = simulation.results or {}
+    progress = simulation_scheduler.progress(simulation.id) if simulation.status == "running" else None
+    live = progress is not None
+    if not live:
+        progress = results.get("progress")
+    if progress is None:
+        requested = results.get("requested_attacks", requested_attacks(simulation.intensity, simulation.duration_minutes))
+        emitted = results.get("total_attacks", 0)
+        progress = {
+            "emitted": emitted,
+            "target": requested,
+            "percent": round(100 * emitted / requested, 1) if requested else 100.0,
+            "elapsed_seconds": results.get("elapsed_seconds", 0.0),
+            "current_rate": 0.0
+        }
+
+    duration = run_seconds(simulation)
+    return {
+        "simulation_id": simulation.id,
+        "status": simulation.status,
+        "live": live,
+        **progress,
+        "requested_rate": round(progress["target"] / duration, 3) if duration else 0.0
+    }
+
+def launch_simulation(simulation: Simulation) -> None:
+    """Hand a started simulation to the background runner"""
     start_simulation_background_task(
         simulation_id=simulation.id,
         target_honeypot_id=simulation.target_honeypot_id,
@@ -63,5 +148,86 @@ def start_simulation(db: Session, simulation_id: UUID, user_id: UUID) -> Optiona
         duration_minutes=simulation.duration_minutes,
         intensity=simulation.intensity
     )
+
+# Async variants used when DATABASE_ASYNC is enabled
+
+async def create_simulation_async(db: AsyncSession, simulation_in: SimulationCreate, user_id: UUID) -> Simulation:
+    """Create a new simulation"""
+    db_simulation = Simulation(**simulation_in.dict(), user_id=user_id)
     
-    return simulation
\ No newline at end of file
+    db.add(db_simulation)
+    await db.commit()
+    await db.refresh(db_simulation)
+    return db_simulation
+
+async def get_simulations_async(db: AsyncSession, user_id: UUID, skip: int = 0, limit: int = 100) -> List[Simulation]:
+    """Get all simulations for a user"""
+    return (await db.scalars(simulations_statement(user_id).offset(skip).limit(limit))).all()
+
+async def get_simulation_async(db: AsyncSession, simulation_id: UUID, user_id: UUID) -> Optional[Simulation]:
+    """Get a specific simulation by ID"""
+    return await db.scalar(simulation_statement(simulation_id, user_id))
+
+async def update_simulation_async(db: AsyncSession, simulation: Simulation, simulation_in: SimulationUpdate) -> Simulation:
+    """Update simulation details"""
+    for field, value in simulation_in.dict(exclude_unset=True).items():
+        setattr(simulation, field, value)
+    
+    await db.commit()
+    await db.refresh(simulation)
+    return simulation
+
+async def start_simulation_async(db: AsyncSession, simulation_id: UUID, user_id: UUID) -> Optional[Simulation]:
+    """Start a simulation"""
+    simulation = await get_simulation_async(db, simulation_id, user_id)
+    
+    if not simulation or simulation.status != "pending":
+        return None
+    
+    simulation.status = "starting"
+    simulation.start_time = datetime.now()
+    await db.commit()
+    await db.refresh(simulation)
+    
+    launch_simulation(simulation)
+    return simulation
+
+async def pause_simulation_async(db: AsyncSession, simulation_id: UUID, user_id: UUID) -> Optional[Simulation]:
+    """Pause a running simulation; its shards stop after their current batch and keep their checkpoints"""
+    simulation = await db.scalar(simulation_statement(simulation_id, user_id).with_for_update())
+    if not simulation or simulation.status != "running":
+        return None
+
+    simulation.status = "paused"
+    simulation.results = {"progress": progress_summary((await db.scalars(checkpoints_statement(simulation_id))).all())}
+    await db.commit()
+    await db.refresh(simulation)
+    simulation_scheduler.stop_simulation(simulation_id)
+    return simulation
+
+async def resume_simulation_async(db: AsyncSession, simulation_id: UUID, user_id: UUID) -> Optional[Simulation]:
+    """Resume a paused simulation from its checkpoints"""
+    simulation = await db.scalar(simulation_statement(simulation_id, user_id).with_for_update())
+    if not simulation or simulation.status != "paused":
+        return None
+
+    simulation.status = "running"
+    await db.commit()
+    await db.refresh(simulation)
+    simulation_scheduler.resume(simulation_id)
+    return simulation
+
+async def cancel_simulation_async(db: AsyncSession, simulation_id: UUID, user_id: UUID) -> Optional[Simulation]:
+    """Cancel a simulation that hasn't finished, recording what it emitted so far"""
+    simulation = await db.scalar(simulation_statement(simulation_id, user_id).with_for_update())
+    if not simulation or simulation.status not in CANCELLABLE_STATUSES:
+        return None
+
+    checkpoints = (await db.scalars(checkpoints_statement(simulation_id))).all()
+    simulation.status = "cancelled"
+    simulation.end_time = datetime.now(timezone.utc)
+    simulation.results = simulation_results(simulation, checkpoints) if checkpoints else {}
+    await db.commit()
+    await db.refresh(simulation)
+    simulation_scheduler.stop_simulation(simulation_id)
+    return simulation
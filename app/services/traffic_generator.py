@@ -0,0 +1,380 @@
+"""Real attack traffic against deployed honeypots.
+
+Traffic-mode simulations don't write attack rows. They connect to the
+target honeypot's running container, at its address on DOCKER_NETWORK
+and its first port, and make the login attempts and requests the
+generated attacks describe, so the sensors, their logs and the log
+collector see the load a real campaign would put on them. The address
+comes from Docker, never from user input, and must also fall inside
+TRAFFIC_ALLOWED_NETWORKS.
+
+Each of `concurrency` sessions holds one client connection: SSH through
+paramiko (run in a thread pool, since it blocks), FTP over asyncio
+streams and HTTP through httpx. With connection reuse a session keeps
+its connection for as long as the server does, the way brute-force tools
+do; without it every attempt opens a new one. An attempt succeeds when
+the honeypot answers it, whether it accepts or rejects the credentials;
+refused connections, timeouts, dropped connections and 4xx FTP replies
+are failures.
+"""
+import asyncio
+import ipaddress
+import itertools
+import math
+import socket
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+import httpx
+import paramiko
+from app.core.config import settings
+from app.core.metrics import LatencyHistogram
+from app.core.pacing import TokenBucket
+from app.services.attack_simulator import generate_attack_batch
+
+PROTOCOLS = {"SSH": "ssh", "FTP": "ftp", "Web": "http"}  # Honeypot type -> client protocol
+DEFAULT_PORTS = {"ssh": 22, "ftp": 21, "http": 80}
+
+class ProtocolError(Exception):
+    """The server answered, but with a reply that means it couldn't handle the attempt"""
+
+
+@dataclass
+class TrafficTarget:
+    """Where and how a traffic run connects"""
+    protocol: str
+    host: str
+    port: int
+    timeout: float = 5.0
+    reuse: bool = True
+
+
+def check_allowed(host: str) -> None:
+    """Raise ValueError unless `host` is an address inside TRAFFIC_ALLOWED_NETWORKS"""
+    networks = [network.strip() for network in settings.TRAFFIC_ALLOWED_NETWORKS.split(",") if network.strip()]
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        raise ValueError(f"Traffic target {host!r} is not an IP address") from None
+    if not any(address in ipaddress.ip_network(network, strict=False) for network in networks):
+        raise ValueError(f"Traffic target {host} is outside TRAFFIC_ALLOWED_NETWORKS")
+
+def honeypot_target(honeypot_type: str, container_address: str, port: str, options: Optional[Dict[str, Any]] = None) -> TrafficTarget:
+    """Target of a traffic simulation: the honeypot container's address and its first port"""
+    options = options or {}
+    protocol = PROTOCOLS.get(honeypot_type)
+    if protocol is None:
+        raise ValueError(f"No traffic client for {honeypot_type} honeypots")
+    check_allowed(container_address)
+    ports = [int(value) for value in (port or "").split(",") if value.strip().isdigit()]
+    return TrafficTarget(
+        protocol=protocol,
+        host=container_address,
+        port=ports[0] if ports else DEFAULT_PORTS[protocol],
+        timeout=options.get("timeout_seconds") or settings.TRAFFIC_TIMEOUT_SECONDS,
+        reuse=settings.TRAFFIC_REUSE_CONNECTIONS if options.get("reuse_connections") is None else options["reuse_connections"]
+    )
+
+def traffic_concurrency(options: Optional[Dict[str, Any]], nodes: int, node_count: int) -> int:
+    """A shard's share of a simulation's sessions, proportional to its nodes"""
+    concurrency = (options or {}).get("concurrency") or settings.TRAFFIC_CONCURRENCY
+    return max(1, math.ceil(concurrency * nodes / max(node_count, 1)))
+
+
+class TrafficStats:
+    """Outcome counters and a latency histogram; JSON round-trips so shards can checkpoint and merge them"""
+
+    def __init__(self):
+        self.attempts = 0
+        self.succeeded = 0
+        self.connections = 0
+        self.errors: Counter = Counter()
+        self.latency = LatencyHistogram()
+
+    @property
+    def failed(self) -> int:
+        return self.attempts - self.succeeded
+
+    def record(self, milliseconds: float, error: Optional[str] = None) -> None:
+        self.attempts += 1
+        if error is None:
+            self.succeeded += 1
+            self.latency.record(milliseconds)
+        else:
+            self.errors[error] += 1
+
+    def merge(self, other: "TrafficStats") -> None:
+        self.attempts += other.attempts
+        self.succeeded += other.succeeded
+        self.connections += other.connections
+        self.errors.update(other.errors)
+        self.latency.merge(other.latency)
+
+    def summary(self) -> Dict[str, Any]:
+        """Success rate, connections opened, errors by kind and latency percentiles of successful attempts"""
+        return {
+            "attempts": self.attempts,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "success_rate": round(self.succeeded / self.attempts, 4) if self.attempts else 0.0,
+            "connections": self.connections,
+            "errors": dict(self.errors),
+            "latency_ms": self.latency.summary()
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "succeeded": self.succeeded,
+            "connections": self.connections,
+            "errors": dict(self.errors),
+            "latency": self.latency.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "TrafficStats":
+        stats = cls()
+        if data:
+            stats.attempts = data.get("attempts", 0)
+            stats.succeeded = data.get("succeeded", 0)
+            stats.connections = data.get("connections", 0)
+            stats.errors = Counter(data.get("errors", {}))
+            stats.latency = LatencyHistogram.from_dict(data.get("latency", {}))
+        return stats
+
+    @classmethod
+    def merged(cls, stats: Iterable[Optional[Dict[str, Any]]]) -> "TrafficStats":
+        total = cls()
+        for data in stats:
+            total.merge(cls.from_dict(data))
+        return total
+
+
+class HTTPSession:
+    """One HTTP client connection, kept alive between requests when reusing"""
+
+    def __init__(self, target: TrafficTarget):
+        self.target = target
+        self._client = httpx.AsyncClient(
+            base_url=f"http://{target.host}:{target.port}",
+            timeout=target.timeout,
+            limits=httpx.Limits(max_connections=1, max_keepalive_connections=1 if target.reuse else 0),
+            headers=None if target.reuse else {"Connection": "close"}
+        )
+        self._stream = None
+
+    async def attempt(self, details: Dict[str, Any]) -> bool:
+        """Send one request; returns whether it needed a new connection"""
+        response = await self._client.get(details.get("url", "/"), headers=details.get("headers"))
+        await response.aclose()
+        stream = response.extensions.get("network_stream")
+        opened = stream is not self._stream
+        self._stream = stream
+        return opened
+
+    async def reset(self) -> None:
+        self._stream = None  # httpx drops broken connections itself
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class FTPSession:
+    """One FTP control connection; failed logins are retried on it when reusing, as FTP allows"""
+
+    def __init__(self, target: TrafficTarget):
+        self.target = target
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def attempt(self, details: Dict[str, Any]) -> bool:
+        """Log in once; returns whether it needed a new connection"""
+        opened = self._writer is None
+        if opened:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.target.host, self.target.port), self.target.timeout
+            )
+            await self._reply()  # 220 greeting
+        code = await self._command(f"USER {details.get('username', 'anonymous')}")
+        if code == "331":
+            code = await self._command(f"PASS {details.get('password', '')}")
+        if code.startswith("4"):
+            await self.reset()
+            raise ProtocolError(f"FTP reply {code}")
+        if code == "230" or not self.target.reuse:
+            # A logged-in session can't try other credentials; start the next attempt afresh
+            await self.close()
+        return opened
+
+    async def _command(self, line: str) -> str:
+        self._writer.write(f"{line}\r\n".encode())
+        await self._writer.drain()
+        return await self._reply()
+
+    async def _reply(self) -> str:
+        """Reply code, skipping the continuation lines of multi-line replies"""
+        line = await asyncio.wait_for(self._reader.readline(), self.target.timeout)
+        code = line[:3]
+        while line[3:4] == b"-":
+            line = await asyncio.wait_for(self._reader.readline(), self.target.timeout)
+            if not line or (line[:3] == code and line[3:4] == b" "):
+                break
+        if len(code) < 3:
+            raise ConnectionResetError("Connection closed by the server")
+        return code.decode()
+
+    async def reset(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            try:
+                self._writer.write(b"QUIT\r\n")
+                await asyncio.wait_for(self._writer.drain(), self.target.timeout)
+            except (OSError, asyncio.TimeoutError):
+                pass
+            await self.reset()
+
+
+class SSHSession:
+    """One SSH transport; failed passwords for the same user are retried on it when reusing, up to the server's limit.
+
+    SSH servers refuse a change of username on a connection, so a new
+    username means a new connection.
+    """
+
+    def __init__(self, target: TrafficTarget, executor: ThreadPoolExecutor):
+        self.target = target
+        self._executor = executor
+        self._transport: Optional[paramiko.Transport] = None
+        self._username: Optional[str] = None
+
+    async def attempt(self, details: Dict[str, Any]) -> bool:
+        """Try one password; returns whether it needed a new connection"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._attempt, details.get("username", "root"), details.get("password", "")
+        )
+
+    def _attempt(self, username: str, password: str) -> bool:
+        opened = self._transport is None or not self._transport.is_active() or username != self._username
+        if opened:
+            self._close()
+            sock = socket.create_connection((self.target.host, self.target.port), self.target.timeout)
+            self._transport = paramiko.Transport(sock)
+            self._transport.banner_timeout = self.target.timeout
+            self._transport.auth_timeout = self.target.timeout
+            self._transport.start_client(timeout=self.target.timeout)
+            self._username = username
+        try:
+            self._transport.auth_password(username, password)
+            accepted = True
+        except paramiko.AuthenticationException:
+            accepted = False  # Rejected is still an answer
+        if accepted or not self.target.reuse:
+            self._close()
+        return opened
+
+    def _close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    async def reset(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._close)
+
+    async def close(self) -> None:
+        await self.reset()
+
+
+async def run_traffic(
+    target: TrafficTarget,
+    attack_type: str,
+    intensity: int,
+    count: int,
+    rate: float,
+    concurrency: int,
+    stats: TrafficStats,
+    halt: asyncio.Event,
+    tokens: float = 0.0,
+    burst_seconds: float = 1.0,
+    schedule: Optional[Iterable[Tuple[float, Dict[str, Any]]]] = None
+) -> None:
+    """Make `count` attempts at `rate` per second over `concurrency` sessions, recording them in `stats`.
+
+    Attempts are paced by a token bucket, or follow `schedule`, pairs of
+    (seconds from now, details), e.g. from a scenario replay. They are
+    queued for the first free session, so a slow target lowers the
+    achieved rate instead of piling up connections. Setting `halt` stops
+    issuing attempts; those in flight finish first.
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency) if target.protocol == "ssh" else None
+    slots: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+
+    def session():
+        if target.protocol == "ssh":
+            return SSHSession(target, executor)
+        return FTPSession(target) if target.protocol == "ftp" else HTTPSession(target)
+
+    async def produce() -> None:
+        if schedule is not None:
+            started = loop.time()
+            for delay, details in itertools.islice(schedule, count):
+                if started + delay > loop.time():
+                    await asyncio.sleep(started + delay - loop.time())
+                await slots.put(details)
+            return
+        bucket = TokenBucket(rate, rate * burst_seconds + 1, tokens, loop.time())
+        issued = 0
+        while issued < count:
+            batch = bucket.take(loop.time(), count - issued)
+            if batch:
+                for details in generate_attack_batch(attack_type, intensity, batch).details:
+                    await slots.put(details)
+                issued += batch
+            else:
+                await asyncio.sleep(bucket.wait_time())
+
+    async def work() -> None:
+        client = session()
+        try:
+            while True:
+                details = await slots.get()
+                if details is None:
+                    return
+                started = time.perf_counter()
+                try:
+                    opened = await client.attempt(details)
+                    stats.connections += opened
+                    stats.record((time.perf_counter() - started) * 1000)
+                except Exception as e:
+                    stats.record((time.perf_counter() - started) * 1000, error=type(e).__name__)
+                    await client.reset()
+        finally:
+            await client.close()
+
+    workers = [asyncio.create_task(work()) for _ in range(concurrency)]
+    producer = asyncio.create_task(produce())
+    halted = asyncio.create_task(halt.wait())
+    try:
+        await asyncio.wait([producer, halted], return_when=asyncio.FIRST_COMPLETED)
+        if producer.done():
+            producer.result()
+        else:
+            producer.cancel()
+            while not slots.empty():
+                slots.get_nowait()  # Issued but not started
+        for _ in workers:
+            await slots.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        halted.cancel()
+        producer.cancel()
+        for worker in workers:
+            worker.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
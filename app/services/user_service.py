@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
 from app.models.user import User
@@ -23,6 +25,14 @@ def get_user_by_clerk_id(db: Session, clerk_id: str) -> User:
     """Get a user by Clerk ID"""
     return db.query(User).filter(User.clerk_id == clerk_id).first()
 
+async def get_user_by_email_async(db: AsyncSession, email: str) -> User:
+    """Get a user by email"""
+    return await db.scalar(select(User).where(User.email == email).limit(1))
+
+async def get_user_by_clerk_id_async(db: AsyncSession, clerk_id: str) -> User:
+    """Get a user by Clerk ID"""
+    return await db.scalar(select(User).where(User.clerk_id == clerk_id).limit(1))
+
 def update_user(db: Session, user: User, user_in: UserUpdate) -> User:
     """Update user details"""
     update_data = user_in.dict(exclude_unset=True)
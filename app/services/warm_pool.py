@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.core.metrics import LatencyTracker
+from app.services import honeypot_manager
+
+logger = logging.getLogger(__name__)
+
+POOL_PREFIX = "warmpool-"
+POOL_LABEL = "honeypot.pool"
+
+class WarmPool:
+    """Pre-pulled images and pre-created, stopped containers per honeypot type.
+
+    Docker can't change a container's environment or port bindings after it
+    is created, so pool containers are built from a fixed profile per type
+    (WARM_POOL_PORTS) and only honeypots that match it exactly, with no
+    custom environment, are served from the pool. Everything else falls
+    back to a cold `containers.run`. A background thread refills the pool
+    after each hit.
+
+    For the same reason pool containers lack HONEYPOT_ID and HONEYPOT_NAME.
+    The sensor images don't read them: events are attributed to a honeypot
+    by the log volume its container mounts (see log_collector.log_directories),
+    so a pool container's own volume name works as well as the cold one.
+    """
+
+    def __init__(self, size: int = 0, ports: Optional[Dict[str, str]] = None, refill_interval: float = 30.0):
+        self.size = size
+        self.ports = ports or {}
+        self.refill_interval = refill_interval
+        self._available: Dict[str, List[str]] = {honeypot_type: [] for honeypot_type in self.ports}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.warm_latency = LatencyTracker(maxlen=1000)
+        self.cold_latency = LatencyTracker(maxlen=1000)
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0 and bool(self.ports)
+
+    def start(self) -> None:
+        if self._thread is not None or not self.enabled:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="warm-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(5)
+        self._thread = None
+
+    def eligible(self, honeypot) -> bool:
+        """Whether a honeypot can use a pool container as-is"""
+        profile = self.ports.get(honeypot.type)
+        if profile is None or honeypot.emulated_system:
+            return False
+        if any(not isinstance(value, (dict, list)) for value in (honeypot.configuration or {}).values()):
+            return False  # Would need CONFIG_* environment variables
+        return normalize_ports(honeypot.port) == normalize_ports(profile)
+
+    def acquire(self, honeypot, name: str):
+        """Take a pool container for the honeypot, renamed to `name`, or None on a miss"""
+        if not self.enabled or not self.eligible(honeypot):
+            return None
+
+        client = honeypot_manager.get_docker_client()
+        while True:
+            with self._lock:
+                candidates = self._available.get(honeypot.type) or []
+                container_id = candidates.pop() if candidates else None
+            if container_id is None:
+                with self._lock:
+                    self.misses += 1
+                self._wakeup.set()
+                return None
+            try:
+                container = client.containers.get(container_id)
+                container.rename(name)
+                with self._lock:
+                    self.hits += 1
+                self._wakeup.set()
+                return container
+            except Exception as e:
+                # Removed behind our back; try the next one
+                logger.warning(f"Discarding pool container {container_id}: {str(e)}")
+
+    def record_deploy(self, milliseconds: float, warm: bool) -> None:
+        (self.warm_latency if warm else self.cold_latency).record(milliseconds)
+
+    def fill(self) -> None:
+        """Pull images and top up every type's pool to `size`"""
+        client = honeypot_manager.get_docker_client()
+        if client is None:
+            return
+        honeypot_manager.ensure_network()
+        for honeypot_type, ports in self.ports.items():
+            image = honeypot_manager.get_honeypot_image(honeypot_type)
+            honeypot_manager.pull_image(image)
+            while not self._stopping.is_set():
+                with self._lock:
+                    if len(self._available[honeypot_type]) >= self.size:
+                        break
+                container = self._create(client, honeypot_type, image, ports)
+                with self._lock:
+                    self._available[honeypot_type].append(container.id)
+
+    def adopt_existing(self) -> None:
+        """Reuse stopped pool containers left by a previous run"""
+        client = honeypot_manager.get_docker_client()
+        if client is None:
+            return
+        for container in client.containers.list(all=True, filters={"label": POOL_LABEL}):
+            honeypot_type = container.labels.get("honeypot.type")
+            if not container.name.startswith(POOL_PREFIX) or honeypot_type not in self._available:
+                continue
+            with self._lock:
+                if container.id not in self._available[honeypot_type]:
+                    self._available[honeypot_type].append(container.id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": self.size,
+                "available": {honeypot_type: len(ids) for honeypot_type, ids in self._available.items()},
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / requests, 4) if requests else 0.0,
+                "warm_deploy_ms": self.warm_latency.summary(),
+                "cold_deploy_ms": self.cold_latency.summary()
+            }
+
+    def _create(self, client, honeypot_type: str, image: str, ports: str):
+        name = f"{POOL_PREFIX}{honeypot_type.lower()}-{uuid.uuid4().hex[:12]}"
+        volume_name = f"{name}-logs"
+        client.volumes.create(name=volume_name)
+        return client.containers.create(
+            image=image,
+            name=name,
+            environment={"HONEYPOT_TYPE": honeypot_type},
+            ports=port_mapping(ports),
+            network=settings.DOCKER_NETWORK,
+            volumes={volume_name: {'bind': '/var/log/honeypot', 'mode': 'rw'}},
+            labels={POOL_LABEL: "warm", "honeypot.type": honeypot_type},
+            restart_policy={"Name": "unless-stopped"}
+        )
+
+    def _run(self) -> None:
+        try:
+            self.adopt_existing()
+        except Exception as e:
+            logger.error(f"Error adopting warm pool containers: {str(e)}")
+        while not self._stopping.is_set():
+            started = time.perf_counter()
+            try:
+                self.fill()
+            except Exception as e:
+                logger.error(f"Error filling warm pool: {str(e)}")
+            else:
+                logger.debug(f"Warm pool filled in {time.perf_counter() - started:.2f}s")
+            self._wakeup.wait(self.refill_interval)
+            self._wakeup.clear()
+
+
+def normalize_ports(ports: str) -> List[str]:
+    return sorted(port.strip() for port in (ports or "").split(",") if port.strip().isdigit())
+
+def port_mapping(ports: str) -> Dict[str, int]:
+    return {f"{port}/tcp": int(port) for port in normalize_ports(ports)}
+
+
+warm_pool = WarmPool(
+    size=settings.WARM_POOL_SIZE,
+    ports=settings.WARM_POOL_PORTS,
+    refill_interval=settings.WARM_POOL_REFILL_INTERVAL
+)
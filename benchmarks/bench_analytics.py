@@ -0,0 +1,159 @@
+"""Compare the analytics query layer with the previous per-route queries.
+
+Seeds a throwaway user with honeypots and attacks in the configured
+database, times both implementations of each analytics endpoint, prints
+the results as JSON and removes the seeded rows.
+
+    python -m benchmarks.bench_analytics --honeypots 50 --attacks 100000 --repeat 50
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, desc, func
+from app.core.database import SessionLocal, engine
+from app.core.metrics import summarize_latencies
+from app.models import init as models  # noqa: F401 - registers every model on Base
+from app.models.attack import Attack
+from app.models.attack_rollup import AttackHourlyRollup, AttackSourceCount
+from app.models.honeypot import Honeypot
+from app.models.user import User
+from app.services import analytics_service
+from app.services.attack_service import write_attacks
+from app.services.attack_simulator import ATTACK_PATTERNS, generate_attack_batch
+
+def legacy_summary(db, user_id):
+    """The summary as computed before the analytics layer: load honeypots, then query raw attacks"""
+    honeypots = db.query(Honeypot).filter(Honeypot.user_id == user_id).all()
+    honeypot_ids = [h.id for h in honeypots]
+    if not honeypot_ids:
+        return None
+    db.query(func.count(Attack.id)).filter(Attack.honeypot_id.in_(honeypot_ids)).scalar()
+    len([h for h in honeypots if h.status == "active"])
+    db.query(Attack.attack_type, func.count(Attack.id).label("count")).filter(
+        Attack.honeypot_id.in_(honeypot_ids)
+    ).group_by(Attack.attack_type).order_by(desc("count")).limit(5).all()
+    return db.query(Attack).filter(Attack.honeypot_id.in_(honeypot_ids)).order_by(
+        Attack.timestamp.desc()
+    ).limit(10).all()
+
+def legacy_distribution(db, user_id, since):
+    honeypot_ids = [h.id for h in db.query(Honeypot).filter(Honeypot.user_id == user_id).all()]
+    return db.query(Attack.attack_type, func.count(Attack.id).label("count")).filter(
+        Attack.honeypot_id.in_(honeypot_ids),
+        Attack.timestamp >= since
+    ).group_by(Attack.attack_type).order_by(desc("count")).all()
+
+def legacy_sources(db, user_id, limit=10):
+    honeypot_ids = [h.id for h in db.query(Honeypot).filter(Honeypot.user_id == user_id).all()]
+    return db.query(Attack.source_ip, func.count(Attack.id).label("count")).filter(
+        Attack.honeypot_id.in_(honeypot_ids)
+    ).group_by(Attack.source_ip).order_by(desc("count")).limit(limit).all()
+
+def seed(db, honeypot_count, attack_count, days, seed_value):
+    """Create a user with honeypots and spread attacks over the last `days` days"""
+    rng = random.Random(seed_value)
+    user = User(email=f"bench-{uuid.uuid4().hex[:12]}@example.com", clerk_id=f"bench_{uuid.uuid4().hex}")
+    db.add(user)
+    db.commit()
+
+    honeypots = [
+        Honeypot(
+            name=f"bench-{i}",
+            type="SSH",
+            ip_address="127.0.0.1",
+            port="2222",
+            status="active" if i % 2 else "inactive",
+            user_id=user.id
+        ) for i in range(honeypot_count)
+    ]
+    db.add_all(honeypots)
+    db.commit()
+
+    honeypot_ids = [h.id for h in honeypots]
+    seed_attacks(honeypot_ids, attack_count, days, rng)
+    return user, honeypot_ids
+
+def seed_attacks(honeypot_ids, attack_count, days, rng):
+    """Write `attack_count` attacks spread over the honeypots and the last `days` days"""
+    now = datetime.now(timezone.utc)
+    # A small pool of repeat offenders so source counts aren't all 1
+    offenders = [f"10.0.{i // 256}.{i % 256}" for i in range(500)]
+    remaining = attack_count
+    while remaining > 0:
+        count = min(5000, remaining)
+        batch = generate_attack_batch(rng.choice(list(ATTACK_PATTERNS)), 5, count, seed=rng.randrange(2 ** 32))
+        rows = batch.to_rows(rng.choice(honeypot_ids))
+        for row in rows:
+            row["timestamp"] = now - timedelta(seconds=rng.randrange(days * 86400))
+            if rng.random() < 0.3:
+                row["source_ip"] = rng.choice(offenders)
+        write_attacks(rows)
+        remaining -= count
+
+def cleanup(db, user_id, honeypot_ids):
+    for model in (Attack, AttackHourlyRollup, AttackSourceCount):
+        db.execute(delete(model).where(model.honeypot_id.in_(honeypot_ids)))
+    db.execute(delete(Honeypot).where(Honeypot.id.in_(honeypot_ids)))
+    db.execute(delete(User).where(User.id == user_id))
+    db.commit()
+
+def measure(fn, repeat):
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return summarize_latencies(latencies)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--honeypots", type=int, default=20)
+    parser.add_argument("--attacks", type=int, default=50000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    user, honeypot_ids = seed(db, args.honeypots, args.attacks, args.days, args.seed)
+    since = datetime.now(timezone.utc) - timedelta(days=7, minutes=30)
+    try:
+        cases = {
+            "summary": (
+                lambda: legacy_summary(db, user.id),
+                lambda: analytics_service.get_summary(db, user.id)
+            ),
+            "attack_distribution_7d": (
+                lambda: legacy_distribution(db, user.id, since),
+                lambda: analytics_service.get_attack_distribution(db, user.id, since)
+            ),
+            "attack_sources": (
+                lambda: legacy_sources(db, user.id),
+                lambda: analytics_service.get_attack_sources(db, user.id)
+            ),
+        }
+        results = {
+            "database": engine.dialect.name,
+            "honeypots": args.honeypots,
+            "attacks": args.attacks,
+            "repeat": args.repeat,
+            "cases": {}
+        }
+        for name, (legacy, current) in cases.items():
+            legacy_ms = measure(legacy, args.repeat)
+            current_ms = measure(current, args.repeat)
+            results["cases"][name] = {
+                "legacy_ms": legacy_ms,
+                "analytics_service_ms": current_ms,
+                "speedup_p50": round(legacy_ms["p50"] / current_ms["p50"], 2) if current_ms["p50"] else None
+            }
+        print(json.dumps(results, indent=2))
+    finally:
+        cleanup(db, user.id, honeypot_ids)
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Load the dashboard routes concurrently in the configured database mode.
+
+Run once per mode and compare the JSON output:
+
+    DATABASE_ASYNC=false python -m benchmarks.bench_db_modes --concurrency 64
+    DATABASE_ASYNC=true python -m benchmarks.bench_db_modes --concurrency 64
+
+Requests go through the ASGI app in-process with authentication overridden,
+so the numbers reflect the route, session and pool layers only.
+"""
+import argparse
+import asyncio
+import json
+import time
+import httpx
+from app.core.config import settings
+from app.core.database import SessionLocal, async_engine, pool_stats
+from app.core.metrics import summarize_latencies
+from app.api.dependencies import get_current_user
+from app.main import app
+from app.schemas import user as user_schemas
+from benchmarks.bench_analytics import cleanup, seed
+
+ENDPOINTS = [
+    "/honeypots/",
+    "/analytics/summary",
+    "/analytics/attack-distribution?time_period=7d",
+    "/analytics/attack-sources",
+    "/simulations/",
+]
+
+async def run_load(client: httpx.AsyncClient, requests: int, concurrency: int):
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(f"{settings.API_V1_STR}{ENDPOINTS[i % len(ENDPOINTS)]}")
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            path = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+async def main_async(args):
+    db = SessionLocal()
+    user, honeypot_ids = seed(db, args.honeypots, args.attacks, 30, args.seed)
+    app.dependency_overrides[get_current_user] = lambda: user_schemas.User.model_validate(user)
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await run_load(client, len(ENDPOINTS), 1)  # Warm up pools and caches
+            elapsed, latencies, errors = await run_load(client, args.requests, args.concurrency)
+
+        print(json.dumps({
+            "mode": "async" if settings.DATABASE_ASYNC else "sync",
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "errors": errors,
+            "requests_per_second": round(args.requests / elapsed, 1),
+            "latency_ms": summarize_latencies(latencies),
+            "pool": pool_stats()
+        }, indent=2))
+    finally:
+        app.dependency_overrides.clear()
+        cleanup(db, user.id, honeypot_ids)
+        db.close()
+        if async_engine is not None:
+            await async_engine.dispose()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--honeypots", type=int, default=20)
+    parser.add_argument("--attacks", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(main_async(parser.parse_args(argv)))
+
+if __name__ == "__main__":
+    main()
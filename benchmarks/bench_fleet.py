@@ -0,0 +1,77 @@
+"""Time bringing up a honeypot fleet one by one versus through the fleet service.
+
+Uses the fake Docker backend with per-call and per-pull latency so the
+result reflects orchestration overhead rather than a particular daemon:
+
+    python -m benchmarks.bench_fleet --honeypots 200 --latency 0.05 --pull-latency 2
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+from app.core.config import settings
+from app.schemas.honeypot import Honeypot as HoneypotSchema
+from app.services import honeypot_manager
+from app.services.fake_docker import FakeDockerClient
+from app.services.fleet_service import execute_fleet
+
+def make_fleet(size: int):
+    types = list(settings.HONEYPOT_IMAGES)
+    now = datetime.now(timezone.utc)
+    return [
+        HoneypotSchema(
+            id=uuid.uuid4(),
+            name=f"bench-{i}",
+            type=types[i % len(types)],
+            ip_address="127.0.0.1",
+            port=str(20000 + i),
+            status="inactive",
+            configuration={},
+            user_id=uuid.uuid4(),
+            attack_count=0,
+            created_at=now
+        ) for i in range(size)
+    ]
+
+def timed(client: FakeDockerClient, run) -> dict:
+    honeypot_manager.set_docker_client(client)
+    started = time.perf_counter()
+    ok = run()
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "succeeded": ok,
+        "docker_calls": client.calls,
+        "image_pulls": client.pulls
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--honeypots", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=settings.FLEET_CONCURRENCY)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per fake Docker call")
+    parser.add_argument("--pull-latency", type=float, default=2.0, help="Seconds per fake image pull")
+    args = parser.parse_args(argv)
+
+    fleet = make_fleet(args.honeypots)
+    serial = timed(
+        FakeDockerClient(latency=args.latency, pull_latency=args.pull_latency),
+        lambda: sum(honeypot_manager.deploy_honeypot_instance(honeypot) for honeypot in fleet)
+    )
+    parallel = timed(
+        FakeDockerClient(latency=args.latency, pull_latency=args.pull_latency),
+        lambda: sum(result["ok"] for result in execute_fleet("deploy", fleet, args.concurrency))
+    )
+
+    print(json.dumps({
+        "honeypots": args.honeypots,
+        "concurrency": args.concurrency,
+        "latency": args.latency,
+        "pull_latency": args.pull_latency,
+        "serial": serial,
+        "fleet": parallel,
+        "speedup": round(serial["seconds"] / parallel["seconds"], 2) if parallel["seconds"] else None
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
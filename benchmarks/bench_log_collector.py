@@ -0,0 +1,86 @@
+"""Measure log collection throughput against generated Cowrie/FTP/SNARE logs.
+
+    python -m benchmarks.bench_log_collector --lines 200000 --batch-size 1000
+
+Writes fixture log files to a temporary directory, runs one collection
+pass per honeypot type against the configured database, then a second
+pass that should find nothing new. No Docker daemon is involved.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from benchmarks.bench_analytics import cleanup, seed
+from app.core.database import SessionLocal
+from app.services.log_collector import collect_directory
+
+def cowrie_event(rng, ip):
+    kind = rng.random()
+    if kind < 0.6:
+        return {"eventid": "cowrie.login.failed", "src_ip": ip, "username": "root", "password": f"pw{rng.randrange(1000)}"}
+    if kind < 0.8:
+        return {"eventid": "cowrie.command.input", "src_ip": ip, "input": "cat /etc/passwd"}
+    return {"eventid": "cowrie.session.connect", "src_ip": ip, "src_port": rng.randrange(1024, 65535)}
+
+def ftp_event(rng, ip):
+    if rng.random() < 0.7:
+        return {"event": "login", "src_ip": ip, "username": "anonymous", "password": ""}
+    return {"event": "command", "src_ip": ip, "command": "RETR", "filename": "/etc/shadow"}
+
+def snare_event(rng, ip):
+    detection = rng.choice(["index", "sqli", "xss", "lfi"])
+    return {"method": "GET", "path": "/index.php?id=1", "peer": {"ip": ip, "port": 40000},
+            "headers": {"user-agent": "sqlmap"}, "detection": {"name": detection}}
+
+GENERATORS = {"SSH": ("cowrie/cowrie.json", cowrie_event), "FTP": ("ftp/ftp.json", ftp_event), "Web": ("snare/snare.json", snare_event)}
+
+def write_fixture(directory, honeypot_type, lines, rng):
+    name, generate = GENERATORS[honeypot_type]
+    path = os.path.join(directory, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        for i in range(lines):
+            f.write(json.dumps(generate(rng, f"198.51.100.{i % 250}")) + "\n")
+    return os.path.getsize(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--lines", type=int, default=100000, help="Log lines per honeypot type")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    user, honeypot_ids = seed(db, len(GENERATORS), 0, 1, args.seed)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            for honeypot_id, honeypot_type in zip(honeypot_ids, GENERATORS):
+                directory = os.path.join(root, str(honeypot_id))
+                size = write_fixture(directory, honeypot_type, args.lines, rng)
+
+                started = time.perf_counter()
+                first = collect_directory(honeypot_id, honeypot_type, directory, batch_size=args.batch_size)
+                elapsed = time.perf_counter() - started
+                started = time.perf_counter()
+                second = collect_directory(honeypot_id, honeypot_type, directory, batch_size=args.batch_size)
+
+                results[honeypot_type] = {
+                    "bytes": size,
+                    "lines": first["lines"],
+                    "attacks": first["attacks"],
+                    "lines_per_second": round(first["lines"] / elapsed, 1),
+                    "megabytes_per_second": round(size / elapsed / 1e6, 2),
+                    "idle_pass_ms": round((time.perf_counter() - started) * 1000, 3),
+                    "idle_pass_lines": second["lines"]
+                }
+        print(json.dumps({"batch_size": args.batch_size, "types": results}, indent=2))
+    finally:
+        cleanup(db, user.id, honeypot_ids)
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Scenario replay speed, memory and fidelity, and optionally recording from the database.
+
+    python -m benchmarks.bench_scenario --attacks 500000 --shards 4
+    python -m benchmarks.bench_scenario --record --seed-attacks 100000
+
+Writes a synthetic gzip scenario with a day-shaped rate curve and
+`--attacks` recorded attack lines, then replays it whole and as one of
+`--shards` shards. Peak traced memory is measured for the full file and
+for a tenth of it; with attack lines streamed the two should be close.
+With --record, seeds attacks into the configured database like
+bench_analytics, records them both as events and as a profile, checks
+the counts survive the round trip and removes the seeded rows.
+"""
+import argparse
+import gzip
+import json
+import math
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from app.core.database import SessionLocal, engine
+from app.services.scenario import load_scenario, record_events, record_profile
+from benchmarks.bench_analytics import cleanup, seed
+
+def write_synthetic(path: str, attacks: int, hours: int, seed_value: int) -> None:
+    rng = np.random.default_rng(seed_value)
+    duration = hours * 3600
+    with gzip.open(path, "wt", encoding="utf-8") as out:
+        def write(record):
+            out.write(json.dumps(record, separators=(",", ":")) + "\n")
+        write({"type": "scenario", "name": "synthetic", "duration_seconds": duration, "seed": seed_value})
+        ips = [f"10.{i // 65536}.{i // 256 % 256}.{i % 256}" for i in range(10000)]
+        write({"type": "pool", "name": "attackers", "values": ips, "weights": (rng.zipf(1.3, len(ips)) % 1000 + 1).tolist()})
+        write({"type": "dictionary", "name": "users", "values": ["root", "admin", "test", "ubuntu"]})
+        write({"type": "dictionary", "name": "passwords", "values": [f"pw{i}" for i in range(1000)]})
+        for hour in range(hours):
+            # Quiet nights, busy afternoons
+            start_rate, end_rate = (2 + 1.5 * math.sin(2 * math.pi * (h - 9) / 24) for h in (hour, hour + 1))
+            write({
+                "type": "segment", "start": hour * 3600, "duration": 3600, "rate": [start_rate, end_rate],
+                "mix": {"SSH-BRUTEFORCE": 6, "WEB-SQL-INJECTION": 3, "FTP-BRUTEFORCE": 1}, "ips": "attackers",
+                "payloads": {"SSH-BRUTEFORCE": {"username": "users", "password": "passwords"}}
+            })
+        for at in np.sort(rng.uniform(0, duration, attacks)).tolist():
+            write({"type": "attack", "at": round(at, 3), "source_ip": ips[int(rng.integers(len(ips)))],
+                   "attack_type": "SSH-BRUTEFORCE", "severity": "low", "details": {"username": "root", "password": "x"}})
+
+def replay_stats(path: str, shard: int, shards: int) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    scenario = load_scenario(path)
+    load_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    count, last, in_order = 0, -1.0, True
+    for at, _ in scenario.replay(shard, shards):
+        in_order = in_order and at >= last
+        last = at
+        count += 1
+    replay_seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "events": count,
+        "expected_events": scenario.shard_target(shard, shards),
+        "in_time_order": in_order,
+        "load_seconds": round(load_seconds, 3),
+        "events_per_second": round(count / replay_seconds, 1) if replay_seconds else 0.0,
+        "peak_memory_kb": round(peak / 1024, 1)
+    }
+
+def record_round_trip(directory: str, attacks: int, seed_value: int) -> dict:
+    db = SessionLocal()
+    user, honeypot_ids = seed(db, 5, attacks, 1, seed_value)
+    try:
+        until = datetime.now(timezone.utc) + timedelta(seconds=1)
+        since = until - timedelta(days=1, seconds=2)
+        report = {}
+        for kind in ("events", "profile"):
+            path = os.path.join(directory, f"recorded-{kind}.ndjson.gz")
+            started = time.perf_counter()
+            with engine.connect() as conn, gzip.open(path, "wt", encoding="utf-8") as out:
+                if kind == "events":
+                    recorded = record_events(conn, out, since, until)
+                else:
+                    recorded = record_profile(conn, out, since, until, bucket_seconds=300)
+            seconds = time.perf_counter() - started
+            scenario = load_scenario(path)
+            mix = Counter(attack["attack_type"] for _, attack in scenario.replay())
+            report[kind] = {
+                "recorded": recorded,
+                "replayable": scenario.total_attacks(),
+                "record_seconds": round(seconds, 3),
+                "file_bytes": os.path.getsize(path),
+                "replayed_mix": dict(mix)
+            }
+        return report
+    finally:
+        cleanup(db, user.id, honeypot_ids)
+        db.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--attacks", type=int, default=200000, help="Recorded attack lines in the synthetic scenario")
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--record", action="store_true", help="Also record seeded attacks from the configured database")
+    parser.add_argument("--seed-attacks", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    report = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for label, attacks in (("full", args.attacks), ("tenth", args.attacks // 10)):
+            path = os.path.join(directory, f"{label}.ndjson.gz")
+            write_synthetic(path, attacks, args.hours, args.seed)
+            report[label] = {
+                "file_bytes": os.path.getsize(path),
+                "replay": replay_stats(path, 0, 1),
+                f"shard_0_of_{args.shards}": replay_stats(path, 0, args.shards)
+            }
+        if args.record:
+            report["record"] = record_round_trip(directory, args.seed_attacks, args.seed)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
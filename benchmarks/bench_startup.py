@@ -0,0 +1,91 @@
+"""Profile API boot time when the Docker daemon is unreachable.
+
+Each measurement runs in a fresh interpreter so import caches don't carry
+over:
+
+    python -m benchmarks.bench_startup --docker-host unix:///tmp/no-docker.sock
+
+Reports how long `import app.main` and the startup hooks take, the first
+and a repeated Docker lookup through the provider (the repeat should hit
+the backoff and return at once), and the cost the old import-time
+`docker.from_env()` + network check paid on every boot.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BOOT = """
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    booted = time.perf_counter()
+    client.get("/health")
+    healthy = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (booted - imported) * 1000,
+    "first_health_ms": (healthy - booted) * 1000,
+}))
+"""
+
+PROVIDER = """
+import json, time
+from app.services.docker_provider import docker_provider
+started = time.perf_counter()
+first = docker_provider.get()
+connected = time.perf_counter()
+docker_provider.get()
+retried = time.perf_counter()
+print(json.dumps({
+    "available": first is not None,
+    "first_lookup_ms": (connected - started) * 1000,
+    "backoff_lookup_ms": (retried - connected) * 1000,
+}))
+"""
+
+LEGACY = """
+import json, time
+import docker
+started = time.perf_counter()
+try:
+    client = docker.from_env()
+    client.networks.get("honeypot-network")
+except Exception:
+    pass
+print(json.dumps({"legacy_import_init_ms": (time.perf_counter() - started) * 1000}))
+"""
+
+def run(code: str, env) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()
+    return json.loads(output[-1])
+
+def median_runs(code: str, env, repeat: int) -> dict:
+    runs = [run(code, env) for _ in range(repeat)]
+    result = {}
+    for key, value in runs[0].items():
+        values = sorted(r[key] for r in runs)
+        result[key] = round(values[len(values) // 2], 3) if isinstance(value, float) else value
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--docker-host", default="unix:///tmp/no-docker.sock")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, DOCKER_HOST=args.docker_host, DOCKER_BACKEND="docker")
+    report = {"docker_host": args.docker_host, "repeat": args.repeat}
+    report.update(median_runs(BOOT, env, args.repeat))
+    report.update(median_runs(PROVIDER, env, args.repeat))
+    report.update(median_runs(LEGACY, env, args.repeat))
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
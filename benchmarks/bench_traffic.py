@@ -0,0 +1,51 @@
+"""Traffic-mode clients against local stub honeypots, with and without connection reuse.
+
+    python -m benchmarks.bench_traffic --protocols ssh ftp http --attempts 500 --rate 200 --concurrency 16
+
+Starts one stub per protocol from benchmarks.stub_honeypots, runs the
+same paced attempts through app.services.traffic_generator twice (reusing
+connections, then one connection per attempt) and reports achieved rate,
+success rate, connections opened and latency percentiles. No database or
+Docker daemon is involved.
+"""
+import argparse
+import asyncio
+import json
+import time
+from app.services.traffic_generator import TrafficStats, TrafficTarget, run_traffic
+from benchmarks.stub_honeypots import start_stub
+
+ATTACK_TYPES = {"ssh": "SSH-BRUTEFORCE", "ftp": "FTP-BRUTEFORCE", "http": "WEB-SQL-INJECTION"}
+
+async def measure(target: TrafficTarget, attempts: int, rate: float, concurrency: int) -> dict:
+    stats = TrafficStats()
+    started = time.perf_counter()
+    await run_traffic(target, ATTACK_TYPES[target.protocol], 5, attempts, rate, concurrency, stats, asyncio.Event())
+    elapsed = time.perf_counter() - started
+    return {"achieved_rate": round(stats.attempts / elapsed, 1), "elapsed_seconds": round(elapsed, 3), **stats.summary()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--protocols", nargs="+", choices=list(ATTACK_TYPES), default=list(ATTACK_TYPES))
+    parser.add_argument("--attempts", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=200.0, help="Attempts per second")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Delay of each stub reply")
+    args = parser.parse_args(argv)
+
+    report = {"attempts": args.attempts, "requested_rate": args.rate, "concurrency": args.concurrency, "protocols": {}}
+    for protocol in args.protocols:
+        stub = start_stub(protocol, latency=args.latency_ms / 1000)
+        try:
+            report["protocols"][protocol] = {
+                ("reuse" if reuse else "no_reuse"): asyncio.run(measure(
+                    TrafficTarget(protocol, stub.host, stub.port, timeout=10.0, reuse=reuse),
+                    args.attempts, args.rate, args.concurrency
+                )) for reuse in (True, False)
+            }
+        finally:
+            stub.stop()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
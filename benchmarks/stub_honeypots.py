@@ -0,0 +1,155 @@
+"""Minimal SSH, FTP and HTTP servers that answer like honeypots, for traffic-mode runs without Docker.
+
+    python -m benchmarks.stub_honeypots --protocol ssh --port 2222 --latency-ms 5
+
+Every login is rejected and every page is a 404, after an optional
+delay standing in for the sensor's own work. Drive them with
+app.services.traffic_generator.run_traffic, starting them in-process
+with `start_stub` as bench_traffic does; traffic simulations only
+connect to deployed honeypot containers.
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+import paramiko
+
+class StubServer:
+    """A stub listening on `host`:`port` in a background thread"""
+
+    def __init__(self, protocol: str, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        self.protocol = protocol
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.connections = 0
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._loop = None
+        self._thread = threading.Thread(target=self._serve, name=f"stub-{protocol}", daemon=True)
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    def _serve(self) -> None:
+        if self.protocol == "ssh":
+            self._serve_ssh()
+            return
+        self._loop = asyncio.new_event_loop()
+        handler = self._ftp if self.protocol == "ftp" else self._http
+        server = self._loop.run_until_complete(asyncio.start_server(handler, self.host, self.port, backlog=1024))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        server.close()
+        pending = asyncio.all_tasks(self._loop)
+        if pending:
+            # Let replies in flight finish; cancelling stream handlers makes asyncio log errors
+            self._loop.run_until_complete(asyncio.wait(pending, timeout=1))
+        for task in pending:
+            task.cancel()
+        self._loop.close()
+
+    async def _http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                await asyncio.sleep(self.latency)
+                close = b"connection: close" in request.lower()
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n" + (b"Connection: close\r\n" if close else b"") + b"\r\n")
+                await writer.drain()
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _ftp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            writer.write(b"220 FTP server ready\r\n")
+            await writer.drain()
+            while line := await reader.readline():
+                command = line.split(b" ", 1)[0].strip().upper()
+                await asyncio.sleep(self.latency)
+                if command == b"QUIT":
+                    writer.write(b"221 Goodbye\r\n")
+                    await writer.drain()
+                    break
+                replies = {b"USER": b"331 Password required\r\n", b"PASS": b"530 Login incorrect\r\n"}
+                writer.write(replies.get(command, b"502 Command not implemented\r\n"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _serve_ssh(self) -> None:
+        key = paramiko.RSAKey.generate(2048)
+        latency = self.latency
+
+        class RejectingServer(paramiko.ServerInterface):
+            def get_allowed_auths(self, username):
+                return "password"
+
+            def check_auth_password(self, username, password):
+                time.sleep(latency)
+                return paramiko.AUTH_FAILED
+
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((self.host, self.port))
+        listener.listen(1024)
+        listener.settimeout(0.2)
+        self.port = listener.getsockname()[1]
+        self._ready.set()
+        transports = []
+        while not self._stopped.is_set():
+            try:
+                conn, _ = listener.accept()
+            except socket.timeout:
+                transports = [transport for transport in transports if transport.is_active()]
+                continue
+            self.connections += 1
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(key)
+            transport.start_server(server=RejectingServer())
+            transports.append(transport)
+        for transport in transports:
+            transport.close()
+        listener.close()
+
+
+def start_stub(protocol: str, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0) -> StubServer:
+    """Start a stub on an ephemeral port unless one is given"""
+    return StubServer(protocol, host, port, latency).start()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--protocol", choices=["ssh", "ftp", "http"], required=True)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    stub = start_stub(args.protocol, args.host, args.port, args.latency_ms / 1000)
+    print(f"{args.protocol} stub listening on {stub.host}:{stub.port}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stub.stop()
+
+if __name__ == "__main__":
+    main()